@@ -9,6 +9,12 @@ from ansible.module_utils.common.text.converters import to_native
 from ansible_collections.community.okd.plugins.module_utils.openshift_common import (
     AnsibleOpenshiftModule,
 )
+from ansible_collections.community.okd.plugins.module_utils.openshift_concurrent import (
+    run_concurrently,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_stats import (
+    OpenshiftStats,
+)
 
 try:
     from kubernetes import client
@@ -17,42 +23,169 @@ except ImportError:
     pass
 
 
+# the kinds of role a binding can refer to
+ROLE_REF_KINDS = ["ClusterRole", "Role"]
+
+# the kind and the api version of each resource which can be pruned
+TARGET_KINDS = {
+    "roles": ("Role", "rbac.authorization.k8s.io/v1"),
+    "clusterroles": ("ClusterRole", "rbac.authorization.k8s.io/v1"),
+    "users": ("User", "user.openshift.io/v1"),
+    "groups": ("Group", "user.openshift.io/v1"),
+}
+
+# the OAuthClientAuthorizations of at most this number of users are listed using a field
+# selector per user, otherwise they are all listed page by page
+AUTHORIZATION_FIELD_SELECTOR_MAX_USERS = 20
+
+# the number of times an object modified concurrently is read and patched again
+CONFLICT_RETRIES = 3
+
+
+def remove_values_patch(key, values):
+    """
+    returns a function computing the JSON patch removing values from the list stored in key,
+    or None when the object does not need to be updated.
+    """
+    values = frozenset(values)
+
+    def _patch(obj):
+        existing = obj.get(key) or []
+        retained = [x for x in existing if x not in values]
+        if len(retained) == len(existing):
+            return None
+        return [dict(op="add", path="/" + key, value=retained)]
+
+    return _patch
+
+
+def binding_user_group_names(binding_namespace, subjects):
+    users, groups = [], []
+    for x in subjects:
+        if x["kind"] == "User":
+            users.append(x["name"])
+        elif x["kind"] == "Group":
+            groups.append(x["name"])
+        elif x["kind"] == "ServiceAccount":
+            namespace = binding_namespace
+            if x.get("namespace") is not None:
+                namespace = x.get("namespace")
+            if namespace is not None:
+                users.append("system:serviceaccount:%s:%s" % (namespace, x["name"]))
+    return users, groups
+
+
+def remove_subjects_patch(subjects):
+    """
+    returns a function computing the JSON patch removing from a binding the subjects whose
+    names are listed in subjects by kind (User, Group), or None when the binding does not
+    need to be updated.
+    """
+    subjects = dict((k, frozenset(v)) for k, v in subjects.items() if v)
+
+    def _patch(item):
+        existing = item.get("subjects") or []
+        retainedSubjects = [
+            x for x in existing if x["name"] not in subjects.get(x["kind"], ())
+        ]
+        if len(existing) == len(retainedSubjects):
+            return None
+        patch = [dict(op="add", path="/subjects", value=retainedSubjects)]
+        users, groups = binding_user_group_names(
+            item["metadata"].get("namespace", None), retainedSubjects
+        )
+        # the legacy userNames and groupNames fields are only updated when set
+        for key, value in (("userNames", users), ("groupNames", groups)):
+            if key in item:
+                patch.append(dict(op="add", path="/" + key, value=value))
+        return patch
+
+    return _patch
+
+
+def combine_patches(*funcs):
+    """
+    returns a function computing the JSON patch made of the operations of each function,
+    or None when none of them updates the object.
+    """
+
+    def _patch(item):
+        patch = []
+        for func in funcs:
+            patch.extend(func(item) or [])
+        return patch or None
+
+    return _patch
+
+
 class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
     def __init__(self, **kwargs):
         super(OpenShiftAdmPruneAuth, self).__init__(**kwargs)
+        self.stats = OpenshiftStats()
+
+    def exit_json(self, **kwargs):
+        if self.params.get("stats"):
+            kwargs["stats"] = self.stats.to_dict()
+        super(OpenShiftAdmPruneAuth, self).exit_json(**kwargs)
+
+    def list_resource_bindings(self, resource, kind, namespace=None):
+        """
+        lists the bindings from namespace (or from all namespaces) using a single request and
+        indexes them by (roleRef.kind, roleRef.name) then by namespace.
+        """
+        try:
+            with self.stats.timer(kind, "list"):
+                result = resource.get(name=None, namespace=namespace).to_dict()
+        except NotFoundError:
+            return {}
+        except DynamicApiError as exc:
+            msg = "Failed to get {kind} resource due to: {msg}".format(
+                kind=kind, msg=exc.body
+            )
+            self.fail_json(msg=msg)
+        except Exception as e:
+            msg = "Failed to get {kind} due to: {msg}".format(
+                kind=kind, msg=to_native(e)
+            )
+            self.fail_json(msg=msg)
+
+        index = {}
+        for obj in result.get("items") if "items" in result else [result]:
+            key = (obj["roleRef"]["kind"], obj["roleRef"]["name"])
+            namespace = obj["metadata"].get("namespace", None)
+            index.setdefault(key, {}).setdefault(namespace, []).append(
+                obj["metadata"].get("name")
+            )
+        return index
 
     def prune_resource_binding(
         self, kind, api_version, ref_kind, ref_namespace_names, propagation_policy=None
     ):
         resource = self.find_resource(kind=kind, api_version=api_version, fail=True)
+
+        # The bindings are listed once, from the namespace of the referenced roles when they
+        # all belong to the same namespace
+        namespaces = set(x for x, y in ref_namespace_names)
+        index = self.list_resource_bindings(
+            resource, kind, namespace=namespaces.pop() if len(namespaces) == 1 else None
+        )
+
         candidates = []
+        ref_kinds = [ref_kind] if ref_kind else ROLE_REF_KINDS
         for ref_namespace, ref_name in ref_namespace_names:
-            try:
-                result = resource.get(name=None, namespace=ref_namespace)
-                result = result.to_dict()
-                result = result.get("items") if "items" in result else [result]
-                for obj in result:
-                    namespace = obj["metadata"].get("namespace", None)
-                    name = obj["metadata"].get("name")
-                    if ref_kind and obj["roleRef"]["kind"] != ref_kind:
-                        # skip this binding as the roleRef.kind does not match
-                        continue
-                    if obj["roleRef"]["name"] == ref_name:
-                        # select this binding as the roleRef.name match
-                        candidates.append((namespace, name))
-            except NotFoundError:
-                continue
-            except DynamicApiError as exc:
-                msg = "Failed to get {kind} resource due to: {msg}".format(
-                    kind=kind, msg=exc.body
-                )
-                self.fail_json(msg=msg)
-            except Exception as e:
-                msg = "Failed to get {kind} due to: {msg}".format(
-                    kind=kind, msg=to_native(e)
-                )
-                self.fail_json(msg=msg)
-
+            for role_kind in ref_kinds:
+                bindings = index.get((role_kind, ref_name), {})
+                if ref_namespace is not None:
+                    bindings = {ref_namespace: bindings.get(ref_namespace, [])}
+                for namespace, names in bindings.items():
+                    candidates.extend((namespace, name) for name in names)
+
+        return self.delete_objects(resource, kind, candidates, propagation_policy)
+
+    def delete_objects(self, resource, kind, candidates, propagation_policy=None):
+        """
+        deletes the objects identified by (namespace, name) and returns their names.
+        """
         if len(candidates) == 0 or self.check_mode:
             return [y if x is None else x + "/" + y for x, y in candidates]
 
@@ -62,9 +195,10 @@ class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
 
         for namespace, name in candidates:
             try:
-                result = resource.delete(
-                    name=name, namespace=namespace, body=delete_options
-                )
+                with self.stats.timer(kind, "delete"):
+                    result = resource.delete(
+                        name=name, namespace=namespace, body=delete_options
+                    )
             except DynamicApiError as exc:
                 msg = "Failed to delete {kind} {namespace}/{name} due to: {msg}".format(
                     kind=kind, namespace=namespace, name=name, msg=exc.body
@@ -77,94 +211,110 @@ class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
                 self.fail_json(msg=msg)
         return [y if x is None else x + "/" + y for x, y in candidates]
 
+    def patch_objects(self, resource, kind, items, get_patch):
+        """
+        patches the objects for which get_patch returns JSON patch operations, at most workers
+        objects are patched concurrently.
+        an object modified since it was listed is read and its patch computed again.
+        returns the names of the objects updated.
+        """
+        candidates, updates = [], []
+        for item in items:
+            patch = get_patch(item)
+            if patch:
+                namespace = item["metadata"].get("namespace")
+                name = item["metadata"]["name"]
+                candidates.append(namespace + "/" + name if namespace else name)
+                updates.append(item)
+
+        if len(updates) == 0 or self.check_mode:
+            return candidates
+
+        def _patch(item):
+            namespace = item["metadata"].get("namespace")
+            name = item["metadata"]["name"]
+            for attempt in range(CONFLICT_RETRIES):
+                patch = get_patch(item)
+                if not patch:
+                    return None
+                resource_version = item["metadata"].get("resourceVersion")
+                if resource_version:
+                    # the API server rejects the patch with a conflict when the object
+                    # was modified since it was read
+                    patch.append(
+                        dict(
+                            op="replace",
+                            path="/metadata/resourceVersion",
+                            value=resource_version,
+                        )
+                    )
+                try:
+                    with self.stats.timer(kind, "patch"):
+                        return resource.patch(
+                            body=patch,
+                            name=name,
+                            namespace=namespace,
+                            content_type="application/json-patch+json",
+                        )
+                except DynamicApiError as exc:
+                    if exc.status != 409 or attempt == CONFLICT_RETRIES - 1:
+                        raise
+                with self.stats.timer(kind, "get"):
+                    item = resource.get(name=name, namespace=namespace).to_dict()
+
+        errors = []
+        results = run_concurrently(_patch, updates, self.params.get("workers"))
+        for name, (result, exc) in zip(candidates, results):
+            if exc is not None:
+                msg = exc.body if isinstance(exc, DynamicApiError) else to_native(exc)
+                errors.append(
+                    "Failed to patch {kind} {name} due to: {msg}".format(
+                        kind=kind, name=name, msg=msg
+                    )
+                )
+        if errors:
+            self.fail_json(
+                msg="Failed to update {0} {1} object(s)".format(len(errors), kind),
+                errors=errors,
+            )
+        return candidates
+
     def update_resource_binding(self, ref_kind, ref_names, namespaced=False):
         kind = "ClusterRoleBinding"
         api_version = "rbac.authorization.k8s.io/v1"
         if namespaced:
             kind = "RoleBinding"
         resource = self.find_resource(kind=kind, api_version=api_version, fail=True)
-        result = resource.get(name=None, namespace=None).to_dict()
+        with self.stats.timer(kind, "list"):
+            result = resource.get(name=None, namespace=None).to_dict()
         result = result.get("items") if "items" in result else [result]
 
         if len(result) == 0:
             return [], False
 
-        def _update_user_group(binding_namespace, subjects):
-            users, groups = [], []
-            for x in subjects:
-                if x["kind"] == "User":
-                    users.append(x["name"])
-                elif x["kind"] == "Group":
-                    groups.append(x["name"])
-                elif x["kind"] == "ServiceAccount":
-                    namespace = binding_namespace
-                    if x.get("namespace") is not None:
-                        namespace = x.get("namespace")
-                    if namespace is not None:
-                        users.append(
-                            "system:serviceaccount:%s:%s" % (namespace, x["name"])
-                        )
-            return users, groups
-
-        candidates = []
-        changed = False
-        for item in result:
-            subjects = item.get("subjects", [])
-            retainedSubjects = [
-                x for x in subjects if x["kind"] == ref_kind and x["name"] in ref_names
-            ]
-            if len(subjects) != len(retainedSubjects):
-                updated_binding = item
-                updated_binding["subjects"] = retainedSubjects
-                binding_namespace = item["metadata"].get("namespace", None)
-                (
-                    updated_binding["userNames"],
-                    updated_binding["groupNames"],
-                ) = _update_user_group(binding_namespace, retainedSubjects)
-                candidates.append(
-                    binding_namespace + "/" + item["metadata"]["name"]
-                    if binding_namespace
-                    else item["metadata"]["name"]
-                )
-                changed = True
-                if not self.check_mode:
-                    try:
-                        resource.apply(updated_binding, namespace=binding_namespace)
-                    except DynamicApiError as exc:
-                        msg = "Failed to apply object due to: {0}".format(exc.body)
-                        self.fail_json(msg=msg)
-        return candidates, changed
+        candidates = self.patch_objects(
+            resource, kind, result, remove_subjects_patch({ref_kind: ref_names})
+        )
+        return candidates, bool(candidates)
 
     def update_security_context(self, ref_names, key):
         params = {
             "kind": "SecurityContextConstraints",
             "api_version": "security.openshift.io/v1",
         }
-        sccs = self.kubernetes_facts(**params)
+        with self.stats.timer(params["kind"], "list"):
+            sccs = self.kubernetes_facts(**params)
         if not sccs["api_found"]:
             self.fail_json(msg=sccs["msg"])
         sccs = sccs.get("resources")
 
-        candidates = []
-        changed = False
         resource = self.find_resource(
             kind="SecurityContextConstraints", api_version="security.openshift.io/v1"
         )
-        for item in sccs:
-            subjects = item.get(key, [])
-            retainedSubjects = [x for x in subjects if x not in ref_names]
-            if len(subjects) != len(retainedSubjects):
-                candidates.append(item["metadata"]["name"])
-                changed = True
-                if not self.check_mode:
-                    upd_sec_ctx = item
-                    upd_sec_ctx.update({key: retainedSubjects})
-                    try:
-                        resource.apply(upd_sec_ctx, namespace=None)
-                    except DynamicApiError as exc:
-                        msg = "Failed to apply object due to: {0}".format(exc.body)
-                        self.fail_json(msg=msg)
-        return candidates, changed
+        candidates = self.patch_objects(
+            resource, params["kind"], sccs, remove_values_patch(key, ref_names)
+        )
+        return candidates, bool(candidates)
 
     def auth_prune_roles(self):
         params = {
@@ -249,20 +399,95 @@ class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
                     options[attr] = params.get(attr)
         return self.kubernetes_facts(**options)
 
+    def list_user_authorizations(self, resource, names):
+        """
+        returns the OAuthClientAuthorizations of the users, they are listed using a field selector
+        per user when there are only a few users, otherwise all the authorizations are listed page
+        by page and only those of the users are kept.
+        """
+        kind = "OAuthClientAuthorization"
+        if len(names) <= AUTHORIZATION_FIELD_SELECTOR_MAX_USERS:
+            authorizations = []
+            try:
+                for name in sorted(names):
+                    with self.stats.timer(kind, "list"):
+                        result = resource.get(
+                            field_selector="userName=%s" % name
+                        ).to_dict()
+                    authorizations.extend(result.get("items") or [])
+                return authorizations
+            except DynamicApiError as exc:
+                # the field selector is not supported by the API server
+                if exc.status != 400:
+                    self.fail_json(
+                        msg="Failed to list {0} due to: {1}".format(kind, exc.body)
+                    )
+
+        try:
+            # each page request is timed, not the time spent between the pages
+            return [
+                x
+                for x in self.list_pages(resource, stats=self.stats)
+                if x.get("userName") in names
+            ]
+        except DynamicApiError as exc:
+            self.fail_json(msg="Failed to list {0} due to: {1}".format(kind, exc.body))
+
+    def delete_user_authorizations(self, names):
+        """
+        deletes the OAuthClientAuthorizations of the users concurrently and returns their names.
+        """
+        kind = "OAuthClientAuthorization"
+        resource = self.find_resource(kind=kind, api_version="oauth.openshift.io/v1")
+        names = frozenset(names)
+        deleted_auths = [
+            x["metadata"]["name"]
+            for x in self.list_user_authorizations(resource, names)
+        ]
+        if len(deleted_auths) == 0 or self.check_mode:
+            return deleted_auths
+
+        def _delete(auth_name):
+            with self.stats.timer(kind, "delete"):
+                try:
+                    resource.delete(
+                        name=auth_name, namespace=None, body=client.V1DeleteOptions()
+                    )
+                except NotFoundError:
+                    # the authorization was already deleted
+                    pass
+
+        errors = []
+        results = run_concurrently(_delete, deleted_auths, self.params.get("workers"))
+        for auth_name, (result, exc) in zip(deleted_auths, results):
+            if exc is not None:
+                msg = exc.body if isinstance(exc, DynamicApiError) else to_native(exc)
+                errors.append(
+                    "Failed to delete {kind} {name} due to: {msg}".format(
+                        kind=kind, name=auth_name, msg=msg
+                    )
+                )
+        if errors:
+            self.fail_json(
+                msg="Failed to delete {0} {1} object(s)".format(len(errors), kind),
+                errors=errors,
+            )
+        return deleted_auths
+
     def auth_prune_users(self):
         params = {"kind": "User", "api_version": "user.openshift.io/v1"}
         for attr in ("name", "label_selectors"):
             if self.params.get(attr):
                 params[attr] = self.params.get(attr)
 
-        users = self.kubernetes_facts(**params)
+        users = self.kubernetes_facts(**params).get("resources", [])
         if len(users) == 0:
             self.exit_json(
                 changed=False,
                 msg="No resource type 'User' found matching input criteria.",
             )
 
-        names = [x["metadata"]["name"] for x in users]
+        names = frozenset(x["metadata"]["name"] for x in users)
         changed = False
         # Remove the user role binding
         rolebinding, changed_role = self.update_resource_binding(
@@ -280,54 +505,17 @@ class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
         changed = changed or changed_sccs
 
         # Remove the user from groups
-        groups = self.list_groups()
-        deleted_groups = []
+        with self.stats.timer("Group", "list"):
+            groups = self.list_groups().get("resources", [])
         resource = self.find_resource(kind="Group", api_version="user.openshift.io/v1")
-        for grp in groups:
-            subjects = grp.get("users", [])
-            retainedSubjects = [x for x in subjects if x not in names]
-            if len(subjects) != len(retainedSubjects):
-                deleted_groups.append(grp["metadata"]["name"])
-                changed = True
-                if not self.check_mode:
-                    upd_group = grp
-                    upd_group.update({"users": retainedSubjects})
-                    try:
-                        resource.apply(upd_group, namespace=None)
-                    except DynamicApiError as exc:
-                        msg = "Failed to apply object due to: {0}".format(exc.body)
-                        self.fail_json(msg=msg)
+        deleted_groups = self.patch_objects(
+            resource, "Group", groups, remove_values_patch("users", names)
+        )
+        changed = changed or bool(deleted_groups)
 
         # Remove the user's OAuthClientAuthorizations
-        oauth = self.kubernetes_facts(
-            kind="OAuthClientAuthorization", api_version="oauth.openshift.io/v1"
-        )
-        deleted_auths = []
-        resource = self.find_resource(
-            kind="OAuthClientAuthorization", api_version="oauth.openshift.io/v1"
-        )
-        for authorization in oauth:
-            if authorization.get("userName", None) in names:
-                auth_name = authorization["metadata"]["name"]
-                deleted_auths.append(auth_name)
-                changed = True
-                if not self.check_mode:
-                    try:
-                        resource.delete(
-                            name=auth_name,
-                            namespace=None,
-                            body=client.V1DeleteOptions(),
-                        )
-                    except DynamicApiError as exc:
-                        msg = "Failed to delete OAuthClientAuthorization {name} due to: {msg}".format(
-                            name=auth_name, msg=exc.body
-                        )
-                        self.fail_json(msg=msg)
-                    except Exception as e:
-                        msg = "Failed to delete OAuthClientAuthorization {name} due to: {msg}".format(
-                            name=auth_name, msg=to_native(e)
-                        )
-                        self.fail_json(msg=msg)
+        deleted_auths = self.delete_user_authorizations(names)
+        changed = changed or bool(deleted_auths)
 
         self.exit_json(
             changed=changed,
@@ -339,14 +527,14 @@ class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
         )
 
     def auth_prune_groups(self):
-        groups = self.list_groups(params=self.params)
+        groups = self.list_groups(params=self.params).get("resources", [])
         if len(groups) == 0:
             self.exit_json(
                 changed=False,
                 result="No resource type 'Group' found matching input criteria.",
             )
 
-        names = [x["metadata"]["name"] for x in groups]
+        names = frozenset(x["metadata"]["name"] for x in groups)
 
         changed = False
         # Remove the groups role binding
@@ -370,7 +558,118 @@ class OpenShiftAdmPruneAuth(AnsibleOpenshiftModule):
             security_context_constraints=sccs,
         )
 
+    def list_target_objects(self, target):
+        kind, api_version = TARGET_KINDS[target["resource"]]
+        params = {"kind": kind, "api_version": api_version}
+        if target["resource"] == "roles":
+            params["namespace"] = target.get("namespace")
+        for attr in ("name", "label_selectors"):
+            if target.get(attr):
+                params[attr] = target.get(attr)
+        with self.stats.timer(kind, "list"):
+            result = self.kubernetes_facts(**params)
+        if not result["api_found"]:
+            self.fail_json(msg=result["msg"])
+        return result.get("resources", [])
+
+    def list_objects(self, kind, api_version):
+        with self.stats.timer(kind, "list"):
+            result = self.kubernetes_facts(kind=kind, api_version=api_version)
+        if not result["api_found"]:
+            self.fail_json(msg=result["msg"])
+        return result.get("resources", [])
+
+    def auth_prune_targets(self):
+        """
+        prunes the references to all the targets at once, each related kind is listed once and
+        each object referencing several targets is deleted or updated once.
+        """
+        users, groups, roles, clusterroles = set(), set(), set(), set()
+        for target in self.params.get("targets"):
+            for obj in self.list_target_objects(target):
+                name = obj["metadata"]["name"]
+                if target["resource"] == "users":
+                    users.add(name)
+                elif target["resource"] == "groups":
+                    groups.add(name)
+                elif target["resource"] == "roles":
+                    roles.add((obj["metadata"]["namespace"], name))
+                else:
+                    clusterroles.add(name)
+        users, groups = frozenset(users), frozenset(groups)
+        roles, clusterroles = frozenset(roles), frozenset(clusterroles)
+        subjects_patch = remove_subjects_patch({"User": users, "Group": groups})
+
+        def _role_pruned(item):
+            ref = item["roleRef"]
+            if ref["kind"] == "Role":
+                return (item["metadata"].get("namespace"), ref["name"]) in roles
+            return ref["kind"] == "ClusterRole" and ref["name"] in clusterroles
+
+        result = dict(
+            cluster_role_binding=[],
+            role_binding=[],
+            security_context_constraints=[],
+            group=[],
+            authorization=[],
+        )
+
+        # Delete the bindings referencing the pruned roles and remove the pruned
+        # users and groups from the subjects of the others
+        bindings = (
+            ("ClusterRoleBinding", "cluster_role_binding", None, clusterroles),
+            ("RoleBinding", "role_binding", "Foreground", roles or clusterroles),
+        )
+        for kind, key, propagation_policy, pruned_roles in bindings:
+            if not (users or groups or pruned_roles):
+                continue
+            items = self.list_objects(kind, "rbac.authorization.k8s.io/v1")
+            resource = self.find_resource(
+                kind=kind, api_version="rbac.authorization.k8s.io/v1", fail=True
+            )
+            deleted = [
+                (x["metadata"].get("namespace"), x["metadata"]["name"])
+                for x in items
+                if _role_pruned(x)
+            ]
+            result[key] = self.delete_objects(
+                resource, kind, deleted, propagation_policy
+            )
+            result[key] += self.patch_objects(
+                resource,
+                kind,
+                [x for x in items if not _role_pruned(x)],
+                subjects_patch,
+            )
+
+        # Remove the pruned users and groups from the security context constraints
+        if users or groups:
+            kind, api_version = "SecurityContextConstraints", "security.openshift.io/v1"
+            result["security_context_constraints"] = self.patch_objects(
+                self.find_resource(kind=kind, api_version=api_version),
+                kind,
+                self.list_objects(kind, api_version),
+                combine_patches(
+                    remove_values_patch("users", users),
+                    remove_values_patch("groups", groups),
+                ),
+            )
+
+        # Remove the pruned users from the groups and delete their OAuthClientAuthorizations
+        if users:
+            result["group"] = self.patch_objects(
+                self.find_resource(kind="Group", api_version="user.openshift.io/v1"),
+                "Group",
+                self.list_objects("Group", "user.openshift.io/v1"),
+                remove_values_patch("users", users),
+            )
+            result["authorization"] = self.delete_user_authorizations(users)
+
+        self.exit_json(changed=any(result.values()), **result)
+
     def execute_module(self):
+        if self.params.get("targets"):
+            return self.auth_prune_targets()
         auth_prune = {
             "roles": self.auth_prune_roles,
             "clusterroles": self.auth_prune_clusterroles,
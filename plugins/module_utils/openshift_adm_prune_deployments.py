@@ -6,11 +6,15 @@ __metaclass__ = type
 
 from datetime import datetime, timezone
 
-from ansible.module_utils.common.text.converters import to_native
-
 from ansible_collections.community.okd.plugins.module_utils.openshift_common import (
     AnsibleOpenshiftModule,
 )
+from ansible_collections.community.okd.plugins.module_utils.openshift_retention import (
+    most_recent_per_owner,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_stats import (
+    OpenshiftStats,
+)
 
 try:
     from kubernetes import client
@@ -19,6 +23,10 @@ except ImportError as e:
     pass
 
 
+# the label set on the replication controllers created from a DeploymentConfig
+DEPLOYMENT_CONFIG_LABEL = "openshift.io/deployment-config.name"
+
+
 def get_deploymentconfig_for_replicationcontroller(replica_controller):
     # DeploymentConfigAnnotation is an annotation name used to correlate a deployment with the
     # DeploymentConfig on which the deployment is based.
@@ -35,11 +43,100 @@ def get_deploymentconfig_for_replicationcontroller(replica_controller):
         return None
 
 
+def get_deployment_phase(replica_controller):
+    # DeploymentStatusAnnotation is an annotation name used to retrieve the status of a deployment
+    DeploymentStatusAnnotation = "openshift.io/deployment.phase"
+    try:
+        return replica_controller["metadata"]["annotations"].get(
+            DeploymentStatusAnnotation
+        )
+    except Exception:
+        return None
+
+
 class OpenShiftAdmPruneDeployment(AnsibleOpenshiftModule):
     def __init__(self, **kwargs):
         super(OpenShiftAdmPruneDeployment, self).__init__(**kwargs)
+        self.stats = OpenshiftStats()
+        self.__deploymentconfigs = None
+
+    def exit_json(self, **kwargs):
+        if self.params.get("stats"):
+            kwargs["stats"] = self.stats.to_dict()
+        super(OpenShiftAdmPruneDeployment, self).exit_json(**kwargs)
+
+    @property
+    def deploymentconfigs(self):
+        """
+        the (namespace, name) of the existing DeploymentConfigs, listed page by page once.
+        """
+        if self.__deploymentconfigs is None:
+            kind = "DeploymentConfig"
+            resource = self.find_resource(
+                kind=kind, api_version="apps.openshift.io/v1", fail=True
+            )
+            try:
+                self.__deploymentconfigs = frozenset(
+                    (x["metadata"]["namespace"], x["metadata"]["name"])
+                    for x in self.list_pages(
+                        resource,
+                        namespace=self.params.get("namespace"),
+                        stats=self.stats,
+                    )
+                )
+            except DynamicApiError as exc:
+                self.fail_json(
+                    msg="Failed to list {0} due to: {1}".format(kind, exc.body)
+                )
+            self.stats.incr("index", kind, "entries", len(self.__deploymentconfigs))
+        return self.__deploymentconfigs
+
+    def list_replication_controllers(self, resource):
+        """
+        yields the replication controllers created from a DeploymentConfig, listed page by page.
+        """
+        return self.list_pages(
+            resource,
+            namespace=self.params.get("namespace"),
+            label_selector=DEPLOYMENT_CONFIG_LABEL,
+            stats=self.stats,
+        )
+
+    def keep_per_phase(self):
+        """
+        returns the number of complete and failed replication controllers kept per
+        DeploymentConfig according to keep_complete and keep_failed.
+        """
+        keep = {}
+        for phase in ("Complete", "Failed"):
+            if self.params.get("keep_%s" % phase.lower()) is not None:
+                keep[phase] = self.params.get("keep_%s" % phase.lower())
+        return keep
+
+    def not_retained(self, candidates, keep):
+        """
+        returns the candidates which are not among the most recent complete and failed
+        replication controllers kept for each DeploymentConfig.
+        """
+
+        def _owner(obj):
+            deploymentconfig = get_deploymentconfig_for_replicationcontroller(obj)
+            if deploymentconfig is None:
+                return None
+            return (obj["metadata"]["namespace"], deploymentconfig)
+
+        retained = most_recent_per_owner(candidates, _owner, get_deployment_phase, keep)
+        return [
+            obj
+            for obj in candidates
+            if (obj["metadata"]["namespace"], obj["metadata"]["name"]) not in retained
+        ]
 
     def filter_replication_controller(self, replicacontrollers):
+        """
+        yields the replication controllers candidate for pruning.
+        """
+
         def _deployment(obj):
             return get_deploymentconfig_for_replicationcontroller(obj) is not None
 
@@ -47,15 +144,8 @@ class OpenShiftAdmPruneDeployment(AnsibleOpenshiftModule):
             return obj["spec"]["replicas"] == 0 and obj["status"]["replicas"] == 0
 
         def _complete_failed(obj):
-            DeploymentStatusAnnotation = "openshift.io/deployment.phase"
-            try:
-                # validate that replication controller status is either 'Complete' or 'Failed'
-                deployment_phase = obj["metadata"]["annotations"].get(
-                    DeploymentStatusAnnotation
-                )
-                return deployment_phase in ("Failed", "Complete")
-            except Exception:
-                return False
+            # validate that replication controller status is either 'Complete' or 'Failed'
+            return get_deployment_phase(obj) in ("Failed", "Complete")
 
         def _younger(obj):
             creation_timestamp = datetime.strptime(
@@ -66,21 +156,14 @@ class OpenShiftAdmPruneDeployment(AnsibleOpenshiftModule):
             return age > self.params["keep_younger_than"]
 
         def _orphan(obj):
-            try:
-                # verify if the deploymentconfig associated to the replication controller is still existing
-                deploymentconfig_name = get_deploymentconfig_for_replicationcontroller(
-                    obj
-                )
-                params = dict(
-                    kind="DeploymentConfig",
-                    api_version="apps.openshift.io/v1",
-                    name=deploymentconfig_name,
-                    namespace=obj["metadata"]["name"],
-                )
-                exists = self.kubernetes_facts(**params)
-                return not (exists.get["api_found"] and len(exists["resources"]) > 0)
-            except Exception:
-                return False
+            # verify if the deploymentconfig associated to the replication controller is still existing
+            key = (
+                obj["metadata"]["namespace"],
+                get_deploymentconfig_for_replicationcontroller(obj),
+            )
+            orphan = key not in self.deploymentconfigs
+            self.stats.incr("index", "DeploymentConfig", "misses" if orphan else "hits")
+            return orphan
 
         predicates = [_deployment, _zeroReplicaSize, _complete_failed]
         if self.params["orphans"]:
@@ -88,10 +171,9 @@ class OpenShiftAdmPruneDeployment(AnsibleOpenshiftModule):
         if self.params["keep_younger_than"]:
             predicates.append(_younger)
 
-        results = replicacontrollers.copy()
-        for pred in predicates:
-            results = filter(pred, results)
-        return list(results)
+        for obj in replicacontrollers:
+            if all(pred(obj) for pred in predicates):
+                yield obj
 
     def execute_module(self):
         # list replicationcontroller candidate for pruning
@@ -99,39 +181,63 @@ class OpenShiftAdmPruneDeployment(AnsibleOpenshiftModule):
         api_version = "v1"
         resource = self.find_resource(kind=kind, api_version=api_version, fail=True)
 
-        # Get ReplicationController
-        params = dict(
-            kind=kind,
-            api_version="v1",
-            namespace=self.params.get("namespace"),
-        )
-        candidates = self.kubernetes_facts(**params)
-        candidates = self.filter_replication_controller(candidates["resources"])
-
-        if len(candidates) == 0:
-            self.exit_json(changed=False, replication_controllers=[])
-
-        changed = True
-        delete_options = client.V1DeleteOptions(propagation_policy="Background")
-        replication_controllers = []
-        for replica in candidates:
-            try:
-                result = replica
-                if not self.check_mode:
-                    name = replica["metadata"]["name"]
-                    namespace = replica["metadata"]["namespace"]
-                    result = resource.delete(
-                        name=name, namespace=namespace, body=delete_options
-                    ).to_dict()
-                replication_controllers.append(result)
-            except DynamicApiError as exc:
-                msg = "Failed to delete ReplicationController {namespace}/{name} due to: {msg}".format(
-                    namespace=namespace, name=name, msg=exc.body
+        try:
+            if self.params["orphans"]:
+                # list the DeploymentConfigs before streaming the replication controllers
+                self.deploymentconfigs
+            keep = self.keep_per_phase()
+
+            # the replication controllers are listed page by page, the candidates are deleted
+            # as they are found, or once the listing completes when some of them are kept
+            list_errors = []
+
+            def _candidates():
+                # a listing failure stops the deletions, the replication controllers already
+                # deleted are reported
+                try:
+                    candidates = self.filter_replication_controller(
+                        self.list_replication_controllers(resource)
+                    )
+                    if keep:
+                        # the most recent candidates of each DeploymentConfig are kept
+                        candidates = self.not_retained(list(candidates), keep)
+                    for obj in candidates:
+                        yield obj
+                except DynamicApiError as exc:
+                    list_errors.append(exc)
+
+            if self.check_mode:
+                candidates = list(_candidates())
+                if list_errors:
+                    raise list_errors[0]
+                self.exit_json(
+                    changed=len(candidates) > 0, replication_controllers=candidates
                 )
-                self.fail_json(msg=msg)
-            except Exception as e:
-                msg = "Failed to delete ReplicationController {namespace}/{name} due to: {msg}".format(
-                    namespace=namespace, name=name, msg=to_native(e)
-                )
-                self.fail_json(msg=msg)
-        self.exit_json(changed=changed, replication_controllers=replication_controllers)
+
+            delete_options = client.V1DeleteOptions(propagation_policy="Background")
+            deleted, errors, summary = self.delete_objects_concurrently(
+                resource, _candidates(), body=delete_options, stats=self.stats
+            )
+        except DynamicApiError as exc:
+            self.fail_json(msg="Failed to list {0} due to: {1}".format(kind, exc.body))
+
+        replication_controllers = [result for replica, result in deleted]
+        if list_errors:
+            self.fail_json(
+                msg="Failed to list {0} due to: {1}".format(kind, list_errors[0].body),
+                errors=errors,
+                replication_controllers=replication_controllers,
+                summary=summary,
+            )
+        if errors:
+            self.fail_json(
+                msg="Failed to delete {0} ReplicationController(s)".format(len(errors)),
+                errors=errors,
+                replication_controllers=replication_controllers,
+                summary=summary,
+            )
+        self.exit_json(
+            changed=len(replication_controllers) > 0,
+            replication_controllers=replication_controllers,
+            summary=summary,
+        )
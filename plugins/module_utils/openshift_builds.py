@@ -12,6 +12,9 @@ from ansible.module_utils.common.text.converters import to_native
 from ansible_collections.community.okd.plugins.module_utils.openshift_common import (
     AnsibleOpenshiftModule,
 )
+from ansible_collections.community.okd.plugins.module_utils.openshift_retention import (
+    most_recent_per_owner,
+)
 
 try:
     from kubernetes.dynamic.exceptions import DynamicApiError
@@ -19,9 +22,37 @@ except ImportError as e:
     pass
 
 
+# the label set on the builds created from a BuildConfig
+BUILD_CONFIG_LABEL = "openshift.io/build-config.name"
+
+
 class OpenShiftBuilds(AnsibleOpenshiftModule):
     def __init__(self, **kwargs):
         super(OpenShiftBuilds, self).__init__(**kwargs)
+        self.__build_configs = None
+
+    @property
+    def build_configs(self):
+        """
+        the (namespace, name) of the existing BuildConfigs, listed page by page once.
+        """
+        if self.__build_configs is None:
+            kind = "BuildConfig"
+            resource = self.find_resource(
+                kind=kind, api_version="build.openshift.io/v1", fail=True
+            )
+            try:
+                self.__build_configs = frozenset(
+                    (x["metadata"]["namespace"], x["metadata"]["name"])
+                    for x in self.list_pages(
+                        resource, namespace=self.params.get("namespace")
+                    )
+                )
+            except DynamicApiError as exc:
+                self.fail_json(
+                    msg="Failed to list {0} due to: {1}".format(kind, exc.body)
+                )
+        return self.__build_configs
 
     def get_build_config(self, name, namespace):
         params = dict(
@@ -204,27 +235,24 @@ class OpenShiftBuilds(AnsibleOpenshiftModule):
             phases = [p.lower() for p in build_phases]
 
         names = []
+        # the builds listed from the namespace, by name
+        builds = {}
         if self.params.get("build_name"):
             names.append(self.params.get("build_name"))
         else:
             build_config = self.params.get("build_config_name")
-            # list all builds from namespace
+            # list all builds from namespace, or only those of the build config
             params = dict(kind=kind, api_version=api_version, namespace=namespace)
+            if build_config:
+                params["label_selectors"] = [
+                    "%s=%s" % (BUILD_CONFIG_LABEL, build_config)
+                ]
             resources = self.kubernetes_facts(**params).get("resources", [])
 
-            def _filter_builds(build):
-                config = (
-                    build["metadata"]
-                    .get("labels", {})
-                    .get("openshift.io/build-config.name")
-                )
-                return build_config is None or (
-                    build_config is not None and config in build_config
-                )
-
-            for item in list(filter(_filter_builds, resources)):
+            for item in resources:
                 name = item["metadata"]["name"]
-                if name not in names:
+                if name not in builds:
+                    builds[name] = item
                     names.append(name)
 
         if len(names) == 0:
@@ -235,11 +263,13 @@ class OpenShiftBuilds(AnsibleOpenshiftModule):
         warning = []
         builds_to_cancel = []
         for name in names:
-            params = dict(
-                kind=kind, api_version=api_version, name=name, namespace=namespace
-            )
-
-            resource = self.kubernetes_facts(**params).get("resources", [])
+            if name in builds:
+                resource = [builds[name]]
+            else:
+                params = dict(
+                    kind=kind, api_version=api_version, name=name, namespace=namespace
+                )
+                resource = self.kubernetes_facts(**params).get("resources", [])
             if len(resource) == 0:
                 warning.append("Build %s/%s not found" % (namespace, name))
                 continue
@@ -366,8 +396,7 @@ class OpenShiftPruneBuilds(OpenShiftBuilds):
             config = build["status"].get("config", None)
             if not config:
                 return True
-            build_config = self.get_build_config(config["name"], config["namespace"])
-            return len(build_config) == 0
+            return (config["namespace"], config["name"]) not in self.build_configs
 
         def _younger_build(build):
             if not self.max_creation_timestamp:
@@ -377,6 +406,20 @@ class OpenShiftPruneBuilds(OpenShiftBuilds):
             )
             return creation_timestamp < self.max_creation_timestamp
 
+        def _build_config(build):
+            config = build["status"].get("config")
+            if not config:
+                return None
+            return (config["namespace"], config["name"])
+
+        def _phase(build):
+            return "complete" if build["status"]["phase"] == "Complete" else "failed"
+
+        keep = {}
+        for phase in ("complete", "failed"):
+            if self.params.get("keep_%s" % phase) is not None:
+                keep[phase] = self.params.get("keep_%s" % phase)
+
         predicates = [
             _prunable_build,
         ]
@@ -385,40 +428,74 @@ class OpenShiftPruneBuilds(OpenShiftBuilds):
         if self.max_creation_timestamp:
             predicates.append(_younger_build)
 
-        # Get ReplicationController
-        params = dict(
-            kind=kind,
-            api_version=api_version,
-            namespace=self.params.get("namespace"),
-        )
-        result = self.kubernetes_facts(**params)
-        candidates = result["resources"]
-        for pred in predicates:
-            candidates = list(filter(pred, candidates))
-
-        if self.check_mode:
-            changed = len(candidates) > 0
-            self.exit_json(changed=changed, builds=candidates)
-
-        changed = False
-        for build in candidates:
-            changed = True
-            try:
-                name = build["metadata"]["name"]
-                namespace = build["metadata"]["namespace"]
-                resource.delete(name=name, namespace=namespace, body={})
-            except DynamicApiError as exc:
-                msg = "Failed to delete Build %s/%s due to: %s" % (
-                    namespace,
-                    name,
-                    exc.body,
+        namespace = self.params.get("namespace")
+        try:
+            if self.params.get("orphans"):
+                # list the BuildConfigs before streaming the builds
+                self.build_configs
+            if keep:
+                # the most recent candidates of each BuildConfig are kept, only the builds
+                # created from a BuildConfig are listed to find them.
+                retained = most_recent_per_owner(
+                    (
+                        build
+                        for build in self.list_pages(
+                            resource,
+                            namespace=namespace,
+                            label_selector=BUILD_CONFIG_LABEL,
+                        )
+                        if all(pred(build) for pred in predicates)
+                    ),
+                    _build_config,
+                    _phase,
+                    keep,
                 )
-                self.fail_json(msg=msg, status=exc.status, reason=exc.reason)
-            except Exception as e:
-                msg = "Failed to delete Build %s/%s due to: %s" % (
-                    namespace,
-                    name,
-                    to_native(e),
+                predicates.append(
+                    lambda x: (x["metadata"]["namespace"], x["metadata"]["name"])
+                    not in retained
                 )
-                self.fail_json(msg=msg, error=to_native(e), exception=e)
-        self.exit_json(changed=changed, builds=candidates)
+
+            # the builds are listed page by page, the candidates are deleted as they are found
+            list_errors = []
+
+            def _candidates():
+                # a listing failure stops the deletions, the builds already deleted are reported
+                try:
+                    for build in self.list_pages(resource, namespace=namespace):
+                        if all(pred(build) for pred in predicates):
+                            yield build
+                except DynamicApiError as exc:
+                    list_errors.append(exc)
+
+            if self.check_mode:
+                candidates = list(_candidates())
+                if list_errors:
+                    raise list_errors[0]
+                self.exit_json(changed=len(candidates) > 0, builds=candidates)
+
+            deleted, errors, summary = self.delete_objects_concurrently(
+                resource, _candidates(), body={}
+            )
+        except DynamicApiError as exc:
+            msg = "Failed to list Build due to: %s" % exc.body
+            self.fail_json(msg=msg, status=exc.status, reason=exc.reason)
+
+        builds = [build for build, result in deleted]
+        if list_errors:
+            exc = list_errors[0]
+            self.fail_json(
+                msg="Failed to list Build due to: %s" % exc.body,
+                status=exc.status,
+                reason=exc.reason,
+                errors=errors,
+                builds=builds,
+                summary=summary,
+            )
+        if errors:
+            self.fail_json(
+                msg="Failed to delete {0} Build(s)".format(len(errors)),
+                errors=errors,
+                builds=builds,
+                summary=summary,
+            )
+        self.exit_json(changed=len(builds) > 0, builds=builds, summary=summary)
@@ -4,6 +4,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import json
+import time
 import traceback
 from abc import abstractmethod
 
@@ -41,6 +43,35 @@ except ImportError as e:
     k8s_collection_import_exception = e
     K8S_COLLECTION_ERROR = traceback.format_exc()
 
+try:
+    from kubernetes.dynamic.exceptions import (
+        DynamicApiError,
+        GoneError,
+        NotFoundError,
+    )
+except ImportError:
+    pass
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_concurrent import (
+    RateLimiter,
+    iter_concurrently,
+)
+
+
+# the number of objects retrieved per request when listing page by page
+LIST_PAGE_SIZE = 500
+
+
+def _expired_continue(exc):
+    """
+    returns the continue token of the 410 status, used to resume an expired listing from a
+    more recent resource version, or None when the API server did not provide one.
+    """
+    try:
+        return json.loads(exc.body)["metadata"]["continue"] or None
+    except (TypeError, ValueError, KeyError):
+        return None
+
 
 class AnsibleOpenshiftModule(AnsibleK8SModule):
     def __init__(self, **kwargs):
@@ -68,6 +99,111 @@ class AnsibleOpenshiftModule(AnsibleK8SModule):
     def execute_module(self):
         pass
 
+    @staticmethod
+    def list_pages(resource, limit=LIST_PAGE_SIZE, stats=None, **kwargs):
+        """
+        yields the objects of resource matching kwargs (namespace, label_selector, ...) listed
+        page by page, at most limit objects are retrieved per request.
+        the requests are timed in stats when provided.
+        when the continue token expires (410 Gone) because the objects are processed slower
+        than the API server keeps it, the listing resumes from the token of the 410 status or,
+        when there is none, restarts and skips the objects already yielded.
+        """
+
+        def _key(obj):
+            metadata = obj["metadata"]
+            return (metadata.get("namespace") or "", metadata["name"])
+
+        _continue, last, resume_after, restarted = None, None, None, False
+        while True:
+            start = time.monotonic()
+            try:
+                result = resource.get(
+                    limit=limit, _continue=_continue, **kwargs
+                ).to_dict()
+            except GoneError as exc:
+                if not _continue:
+                    raise
+                _continue = _expired_continue(exc)
+                if _continue is None:
+                    if restarted and last == resume_after:
+                        # nothing was yielded since the previous restart
+                        raise
+                    # the objects are listed in (namespace, name) order, those up to the
+                    # last one yielded are skipped
+                    restarted, resume_after = True, last
+                continue
+            finally:
+                if stats is not None:
+                    stats.add(resource.kind, "list", time.monotonic() - start)
+            for item in result.get("items") or []:
+                if resume_after is not None and _key(item) <= resume_after:
+                    continue
+                last = _key(item)
+                yield item
+            _continue = (result.get("metadata") or {}).get("continue")
+            if not _continue:
+                break
+
+    def delete_objects_concurrently(self, resource, objects, body=None, stats=None):
+        """
+        deletes the objects using at most params["workers"] threads, the DELETE requests are
+        limited to params["qps"] per second with bursts of params["burst"] requests.
+        objects can be a generator, the objects already deleted are ignored and the errors are
+        collected instead of stopping at the first one.
+        returns the list of (object, deleted object), the error messages and a summary of the
+        number of objects deleted and failed per namespace with the throughput.
+        """
+        kind = resource.kind
+        limiter = RateLimiter(self.params.get("qps"), self.params.get("burst"))
+
+        def _delete(obj):
+            limiter.wait()
+            start = time.monotonic()
+            try:
+                return resource.delete(
+                    name=obj["metadata"]["name"],
+                    namespace=obj["metadata"].get("namespace"),
+                    body=body,
+                ).to_dict()
+            except NotFoundError:
+                # the object was already deleted
+                return None
+            finally:
+                if stats is not None:
+                    stats.add(kind, "delete", time.monotonic() - start)
+
+        deleted, errors, namespaces = [], [], {}
+        start = time.monotonic()
+        for obj, result, exc in iter_concurrently(
+            _delete, objects, self.params.get("workers")
+        ):
+            namespace = obj["metadata"].get("namespace")
+            counts = namespaces.setdefault(namespace, dict(deleted=0, failed=0))
+            if exc is not None:
+                msg = exc.body if isinstance(exc, DynamicApiError) else to_native(exc)
+                errors.append(
+                    "Failed to delete {kind} {namespace}/{name} due to: {msg}".format(
+                        kind=kind,
+                        namespace=namespace,
+                        name=obj["metadata"]["name"],
+                        msg=msg,
+                    )
+                )
+                counts["failed"] += 1
+            elif result is not None:
+                deleted.append((obj, result))
+                counts["deleted"] += 1
+        elapsed = time.monotonic() - start
+        summary = dict(
+            deleted=len(deleted),
+            failed=len(errors),
+            namespaces=namespaces,
+            time=round(elapsed, 3),
+            throughput=round(len(deleted) / elapsed, 3) if elapsed > 0 else 0.0,
+        )
+        return deleted, errors, summary
+
     def request(self, *args, **kwargs):
         return self.client.client.request(*args, **kwargs)
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_concurrently(func, items, workers=1):
+    """
+    calls func for each item using at most workers threads.
+    returns a list of (result, exception) tuples in the order of items, the exception raised by
+    func is returned instead of being raised so that the caller can report it from the main thread.
+    """
+
+    def _call(item):
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, e
+
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [_call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(_call, items))
+
+
+def iter_concurrently(func, items, workers=1, window=None):
+    """
+    calls func for each item using at most workers threads and yields (item, result, exception)
+    tuples in the order of items as soon as they are available.
+    items can be a generator, it is consumed from the calling thread and at most window items
+    (twice the number of workers by default) are pending at any time.
+    """
+
+    def _call(item):
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, e
+
+    workers = max(workers or 1, 1)
+    window = max(window or 2 * workers, 1)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            pending.append((item, executor.submit(_call, item)))
+            while len(pending) > window:
+                item, future = pending.popleft()
+                yield (item,) + future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield (item,) + future.result()
+
+
+class RateLimiter(object):
+    """
+    RateLimiter is a token bucket limiting the rate of the requests like the client-go one,
+    the bucket holds at most burst tokens and is refilled with qps tokens per second.
+    A qps of 0 disables the rate limiting. It can be shared between threads.
+    """
+
+    def __init__(self, qps, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.qps = float(qps or 0)
+        self.burst = max(burst or 1, 1)
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.tokens = float(self.burst)
+        self.last = clock()
+
+    def wait(self):
+        """
+        takes a token from the bucket, waiting for it to be refilled when it is empty.
+        returns the time waited in seconds.
+        """
+        if self.qps <= 0:
+            return 0.0
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.qps)
+            self.last = now
+            # the token is reserved even when the bucket is empty, so that the callers
+            # are served in the order they called wait()
+            self.tokens -= 1
+            delay = -self.tokens / self.qps if self.tokens < 0 else 0.0
+        if delay > 0:
+            self.sleep(delay)
+        return delay
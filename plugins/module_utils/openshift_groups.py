@@ -8,7 +8,10 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
-from datetime import datetime
+import copy
+import hashlib
+import time
+from datetime import datetime, timedelta
 
 from ansible.module_utils.parsing.convert_bool import boolean
 from ansible.module_utils.common.text.converters import to_native
@@ -21,6 +24,16 @@ from ansible_collections.community.okd.plugins.module_utils.openshift_ldap impor
     OpenshiftLDAPActiveDirectory,
     OpenshiftLDAPAugmentedActiveDirectory,
 )
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap_cache import (
+    OpenshiftLDAPCache,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_concurrent import (
+    iter_concurrently,
+    run_concurrently,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_stats import (
+    OpenshiftStats,
+)
 
 try:
     import ldap
@@ -47,23 +60,75 @@ LDAP_OPENSHIFT_UID_ANNOTATION = "openshift.io/ldap.uid"
 LDAP_OPENSHIFT_SYNCTIME_ANNOTATION = "openshift.io/ldap.sync-time"
 
 
+def ldap_bind(
+    server_uri, bind_dn=None, bind_pw=None, connect_timeout=None, bind_timeout=None
+):
+    """
+    opens a connection to the LDAP server and binds using a simple bind.
+    connect_timeout bounds the network connection to the server and bind_timeout the wait for
+    the bind response, the searches keep the timeout from the LDAP sync configuration.
+    returns the connection and the duration of the bind (in seconds).
+    """
+    connection = ldap.initialize(server_uri)
+    connection.set_option(ldap.OPT_REFERRALS, 0)
+    if connect_timeout:
+        connection.set_option(ldap.OPT_NETWORK_TIMEOUT, connect_timeout)
+    start = time.monotonic()
+    try:
+        msgid = connection.simple_bind(bind_dn, bind_pw)
+        connection.result3(msgid, all=1, timeout=bind_timeout or None)
+    except ldap.LDAPError:
+        ldap_unbind(connection)
+        raise
+    return connection, time.monotonic() - start
+
+
+def ldap_unbind(connection):
+    try:
+        connection.unbind_s()
+    except ldap.LDAPError:
+        pass
+
+
 def connect_to_ldap(
-    module, server_uri, bind_dn=None, bind_pw=None, insecure=True, ca_file=None
+    module,
+    server_uri,
+    bind_dn=None,
+    bind_pw=None,
+    insecure=True,
+    ca_file=None,
+    connect_timeout=None,
+    bind_timeout=None,
+    failover_uris=None,
 ):
+    """
+    binds to server_uri, or to the failover_uris in order when it can not be bound, only the
+    next server is tried when the connection or the bind fails or times out. The servers which
+    could not be bound are reported as warnings.
+    returns the connection and a dict with the url and the bind duration of the server.
+    """
     if insecure:
         ldap.set_option(ldap.OPT_X_TLS_REQUIRE_CERT, ldap.OPT_X_TLS_NEVER)
     elif ca_file:
         ldap.set_option(ldap.OPT_X_TLS_CACERTFILE, ca_file)
-    try:
-        connection = ldap.initialize(server_uri)
-        connection.set_option(ldap.OPT_REFERRALS, 0)
-
-        connection.simple_bind_s(bind_dn, bind_pw)
-        return connection
-    except ldap.LDAPError as e:
-        module.fail_json(
-            msg="Cannot bind to the LDAP server '{0}' due to: {1}".format(server_uri, e)
-        )
+
+    uris = [server_uri] + [x for x in failover_uris or [] if x != server_uri]
+
+    errors = []
+    for uri in uris:
+        try:
+            connection, bind_time = ldap_bind(
+                uri, bind_dn, bind_pw, connect_timeout, bind_timeout
+            )
+        except ldap.LDAPError as exc:
+            errors.append(
+                "Cannot bind to the LDAP server '{0}' due to: {1}".format(uri, exc)
+            )
+            continue
+        for err in errors:
+            module.warn(err)
+        return connection, dict(url=uri, bind_time=bind_time)
+    module.fail_json(msg=", ".join(errors))
 
 
 def validate_group_annotation(definition, host_ip):
@@ -90,6 +155,44 @@ def validate_group_annotation(definition, host_ip):
     return None
 
 
+def group_users_hash(users):
+    """
+    returns a hash of the group users which does not depend on their order.
+    """
+    content = "\n".join(sorted(set(users or [])))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def group_sync_time(group):
+    value = (
+        group["metadata"].get("annotations", {}).get(LDAP_OPENSHIFT_SYNCTIME_ANNOTATION)
+    )
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_group_changed(existing, definition):
+    """
+    returns True when the users, labels or annotations (except the sync time) of the group differ.
+    """
+
+    def _annotations(group):
+        annotations = dict(group["metadata"].get("annotations") or {})
+        annotations.pop(LDAP_OPENSHIFT_SYNCTIME_ANNOTATION, None)
+        return annotations
+
+    return (
+        group_users_hash(existing.get("users"))
+        != group_users_hash(definition.get("users"))
+        or existing["metadata"].get("labels") != definition["metadata"].get("labels")
+        or _annotations(existing) != _annotations(definition)
+    )
+
+
 class OpenshiftLDAPGroups(object):
     kind = "Group"
     version = "user.openshift.io/v1"
@@ -98,6 +201,9 @@ class OpenshiftLDAPGroups(object):
         self.module = module
         self.cache = {}
         self.__group_api = None
+        self.__synced_groups = None
+        self.counts = dict(created=0, updated=0, refreshed=0, unchanged=0)
+        self.changed_names = []
 
     @property
     def k8s_group_api(self):
@@ -112,7 +218,10 @@ class OpenshiftLDAPGroups(object):
             api_version=self.version,
         )
         params.update(kwargs)
-        result = self.module.kubernetes_facts(**params)
+        with self.module.stats.timer(
+            "openshift", "get" if "name" in kwargs else "list"
+        ):
+            result = self.module.kubernetes_facts(**params)
         if len(result["resources"]) == 0:
             return None
         if len(result["resources"]) == 1 and not return_list:
@@ -120,6 +229,21 @@ class OpenshiftLDAPGroups(object):
         else:
             return result["resources"]
 
+    @property
+    def synced_groups(self):
+        """
+        the groups previously synchronized from the LDAP host, indexed by name and retrieved using a single request.
+        """
+        if self.__synced_groups is None:
+            label_selector = "%s=%s" % (LDAP_OPENSHIFT_HOST_LABEL, self.module.host)
+            resources = self.get_group_info(
+                label_selectors=[label_selector], return_list=True
+            )
+            self.__synced_groups = {
+                item["metadata"]["name"]: item for item in resources or []
+            }
+        return self.__synced_groups
+
     def list_groups(self):
         allow_groups = self.module.params.get("allow_groups")
         deny_groups = self.module.params.get("deny_groups")
@@ -132,6 +256,7 @@ class OpenshiftLDAPGroups(object):
 
             allow_groups = _map_group_names(allow_groups)
             deny_groups = _map_group_names(deny_groups)
+        deny_groups = set(deny_groups or [])
 
         host = self.module.host
         netlocation = self.module.netlocation
@@ -141,7 +266,10 @@ class OpenshiftLDAPGroups(object):
             for grp in allow_groups:
                 if grp in deny_groups:
                     continue
-                resource = self.get_group_info(name=grp)
+                resource = self.synced_groups.get(grp)
+                if not resource:
+                    # the group may exist without having been labelled by a previous synchronization
+                    resource = self.get_group_info(name=grp)
                 if not resource:
                     missing.append(grp)
                     continue
@@ -153,9 +281,7 @@ class OpenshiftLDAPGroups(object):
                 )
         else:
             label_selector = "%s=%s" % (LDAP_OPENSHIFT_HOST_LABEL, host)
-            resources = self.get_group_info(
-                label_selectors=[label_selector], return_list=True
-            )
+            resources = list(self.synced_groups.values())
             if not resources:
                 return (
                     None,
@@ -189,7 +315,11 @@ class OpenshiftLDAPGroups(object):
         return self.cache[group_uid]["metadata"]["name"], None
 
     def make_openshift_group(self, group_uid, group_name, usernames):
-        group = self.get_group_info(name=group_name)
+        group = copy.deepcopy(self.synced_groups.get(group_name))
+        if not group:
+            # the group may exist without having been labelled by a synchronization from this
+            # LDAP host, it is checked before being created so that check mode reports it too
+            group = self.get_group_info(name=group_name)
         if not group:
             group = {
                 "apiVersion": "user.openshift.io/v1",
@@ -204,20 +334,29 @@ class OpenshiftLDAPGroups(object):
                 },
             }
 
+        err = self.validate_openshift_group(group, group_uid)
+        if err:
+            return None, err
+
+        # Overwrite Group Users data
+        group["users"] = usernames
+        group["metadata"]["annotations"][
+            LDAP_OPENSHIFT_SYNCTIME_ANNOTATION
+        ] = datetime.now().isoformat()
+        return group, None
+
+    def validate_openshift_group(self, group, group_uid):
+        group_name = group["metadata"]["name"]
         # Make sure we aren't taking over an OpenShift group that is already related to a different LDAP group
         ldaphost_label = (
             group["metadata"].get("labels", {}).get(LDAP_OPENSHIFT_HOST_LABEL)
         )
         if not ldaphost_label or ldaphost_label != self.module.host:
-            return (
-                None,
-                "Group %s: %s label did not match sync host: wanted %s, got %s"
-                % (
-                    group_name,
-                    LDAP_OPENSHIFT_HOST_LABEL,
-                    self.module.host,
-                    ldaphost_label,
-                ),
+            return "Group %s: %s label did not match sync host: wanted %s, got %s" % (
+                group_name,
+                LDAP_OPENSHIFT_HOST_LABEL,
+                self.module.host,
+                ldaphost_label,
             )
 
         ldapurl_annotation = (
@@ -225,14 +364,13 @@ class OpenshiftLDAPGroups(object):
         )
         if not ldapurl_annotation or ldapurl_annotation != self.module.netlocation:
             return (
-                None,
                 "Group %s: %s annotation did not match sync host: wanted %s, got %s"
                 % (
                     group_name,
                     LDAP_OPENSHIFT_URL_ANNOTATION,
                     self.module.netlocation,
                     ldapurl_annotation,
-                ),
+                )
             )
 
         ldapuid_annotation = (
@@ -240,73 +378,147 @@ class OpenshiftLDAPGroups(object):
         )
         if not ldapuid_annotation or ldapuid_annotation != group_uid:
             return (
-                None,
                 "Group %s: %s annotation did not match LDAP UID: wanted %s, got %s"
                 % (
                     group_name,
                     LDAP_OPENSHIFT_UID_ANNOTATION,
                     group_uid,
                     ldapuid_annotation,
-                ),
+                )
+            )
+        return None
+
+    def write_openshift_group(self, definition):
+        name = definition["metadata"]["name"]
+        method = "patch" if name in self.synced_groups else "create"
+        try:
+            with self.module.stats.timer("openshift", method):
+                if method == "patch":
+                    return self.k8s_group_api.patch(definition).to_dict(), None
+                return self.k8s_group_api.create(definition).to_dict(), None
+        except DynamicApiError as exc:
+            if method == "create" and exc.status == 409:
+                # the group exists but was not synchronized from this LDAP host
+                existing = self.get_group_info(name=name)
+                if existing:
+                    group_uid = definition["metadata"]["annotations"].get(
+                        LDAP_OPENSHIFT_UID_ANNOTATION
+                    )
+                    err = self.validate_openshift_group(existing, group_uid)
+                    if err:
+                        return None, err
+            return None, "Failed to %s Group '%s' due to: %s" % (
+                method,
+                name,
+                exc.body,
+            )
+        except Exception as exc:
+            return None, "Failed to %s Group '%s' due to: %s" % (
+                method,
+                name,
+                to_native(exc),
             )
 
-        # Overwrite Group Users data
-        group["users"] = usernames
-        group["metadata"]["annotations"][
-            LDAP_OPENSHIFT_SYNCTIME_ANNOTATION
-        ] = datetime.now().isoformat()
-        return group, None
+    def is_sync_time_expired(self, group):
+        interval = self.module.params.get("sync_time_interval")
+        if interval is None:
+            return False
+        sync_time = group_sync_time(group)
+        return sync_time is None or datetime.now() - sync_time >= timedelta(
+            minutes=interval
+        )
 
-    def create_openshift_groups(self, groups: list):
+    def create_openshift_groups(self, groups, keep_results=True):
+        """
+        creates or updates the groups, which can be provided by a generator, as soon as they are known.
+        only the names of the groups written are kept when keep_results is False.
+        """
         diffs = []
         results = []
         changed = False
-        for definition in groups:
-            name = definition["metadata"]["name"]
-            existing = self.get_group_info(name=name)
-            if not self.module.check_mode:
-                method = "patch" if existing else "create"
-                try:
-                    if existing:
-                        definition = self.k8s_group_api.patch(definition).to_dict()
-                    else:
-                        definition = self.k8s_group_api.create(definition).to_dict()
-                except DynamicApiError as exc:
-                    self.module.fail_json(
-                        msg="Failed to %s Group '%s' due to: %s"
-                        % (method, name, exc.body)
-                    )
-                except Exception as exc:
-                    self.module.fail_json(
-                        msg="Failed to %s Group '%s' due to: %s"
-                        % (method, name, to_native(exc))
-                    )
-            equals = False
-            if existing:
-                equals, diff = self.module.diff_objects(existing, definition)
-                diffs.append(diff)
-            changed = changed or not equals
-            results.append(definition)
+
+        # Only the new groups, the groups whose definition changed and the groups
+        # whose sync time needs to be refreshed are written
+        def _writes():
+            for definition in groups:
+                existing = self.synced_groups.get(definition["metadata"]["name"])
+                if existing is None:
+                    operation = "created"
+                elif is_group_changed(existing, definition):
+                    operation = "updated"
+                elif self.is_sync_time_expired(existing):
+                    operation = "refreshed"
+                else:
+                    self.counts["unchanged"] += 1
+                    if keep_results:
+                        results.append(existing)
+                    continue
+                yield existing, definition, operation
+
+        def _write(write):
+            if self.module.check_mode:
+                return write[1], None
+            return self.write_openshift_group(write[1])
+
+        errors = []
+        # write_openshift_group reports the errors, no exception is raised
+        for (existing, definition, operation), written, exc in iter_concurrently(
+            _write, _writes(), workers=self.module.params.get("workers")
+        ):
+            result, err = written
+            if err:
+                errors.append(err)
+                continue
+            self.counts[operation] += 1
+            self.changed_names.append(definition["metadata"]["name"])
+            changed = True
+            if keep_results:
+                if existing:
+                    equals, diff = self.module.diff_objects(existing, result)
+                    diffs.append(diff)
+                results.append(result)
+        if errors:
+            self.module.fail_json(
+                msg="Failed to create or update Groups: %s" % errors[0],
+                errors=errors,
+            )
         return results, diffs, changed
 
     def delete_openshift_group(self, name: str):
         result = dict(kind=self.kind, apiVersion=self.version, metadata=dict(name=name))
         if not self.module.check_mode:
             try:
-                result = self.k8s_group_api.delete(name=name).to_dict()
+                with self.module.stats.timer("openshift", "delete"):
+                    result = self.k8s_group_api.delete(name=name).to_dict()
             except DynamicApiError as exc:
-                self.module.fail_json(
-                    msg="Failed to delete Group '{0}' due to: {1}".format(
-                        name, exc.body
-                    )
+                return None, "Failed to delete Group '{0}' due to: {1}".format(
+                    name, exc.body
                 )
             except Exception as exc:
-                self.module.fail_json(
-                    msg="Failed to delete Group '{0}' due to: {1}".format(
-                        name, to_native(exc)
-                    )
+                return None, "Failed to delete Group '{0}' due to: {1}".format(
+                    name, to_native(exc)
                 )
-        return result
+        return result, None
+
+    def delete_openshift_groups(self, names: list):
+        # delete_openshift_group reports the errors, no exception is raised
+        deleted = run_concurrently(
+            self.delete_openshift_group,
+            names,
+            workers=self.module.params.get("workers"),
+        )
+        results = []
+        errors = []
+        for (result, err), exc in deleted:
+            if err:
+                errors.append(err)
+            else:
+                results.append(result)
+        if errors:
+            self.module.fail_json(
+                msg="Failed to delete Groups: %s" % errors[0], errors=errors
+            )
+        return results
 
 
 class OpenshiftGroupsSync(AnsibleOpenshiftModule):
@@ -314,11 +526,14 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
         super(OpenshiftGroupsSync, self).__init__(**kwargs)
         self.__k8s_group_api = None
         self.__ldap_connection = None
+        self.ldap_server = None
         self.host = None
         self.port = None
         self.netlocation = None
         self.scheme = None
         self.config = self.params.get("sync_config")
+        self.ldap_cache = None
+        self.stats = OpenshiftStats()
 
         if not HAS_PYTHON_LDAP:
             self.fail_json(
@@ -348,8 +563,12 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
                 bind_pw=self.config.get("bindPassword"),
                 insecure=boolean(self.config.get("insecure")),
                 ca_file=self.config.get("ca"),
+                connect_timeout=self.params.get("connect_timeout"),
+                bind_timeout=self.params.get("bind_timeout"),
+                failover_uris=self.params.get("failover_urls"),
             )
-            self.__ldap_connection = connect_to_ldap(**params)
+            with self.stats.timer("ldap", "bind"):
+                self.__ldap_connection, self.ldap_server = connect_to_ldap(**params)
         return self.__ldap_connection
 
     def close_connection(self):
@@ -359,6 +578,14 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
 
     def exit_json(self, **kwargs):
         self.close_connection()
+        if self.ldap_cache:
+            err = self.ldap_cache.save()
+            if err:
+                self.warn(err)
+        if self.ldap_server:
+            kwargs["ldap_server"] = self.ldap_server
+        if self.params.get("stats"):
+            kwargs["stats"] = self.stats.to_dict()
         self.module.exit_json(**kwargs)
 
     def fail_json(self, **kwargs):
@@ -367,15 +594,47 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
 
     def get_syncer(self):
         syncer = None
+        params = dict(
+            config=self.config,
+            ldap_connection=self.connection,
+            stats=self.stats,
+            nested=self.params.get("nested_groups"),
+        )
         if "rfc2307" in self.config:
-            syncer = OpenshiftLDAPRFC2307(self.config, self.connection)
+            syncer = OpenshiftLDAPRFC2307(**params)
         elif "activeDirectory" in self.config:
-            syncer = OpenshiftLDAPActiveDirectory(self.config, self.connection)
+            syncer = OpenshiftLDAPActiveDirectory(**params)
         elif "augmentedActiveDirectory" in self.config:
-            syncer = OpenshiftLDAPAugmentedActiveDirectory(self.config, self.connection)
+            syncer = OpenshiftLDAPAugmentedActiveDirectory(**params)
         else:
             msg = "No schema-specific config was found, should be one of 'rfc2307', 'activeDirectory', 'augmentedActiveDirectory'"
             self.fail_json(msg=msg)
+
+        cache_path = self.params.get("cache_path")
+        if cache_path:
+            self.ldap_cache = OpenshiftLDAPCache(
+                path=cache_path,
+                url=self.config.get("url"),
+                max_age=self.params.get("cache_max_age"),
+            )
+            err = self.ldap_cache.load()
+            if err:
+                self.warn(err)
+            if (
+                "rfc2307" not in self.config
+                and self.params.get("cache_mode") == "timestamp"
+            ):
+                self.warn(
+                    "The user entries are not cached with cache_mode=timestamp for the"
+                    " Active Directory schemas, the changes of group membership do not"
+                    " update the modifyTimestamp of the users, use cache_mode=dirsync instead."
+                )
+            with self.stats.timer("phases", "load_cache"):
+                err = syncer.load_cache(
+                    self.ldap_cache, mode=self.params.get("cache_mode")
+                )
+            if err:
+                self.fail_json(msg="Failed to refresh LDAP cache: %s" % err)
         return syncer
 
     def synchronize(self):
@@ -388,22 +647,67 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
         syncer = self.get_syncer()
 
         # Determine what to sync : list groups
-        if sync_group_type == "openshift":
-            groups_uids, err = ldap_openshift_group.list_groups()
-            if err:
-                self.fail_json(msg="Failed to list openshift groups", errors=err)
-        else:
-            # List LDAP Group to synchronize
-            groups_uids = self.params.get("allow_groups")
-            if not groups_uids:
-                groups_uids, err = syncer.list_groups()
+        with self.stats.timer("phases", "list_groups"):
+            if sync_group_type == "openshift":
+                groups_uids, err = ldap_openshift_group.list_groups()
                 if err:
-                    self.module.fail_json(msg=err)
-            deny_groups = self.params.get("deny_groups")
-            if deny_groups:
-                groups_uids = [uid for uid in groups_uids if uid not in deny_groups]
+                    self.fail_json(msg="Failed to list openshift groups", errors=err)
+            else:
+                # List LDAP Group to synchronize
+                groups_uids = self.params.get("allow_groups")
+                if not groups_uids:
+                    groups_uids, err = syncer.list_groups()
+                    if err:
+                        self.module.fail_json(msg=err)
+                deny_groups = set(self.params.get("deny_groups") or [])
+                if deny_groups:
+                    groups_uids = [uid for uid in groups_uids if uid not in deny_groups]
+
+        # Only synchronize the groups changed since the previous run
+        changed_groups = syncer.changed_groups() if self.ldap_cache else None
+        if changed_groups is not None:
+            groups_uids = [uid for uid in groups_uids if uid in changed_groups]
+
+        # Retrieve the members of the groups at once, the groups whose members could not be
+        # determined are searched one by one
+        with self.stats.timer("phases", "prefetch_groups"):
+            err = syncer.prefetch_groups(list(groups_uids))
+        if err:
+            self.warn("Unable to retrieve LDAP groups at once: %s" % err)
+
+        openshift_groups = self.extract_groups(
+            syncer, ldap_openshift_group, groups_uids
+        )
+        streaming = self.params.get("streaming")
+        return_groups = self.params.get("return_groups")
+        if return_groups is None:
+            return_groups = not streaming
+        if streaming:
+            # Each group is written as soon as its members are resolved
+            with self.stats.timer("phases", "sync_groups"):
+                results, diffs, changed = ldap_openshift_group.create_openshift_groups(
+                    openshift_groups, keep_results=return_groups
+                )
+        else:
+            with self.stats.timer("phases", "extract_members"):
+                openshift_groups = list(openshift_groups)
+            # Create Openshift Groups
+            with self.stats.timer("phases", "write_groups"):
+                results, diffs, changed = ldap_openshift_group.create_openshift_groups(
+                    openshift_groups, keep_results=return_groups
+                )
+        self.exit_json(
+            changed=changed,
+            groups=results,
+            counts=ldap_openshift_group.counts,
+            changed_groups=ldap_openshift_group.changed_names,
+        )
 
-        openshift_groups = []
+    def extract_groups(self, syncer, ldap_openshift_group, groups_uids):
+        """
+        yields the Openshift group definition of each LDAP group.
+        """
+        sync_group_type = self.module.params.get("type")
         for uid in groups_uids:
             # Get membership data
             member_entries, err = syncer.extract_members(uid)
@@ -437,49 +741,50 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
             )
             if err:
                 self.fail_json(msg=err)
-            openshift_groups.append(group)
-
-        # Create Openshift Groups
-        results, diffs, changed = ldap_openshift_group.create_openshift_groups(
-            openshift_groups
-        )
-        self.module.exit_json(changed=True, groups=results)
+            yield group
 
     def prune(self):
         ldap_openshift_group = OpenshiftLDAPGroups(module=self)
-        groups_uids, err = ldap_openshift_group.list_groups()
+        with self.stats.timer("phases", "list_groups"):
+            groups_uids, err = ldap_openshift_group.list_groups()
         if err:
             self.fail_json(msg="Failed to list openshift groups", errors=err)
 
         # Get Synchronize object
         syncer = self.get_syncer()
 
-        changed = False
-        groups = []
-        for uid in groups_uids:
-            # Check if LDAP group exist
-            exists, err = syncer.is_ldapgroup_exists(uid)
-            if err:
-                msg = "Error determining LDAP group existence for group %s: %s" % (
-                    uid,
-                    err,
-                )
-                self.module.fail_json(msg=msg)
+        # Retrieve the LDAP groups at once, the groups whose existence could not be
+        # determined are checked one by one
+        with self.stats.timer("phases", "prefetch_groups"):
+            err = syncer.prefetch_groups(groups_uids)
+        if err:
+            self.warn("Unable to retrieve LDAP groups at once: %s" % err)
 
-            if exists:
-                continue
+        names = []
+        with self.stats.timer("phases", "check_groups"):
+            for uid in groups_uids:
+                # Check if LDAP group exist
+                exists, err = syncer.is_ldapgroup_exists(uid)
+                if err:
+                    msg = "Error determining LDAP group existence for group %s: %s" % (
+                        uid,
+                        err,
+                    )
+                    self.module.fail_json(msg=msg)
 
-            # if the LDAP entry that was previously used to create the group doesn't exist, prune it
-            group_name, err = ldap_openshift_group.get_group_name_for_uid(uid)
-            if err:
-                self.module.fail_json(msg=err)
+                if exists:
+                    continue
 
-            # Delete Group
-            result = ldap_openshift_group.delete_openshift_group(group_name)
-            groups.append(result)
-            changed = True
+                # if the LDAP entry that was previously used to create the group doesn't exist, prune it
+                group_name, err = ldap_openshift_group.get_group_name_for_uid(uid)
+                if err:
+                    self.module.fail_json(msg=err)
+                names.append(group_name)
 
-        self.exit_json(changed=changed, groups=groups)
+        # Delete Groups
+        with self.stats.timer("phases", "delete_groups"):
+            groups = ldap_openshift_group.delete_openshift_groups(names)
+        self.exit_json(changed=bool(groups), groups=groups)
 
     def execute_module(self):
         # validate LDAP sync configuration
@@ -503,6 +808,13 @@ class OpenshiftGroupsSync(AnsibleOpenshiftModule):
             )
             self.scheme = result["scheme"]
 
+        for url in self.params.get("failover_urls") or []:
+            result, error = ldap_split_host_port(url)
+            if error:
+                self.fail_json(
+                    msg="Failed to parse failover url='{0}': {1}".format(url, error)
+                )
+
         if self.params.get("state") == "present":
             self.synchronize()
         else:
@@ -10,9 +10,21 @@ __metaclass__ = type
 
 import os
 import copy
+import re
+import time
+from functools import lru_cache
 
 from ansible.module_utils.parsing.convert_bool import boolean
 
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap_cache import (
+    ldap_delta_refresh,
+    ldap_dirsync_changed_objects,
+    ldap_normalize_attributes,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_stats import (
+    OpenshiftStats,
+)
+
 try:
     import ldap
 except ImportError as e:
@@ -21,6 +33,36 @@ except ImportError as e:
 
 LDAP_SEARCH_OUT_OF_SCOPE_ERROR = "trying to search by DN for an entry that exists outside of the tree specified with the BaseDN for search"
 
+# Maximum number of values combined into a single search filter (or of searches sent before
+# waiting for their results) when looking up several entries at once
+LDAP_SEARCH_CHUNK_SIZE = 100
+
+# Maximum number of DNs kept in their parsed form
+LDAP_DN_CACHE_SIZE = 65536
+
+# Characters escaped from the values of a search filter (RFC4515), the non ASCII characters
+# are escaped using their UTF-8 encoding
+LDAP_FILTER_ESCAPE_TABLE = dict((ord(c), "\\%02x" % ord(c)) for c in "\x00()*\\")
+LDAP_FILTER_NON_ASCII = re.compile("[^\x00-\x7f]+")
+
+# Active Directory returns the values of large multi-valued attributes by range (e.g. 'member;range=0-1499')
+LDAP_RANGE_OPTION = ";range="
+
+# Active Directory matching rule which walks the chain of ancestry of the entries (e.g. nested groups),
+# used as 'memberOf:1.2.840.113556.1.4.1941:=<group DN>'
+LDAP_MATCHING_RULE_IN_CHAIN = "1.2.840.113556.1.4.1941"
+
+
+def openshift_ldap_membership_attribute(attribute, nested=False):
+    """
+    returns the name of the attribute holding the memberships and the attribute used in the search filters,
+    which can hold a matching rule (e.g. 'memberOf:1.2.840.113556.1.4.1941:').
+    """
+    name = attribute.split(":", 1)[0]
+    if nested and ":" not in attribute:
+        attribute = "%s:%s:" % (attribute, LDAP_MATCHING_RULE_IN_CHAIN)
+    return name, attribute
+
 
 def validate_ldap_sync_config(config):
     # Validate url
@@ -211,27 +253,105 @@ def openshift_ldap_build_base_query(config):
 
 
 def openshift_ldap_get_attribute_for_entry(entry, attribute):
+    """
+    returns the values of the first attribute found for an entry normalized using openshift_ldap_normalize_entry.
+    """
     attributes = [attribute]
     if isinstance(attribute, list):
         attributes = attribute
     for k in attributes:
-        if k.lower() == "dn":
+        k = k.lower()
+        if k == "dn":
             return entry[0]
-        v = entry[1].get(k, None)
+        v = entry[1].get(k)
         if v:
-            if isinstance(v, list):
-                result = []
-                for x in v:
-                    if hasattr(x, "decode"):
-                        result.append(x.decode("utf-8"))
-                    else:
-                        result.append(x)
-                return result
-            else:
-                return v.decode("utf-8") if hasattr(v, "decode") else v
+            return v
     return ""
 
 
+def openshift_ldap_get_username_for_entry(entry, attributes, usernames):
+    """
+    returns the OpenShift user name of a user entry, the names are cached by DN in usernames
+    since a user is usually a member of several groups.
+    """
+    username = usernames.get(entry[0])
+    if username is None:
+        username = openshift_ldap_get_attribute_for_entry(entry, attributes)
+        if not username:
+            return (
+                None,
+                "The user entry (%s) does not map to a OpenShift User name with the given mapping"
+                % (entry,),
+            )
+        usernames[entry[0]] = username
+    return username, None
+
+
+def openshift_ldap_attrlist(attributes):
+    """
+    returns the list of attributes to request from the LDAP server, the DN is part of every entry and
+    is not requested as an attribute. '1.1' is used to request no attribute instead of all of them.
+    """
+    attrlist = [x for x in attributes if x.lower() != "dn"]
+    return attrlist or ["1.1"]
+
+
+def openshift_ldap_get_ranged_values(connection, dn, name, current_range):
+    """
+    returns the values of a multi-valued attribute following the provided range.
+    """
+    values = []
+    prefix = name + LDAP_RANGE_OPTION
+    while not current_range.endswith("-*"):
+        start = int(current_range.split("-")[1]) + 1
+        result = connection.search_ext_s(
+            dn,
+            ldap.SCOPE_BASE,
+            "(objectClass=*)",
+            ["%s%s%d-*" % (name, LDAP_RANGE_OPTION, start)],
+        )
+        current_range = None
+        for k, v in (result[0][1] if result else {}).items():
+            k = k.lower()
+            if k.startswith(prefix):
+                values += ldap_normalize_attributes({k: v})[k]
+                current_range = k.split(LDAP_RANGE_OPTION, 1)[1]
+        if current_range is None:
+            break
+    return values
+
+
+def openshift_ldap_normalize_entry(connection, entry):
+    """
+    returns the entry with the attribute names lower-cased and the values decoded once for all,
+    the attributes returned by range are retrieved entirely.
+    """
+    dn, attributes = entry
+    attributes = ldap_normalize_attributes(attributes)
+    for key in [k for k in attributes if LDAP_RANGE_OPTION in k]:
+        values = attributes.pop(key)
+        name, current_range = key.split(LDAP_RANGE_OPTION, 1)
+        values += openshift_ldap_get_ranged_values(connection, dn, name, current_range)
+        attributes[name] = attributes.get(name, []) + values
+    return dn, attributes
+
+
+def openshift_ldap_normalize_entries(connection, entries):
+    # search continuation references are returned with no DN
+    return [
+        openshift_ldap_normalize_entry(connection, entry)
+        for entry in entries
+        if entry[0] is not None
+    ]
+
+
+def openshift_ldap_get_uid_for_entry(entry, attribute):
+    uid = openshift_ldap_get_attribute_for_entry(entry, attribute)
+    if isinstance(uid, list):
+        uid = uid[0] if uid else None
+    return uid
+
+
 def ldap_split_host_port(hostport):
     """
     ldap_split_host_port splits a network address of the form "host:port",
@@ -271,7 +391,9 @@ def openshift_ldap_query_for_entries(connection, qry, unique_entry=True):
     if derefAlias:
         ldap.set_option(ldap.OPT_DEREF, derefAlias)
     try:
-        result = connection.search_ext_s(**qry)
+        result = openshift_ldap_normalize_entries(
+            connection, connection.search_ext_s(**qry)
+        )
         if not result or len(result) == 0:
             return None, "Entry not found for base='{0}' and filter='{1}'".format(
                 qry["base"], qry["filterstr"]
@@ -295,35 +417,53 @@ def openshift_ldap_query_for_entries(connection, qry, unique_entry=True):
         )
 
 
-def openshift_equal_dn_objects(dn_obj, other_dn_obj):
-    if len(dn_obj) != len(other_dn_obj):
-        return False
+def openshift_ldap_query_modified_entries(connection, qry, attributes, since):
+    """
+    returns the entries matching the query which have been modified on the LDAP server
+    since the provided GeneralizedTime.
+    """
+    params = copy.deepcopy(qry)
+    modified = "(modifyTimestamp>=%s)" % since
+    qry_filter = params.get("filterstr")
+    params["filterstr"] = "(&%s%s)" % (qry_filter, modified) if qry_filter else modified
+    params["attrlist"] = openshift_ldap_attrlist(attributes)
+
+    entries, err = openshift_ldap_query_for_entries(
+        connection=connection, qry=params, unique_entry=False
+    )
+    if err:
+        if err.startswith("Entry not found"):
+            return [], None
+        return None, err
+    return entries, None
 
-    for k, v in enumerate(dn_obj):
-        if len(v) != len(other_dn_obj[k]):
-            return False
-        for j, item in enumerate(v):
-            if not (item == other_dn_obj[k][j]):
-                return False
-    return True
 
+@lru_cache(maxsize=LDAP_DN_CACHE_SIZE)
+def openshift_ldap_dn_tuple(dn):
+    """
+    returns the DN parsed into a tuple of RDNs, each RDN being a tuple of (attribute, value, type),
+    the result is memoized as the same member DNs are checked for each group.
+    """
+    return tuple(tuple(tuple(ava) for ava in rdn) for rdn in ldap.dn.str2dn(dn))
 
-def openshift_equal_dn(dn, other):
-    dn_obj = ldap.dn.str2dn(dn)
-    other_dn_obj = ldap.dn.str2dn(other)
 
-    return openshift_equal_dn_objects(dn_obj, other_dn_obj)
+def openshift_ldap_dn_in_base(dn_tuple, base_tuple):
+    """
+    returns True when the DN is the base DN or one of its descendants.
+    """
+    depth = len(dn_tuple) - len(base_tuple)
+    return depth >= 0 and dn_tuple[depth:] == base_tuple
 
 
-def openshift_ancestorof_dn(dn, other):
-    dn_obj = ldap.dn.str2dn(dn)
-    other_dn_obj = ldap.dn.str2dn(other)
+def openshift_equal_dn(dn, other):
+    return openshift_ldap_dn_tuple(dn) == openshift_ldap_dn_tuple(other)
 
-    if len(dn_obj) >= len(other_dn_obj):
-        return False
-    # Take the last attribute from the other DN to compare against
-    return openshift_equal_dn_objects(
-        dn_obj, other_dn_obj[len(other_dn_obj) - len(dn_obj):]  # fmt: skip
+
+def openshift_ancestorof_dn(dn, other):
+    dn_tuple = openshift_ldap_dn_tuple(dn)
+    other_tuple = openshift_ldap_dn_tuple(other)
+    return len(dn_tuple) < len(other_tuple) and openshift_ldap_dn_in_base(
+        other_tuple, dn_tuple
     )
 
 
@@ -336,47 +476,75 @@ class OpenshiftLDAPQueryOnAttribute(object):
         # and conjoined with "objectClass=groupOfNames", becomes (&(objectClass=groupOfNames)(cn=aGroupName))")
         self.query_attribute = attribute
 
+        # the parts of the request which do not depend on the searched value are computed once
+        self.is_dn_query = attribute.lower() == "dn"
+        # the entries matching an extensible filter (e.g. 'memberOf:1.2.840.113556.1.4.1941:=<uid>')
+        # can not be related to the searched value from their attributes
+        self.has_matching_rule = ":" in attribute
+        self.escaped_attribute = self.escape_filter(attribute)
+        self.template = dict(self.qry)
+        if self.is_dn_query:
+            self.template["scope"] = ldap.SCOPE_BASE
+            # filter that returns all values
+            self.template["filterstr"] = "(objectClass=*)"
+            self.filter_prefix, self.filter_suffix = None, None
+        else:
+            qry_filter = self.qry.get("filterstr")
+            self.filter_prefix = "(%s=" % self.escaped_attribute
+            self.filter_suffix = ")"
+            if qry_filter:
+                self.filter_prefix = "(&%s%s" % (qry_filter, self.filter_prefix)
+                self.filter_suffix = "))"
+        self.__base_dn_tuple = None
+        self.__attrlists = {}
+
     @staticmethod
     def escape_filter(buffer):
         """
         escapes from the provided LDAP filter string the special
-        characters in the set '(', ')', '*', \\ and those out of the range 0 < c < 0x80, as defined in RFC4515.
-        """
-        output = []
-        hex_string = "0123456789abcdef"
-        for c in buffer:
-            if ord(c) > 0x7F or c in ("(", ")", "\\", "*") or c == 0:
-                first = ord(c) >> 4
-                second = ord(c) & 0xF
-                output += ["\\", hex_string[first], hex_string[second]]
-            else:
-                output.append(c)
-        return "".join(output)
+        characters in the set '(', ')', '*', \\, NUL and those out of the range 0 <= c < 0x80, as defined in RFC4515.
+        """
+        output = buffer.translate(LDAP_FILTER_ESCAPE_TABLE)
+        try:
+            output.encode("ascii")
+            return output
+        except UnicodeEncodeError:
+            pass
+        return LDAP_FILTER_NON_ASCII.sub(
+            lambda m: "".join("\\%02x" % b for b in m.group(0).encode("utf-8")),
+            output,
+        )
+
+    def in_scope(self, dn):
+        """
+        returns True when the entry identified by dn can be retrieved using the base DN of the query.
+        """
+        if self.__base_dn_tuple is None:
+            self.__base_dn_tuple = openshift_ldap_dn_tuple(self.qry["base"])
+        return openshift_ldap_dn_in_base(
+            openshift_ldap_dn_tuple(dn), self.__base_dn_tuple
+        )
+
+    def attrlist(self, attributes):
+        key = tuple(attributes)
+        if key not in self.__attrlists:
+            self.__attrlists[key] = openshift_ldap_attrlist(attributes)
+        return self.__attrlists[key]
 
     def build_request(self, ldapuid, attributes):
-        params = copy.deepcopy(self.qry)
-        if self.query_attribute.lower() == "dn":
+        params = dict(self.template)
+        if self.is_dn_query:
             if ldapuid:
-                if not openshift_equal_dn(
-                    ldapuid, params["base"]
-                ) and not openshift_ancestorof_dn(params["base"], ldapuid):
+                if not self.in_scope(ldapuid):
                     return None, LDAP_SEARCH_OUT_OF_SCOPE_ERROR
                 params["base"] = ldapuid
-            params["scope"] = ldap.SCOPE_BASE
-            # filter that returns all values
-            params["filterstr"] = "(objectClass=*)"
-            params["attrlist"] = attributes
         else:
             # Builds the query containing a filter that conjoins the common filter given
             # in the configuration with the specific attribute filter for which the attribute value is given
-            specificFilter = "%s=%s" % (
-                self.escape_filter(self.query_attribute),
-                self.escape_filter(ldapuid),
+            params["filterstr"] = "".join(
+                (self.filter_prefix, self.escape_filter(ldapuid), self.filter_suffix)
             )
-            qry_filter = params.get("filterstr", None)
-            if qry_filter:
-                params["filterstr"] = "(&%s(%s))" % (qry_filter, specificFilter)
-            params["attrlist"] = attributes
+        params["attrlist"] = self.attrlist(attributes)
         return params, None
 
     def ldap_search(self, connection, ldapuid, required_attributes, unique_entry=True):
@@ -389,7 +557,9 @@ class OpenshiftLDAPQueryOnAttribute(object):
             ldap.set_option(ldap.OPT_DEREF, derefAlias)
 
         try:
-            result = connection.search_ext_s(**query)
+            result = openshift_ldap_normalize_entries(
+                connection, connection.search_ext_s(**query)
+            )
             if not result or len(result) == 0:
                 return None, "Entry not found for base='{0}' and filter='{1}'".format(
                     query["base"], query["filterstr"]
@@ -410,6 +580,98 @@ class OpenshiftLDAPQueryOnAttribute(object):
         except Exception as err:
             return None, "Request %s failed due to: %s" % (query, err)
 
+    def ldap_search_many(
+        self, connection, ldapuids, required_attributes, chunk_size=None
+    ):
+        """
+        returns the entries matching each of the provided uids as a dict, the uids for which the
+        result can not be determined reliably are not part of it.
+        the filters of a chunk of uids are combined into a single search, when the uid is the DN
+        or the filter uses a matching rule the searches of a chunk are sent before waiting for their results.
+        """
+        chunk_size = chunk_size or LDAP_SEARCH_CHUNK_SIZE
+        params = dict(self.qry)
+        derefAlias = params.pop("derefAlias", None)
+        if derefAlias:
+            ldap.set_option(ldap.OPT_DEREF, derefAlias)
+        params["attrlist"] = self.attrlist(required_attributes)
+
+        result = {}
+        try:
+            for i in range(0, len(ldapuids), chunk_size):
+                chunk = ldapuids[i : i + chunk_size]  # noqa: E203
+                if self.is_dn_query:
+                    result.update(self.search_dn_chunk(connection, params, chunk))
+                elif self.has_matching_rule:
+                    result.update(self.search_each_chunk(connection, params, chunk))
+                else:
+                    result.update(self.search_filter_chunk(connection, params, chunk))
+        except Exception as err:
+            return None, "Request %s failed due to: %s" % (params, err)
+        return result, None
+
+    def search_dn_chunk(self, connection, params, ldapuids):
+        result = {}
+        msgids = []
+        for uid in ldapuids:
+            if not self.in_scope(uid):
+                result[uid] = []
+                continue
+            msgid = connection.search_ext(
+                uid, ldap.SCOPE_BASE, "(objectClass=*)", params["attrlist"]
+            )
+            msgids.append((uid, msgid))
+        for uid, msgid in msgids:
+            try:
+                rtype, rdata, rmsgid, serverctrls = connection.result3(msgid)
+                result[uid] = openshift_ldap_normalize_entries(connection, rdata)
+            except ldap.NO_SUCH_OBJECT:
+                result[uid] = []
+        return result
+
+    def search_each_chunk(self, connection, params, ldapuids):
+        msgids = []
+        for uid in ldapuids:
+            query = dict(params)
+            query["filterstr"] = "".join(
+                (self.filter_prefix, self.escape_filter(uid), self.filter_suffix)
+            )
+            msgids.append((uid, connection.search_ext(**query)))
+        result = {}
+        for uid, msgid in msgids:
+            rtype, rdata, rmsgid, serverctrls = connection.result3(msgid)
+            result[uid] = openshift_ldap_normalize_entries(connection, rdata)
+        return result
+
+    def search_filter_chunk(self, connection, params, ldapuids):
+        specificFilter = "(|%s)" % "".join(
+            "(%s=%s)" % (self.escaped_attribute, self.escape_filter(uid))
+            for uid in ldapuids
+        )
+        query = dict(params)
+        qry_filter = query.get("filterstr")
+        query["filterstr"] = (
+            "(&%s%s)" % (qry_filter, specificFilter) if qry_filter else specificFilter
+        )
+        entries = openshift_ldap_normalize_entries(
+            connection, connection.search_ext_s(**query)
+        )
+
+        uids = {uid.lower(): uid for uid in ldapuids}
+        result = {}
+        complete = True
+        for entry in entries:
+            values = openshift_ldap_get_attribute_for_entry(entry, self.query_attribute)
+            matches = [uids[v.lower()] for v in values if v.lower() in uids]
+            # the server may return the value in a different form than the one provided
+            complete = complete and bool(matches)
+            for uid in matches:
+                result.setdefault(uid, []).append(entry)
+        if complete:
+            for uid in ldapuids:
+                result.setdefault(uid, [])
+        return result
+
 
 class OpenshiftLDAPQuery(object):
     def __init__(self, qry):
@@ -418,7 +680,7 @@ class OpenshiftLDAPQuery(object):
 
     def build_request(self, attributes):
         params = copy.deepcopy(self.qry)
-        params["attrlist"] = attributes
+        params["attrlist"] = openshift_ldap_attrlist(attributes)
         return params
 
     def ldap_search(self, connection, required_attributes):
@@ -429,7 +691,9 @@ class OpenshiftLDAPQuery(object):
             ldap.set_option(ldap.OPT_DEREF, derefAlias)
 
         try:
-            result = connection.search_ext_s(**query)
+            result = openshift_ldap_normalize_entries(
+                connection, connection.search_ext_s(**query)
+            )
             if not result or len(result) == 0:
                 return None, "Entry not found for base='{0}' and filter='{1}'".format(
                     query["base"], query["filterstr"]
@@ -454,6 +718,7 @@ class OpenshiftLDAPInterface(object):
         userQuery,
         userNameAttributes,
         config,
+        nested=False,
     ):
         self.connection = connection
         self.groupQuery = copy.deepcopy(groupQuery)
@@ -482,37 +747,193 @@ class OpenshiftLDAPInterface(object):
 
         self.cached_groups = {}
         self.cached_users = {}
+        self.missing_groups = set()
+        # set once every group of the groups query is part of cached_groups
+        self.groups_listed = False
+        # nested groups: the direct (users, subgroups) and the transitive members of each group
+        self.nested = nested
+        self.direct_members = {}
+        self.nested_members = {}
+        self.groups_cache = None
+        self.users_cache = None
+        self.cache_mode = None
+        self.stats = OpenshiftStats()
+
+    def load_cache(self, cache, mode="timestamp"):
+        """
+        load_cache seeds the user entries with the ones persisted by a previous synchronization,
+        the entries modified since then on the LDAP server are fetched again.
+        """
+        self.cache_mode = mode
+        if mode != "timestamp":
+            return self.load_delta_cache(cache, mode)
+
+        section = cache.section(self.userQuery.qry, self.required_user_attributes)
+        since = section.modified_since()
+        if since:
+            with self.stats.timer("ldap", "modified_users"):
+                entries, err = openshift_ldap_query_modified_entries(
+                    self.connection,
+                    self.userQuery.qry,
+                    self.required_user_attributes,
+                    since,
+                )
+            if err:
+                return err
+            for entry in entries:
+                # users are retrieved one by one, only refresh the ones already known
+                if entry[0] in section.entries:
+                    section.add(entry)
+
+        for entry in section.items():
+            uid = openshift_ldap_get_uid_for_entry(
+                entry, self.userQuery.query_attribute
+            )
+            if uid:
+                self.cached_users[uid] = entry
+        self.users_cache = section
+        return None
+
+    def load_delta_cache(self, cache, mode):
+        """
+        load_delta_cache applies the changes made on the LDAP server since the previous synchronization
+        to the persisted group and user entries, the entries are then served from the cache.
+        """
+        self.groups_cache = cache.section(
+            self.groupQuery.qry, self.required_group_attributes
+        )
+        self.users_cache = cache.section(
+            self.userQuery.qry, self.required_user_attributes
+        )
+        for section, query, attributes in (
+            (self.groups_cache, self.groupQuery, self.required_group_attributes),
+            (self.users_cache, self.userQuery, self.required_user_attributes),
+        ):
+            with self.stats.timer("ldap", "delta_refresh"):
+                err = ldap_delta_refresh(
+                    self.connection,
+                    mode,
+                    query.qry,
+                    openshift_ldap_attrlist(attributes),
+                    section,
+                )
+            if err:
+                return err
+
+        for entry in self.groups_cache.items():
+            uid = openshift_ldap_get_uid_for_entry(
+                entry, self.groupQuery.query_attribute
+            )
+            if uid:
+                self.cached_groups[uid] = entry
+        for entry in self.users_cache.items():
+            uid = openshift_ldap_get_uid_for_entry(
+                entry, self.userQuery.query_attribute
+            )
+            if uid:
+                self.cached_users[uid] = entry
+        return None
+
+    def changed_groups(self):
+        """
+        returns the UIDs of the groups whose entry or members have changed since the previous
+        synchronization, None when the changes are unknown.
+        """
+        if self.groups_cache is None or not (
+            self.groups_cache.incremental and self.users_cache.incremental
+        ):
+            return None
+        # a change of membership also changes the members of the groups containing the group
+        if self.nested:
+            return None
+
+        changed = set()
+        for dn in self.groups_cache.changes:
+            if dn in self.groups_cache.entries:
+                uid = openshift_ldap_get_uid_for_entry(
+                    (dn, self.groups_cache.entries[dn]), self.groupQuery.query_attribute
+                )
+                if uid:
+                    changed.add(uid)
+
+        users = set()
+        for dn, previous in self.users_cache.changes.items():
+            for attributes in (previous, self.users_cache.entries.get(dn)):
+                if attributes is not None:
+                    uid = openshift_ldap_get_uid_for_entry(
+                        (dn, attributes), self.userQuery.query_attribute
+                    )
+                    if uid:
+                        users.add(uid)
+        if users:
+            for uid, group in self.cached_groups.items():
+                for attribute in self.groupMembershipAttributes:
+                    members = openshift_ldap_get_attribute_for_entry(group, attribute)
+                    if not isinstance(members, list):
+                        members = [members]
+                    if users.intersection(members):
+                        changed.add(uid)
+                        break
+        return changed
 
     def get_group_entry(self, uid):
         """
         get_group_entry returns an LDAP group entry for the given group UID by searching the internal cache
         of the LDAPInterface first, then sending an LDAP query if the cache did not contain the entry.
         """
+        cached = uid in self.cached_groups or uid in self.missing_groups
+        self.stats.hit("cached_groups", cached)
         if uid in self.cached_groups:
             return self.cached_groups.get(uid), None
+        if uid in self.missing_groups:
+            return None, "Entry not found for group uid '%s'" % uid
 
-        group, err = self.groupQuery.ldap_search(
-            self.connection, uid, self.required_group_attributes
-        )
+        with self.stats.timer("ldap", "group_entry"):
+            group, err = self.groupQuery.ldap_search(
+                self.connection, uid, self.required_group_attributes
+            )
         if err:
             return None, err
         self.cached_groups[uid] = group
         return group, None
 
+    def prefetch_groups(self, uids):
+        """
+        retrieves the group entries for the given UIDs using as few LDAP requests as possible,
+        the following calls to get_group_entry are answered without querying the LDAP server.
+        """
+        uids = [uid for uid in uids if uid not in self.cached_groups]
+        with self.stats.timer("ldap", "group_entries"):
+            entries, err = self.groupQuery.ldap_search_many(
+                self.connection, uids, self.required_group_attributes
+            )
+        if err:
+            return err
+        for uid, found in entries.items():
+            if len(found) == 1:
+                self.cached_groups[uid] = found[0]
+            elif not found:
+                self.missing_groups.add(uid)
+        return None
+
     def get_user_entry(self, uid):
         """
         get_user_entry returns an LDAP group entry for the given user UID by searching the internal cache
         of the LDAPInterface first, then sending an LDAP query if the cache did not contain the entry.
         """
+        self.stats.hit("cached_users", uid in self.cached_users)
         if uid in self.cached_users:
             return self.cached_users.get(uid), None
 
-        entry, err = self.userQuery.ldap_search(
-            self.connection, uid, self.required_user_attributes
-        )
+        with self.stats.timer("ldap", "user_entry"):
+            entry, err = self.userQuery.ldap_search(
+                self.connection, uid, self.required_user_attributes
+            )
         if err:
             return None, err
         self.cached_users[uid] = entry
+        if self.users_cache is not None and self.cache_mode == "timestamp":
+            self.users_cache.add(entry)
         return entry, None
 
     def exists(self, ldapuid):
@@ -520,58 +941,182 @@ class OpenshiftLDAPInterface(object):
         return bool(group), error
 
     def list_groups(self):
+        if self.groups_cache is not None:
+            # the group entries are up to date with the LDAP server
+            group_uids = []
+            for entry in self.groups_cache.items():
+                uid = openshift_ldap_get_uid_for_entry(
+                    entry, self.groupQuery.query_attribute
+                )
+                if not uid:
+                    return None, "Unable to find LDAP group uid for entry %s" % entry
+                group_uids.append(uid)
+            self.groups_listed = True
+            return group_uids, None
+
         group_qry = copy.deepcopy(self.groupQuery.qry)
         group_qry["attrlist"] = self.required_group_attributes
 
-        groups, err = openshift_ldap_query_for_entries(
-            connection=self.connection, qry=group_qry, unique_entry=False
-        )
+        with self.stats.timer("ldap", "group_list"):
+            groups, err = openshift_ldap_query_for_entries(
+                connection=self.connection, qry=group_qry, unique_entry=False
+            )
         if err:
             return None, err
 
         group_uids = []
         for entry in groups:
-            uid = openshift_ldap_get_attribute_for_entry(
+            uid = openshift_ldap_get_uid_for_entry(
                 entry, self.groupQuery.query_attribute
             )
             if not uid:
                 return None, "Unable to find LDAP group uid for entry %s" % entry
             self.cached_groups[uid] = entry
             group_uids.append(uid)
+        self.groups_listed = True
         return group_uids, None
 
     def extract_members(self, uid):
         """
         returns the LDAP member entries for a group specified with a ldapGroupUID
         """
+        if self.nested:
+            return self.extract_nested_members(uid)
+        members, subgroups, err = self.extract_direct_members(uid)
+        return members, err
+
+    def maybe_group_uid(self, uid):
+        """
+        returns True when the member uid can not be classified without searching the groups query.
+        """
+        if uid in self.cached_groups or uid in self.missing_groups:
+            return False
+        if self.groups_listed or uid in self.cached_users:
+            return False
+        return not self.groupQuery.is_dn_query or self.groupQuery.in_scope(uid)
+
+    def is_group_uid(self, uid):
+        """
+        returns True when the member uid refers to a group, only the uids which may be part of the groups
+        query are searched and the result is kept for the whole synchronization.
+        """
+        if uid in self.cached_groups:
+            return True
+        if not self.maybe_group_uid(uid):
+            return False
+        group, err = self.get_group_entry(uid)
+        if not group:
+            self.missing_groups.add(uid)
+        return bool(group)
+
+    def extract_direct_members(self, uid):
+        """
+        returns the user entries and, for nested groups, the uids of the groups which are members of a group.
+        """
         # Get group entry from LDAP
         group, err = self.get_group_entry(uid)
         if err:
-            return None, err
+            return None, None, err
 
         # Extract member UIDs from group entry
         member_uids = []
         for attribute in self.groupMembershipAttributes:
             member_uids += openshift_ldap_get_attribute_for_entry(group, attribute)
 
+        if self.nested:
+            # the members which may be groups are classified using a single batched search
+            # instead of searching the groups query before each user
+            unknown = [x for x in member_uids if self.maybe_group_uid(x)]
+            if unknown:
+                err = self.prefetch_groups(unknown)
+                if err:
+                    return None, None, err
+
         members = []
+        subgroups = []
         for user_uid in member_uids:
+            if self.nested and self.is_group_uid(user_uid):
+                subgroups.append(user_uid)
+                continue
             entry, err = self.get_user_entry(user_uid)
             if err:
                 if self.tolerate_not_found and err.startswith("Entry not found"):
                     continue
                 elif err == LDAP_SEARCH_OUT_OF_SCOPE_ERROR:
                     continue
-                return None, err
+                return None, None, err
             members.append(entry)
 
-        return members, None
+        return members, subgroups, None
+
+    def extract_nested_members(self, uid):
+        """
+        returns the members of a group and of its nested groups. The transitive closure is computed once
+        per synchronization for the group and every group it contains, the groups part of a cycle share
+        the same members (Tarjan's strongly connected components).
+        """
+        if uid not in self.nested_members:
+            state = dict(index={}, low={}, stack=[], on_stack=set())
+            err = self.expand_group(uid, state)
+            if err:
+                return None, err
+        return self.nested_members[uid], None
+
+    def expand_group(self, uid, state):
+        index, low = state["index"], state["low"]
+        index[uid] = low[uid] = len(index)
+        state["stack"].append(uid)
+        state["on_stack"].add(uid)
+
+        if uid not in self.direct_members:
+            users, subgroups, err = self.extract_direct_members(uid)
+            if err:
+                return err
+            self.direct_members[uid] = (users, subgroups)
+        for subgroup in self.direct_members[uid][1]:
+            if subgroup in self.nested_members:
+                continue
+            if subgroup not in index:
+                err = self.expand_group(subgroup, state)
+                if err:
+                    return err
+                low[uid] = min(low[uid], low[subgroup])
+            elif subgroup in state["on_stack"]:
+                low[uid] = min(low[uid], index[subgroup])
+
+        if low[uid] == index[uid]:
+            # uid is the root of a strongly connected component whose groups were all expanded
+            component = []
+            while True:
+                group_uid = state["stack"].pop()
+                state["on_stack"].discard(group_uid)
+                component.append(group_uid)
+                if group_uid == uid:
+                    break
+            members = {}
+            for group_uid in component:
+                users, subgroups = self.direct_members[group_uid]
+                for entry in users:
+                    members.setdefault(entry[0], entry)
+                for subgroup in subgroups:
+                    for entry in self.nested_members.get(subgroup, []):
+                        members.setdefault(entry[0], entry)
+            members = list(members.values())
+            for group_uid in component:
+                self.nested_members[group_uid] = members
+        return None
 
 
 class OpenshiftLDAPRFC2307(object):
-    def __init__(self, config, ldap_connection):
+    def __init__(self, config, ldap_connection, stats=None, nested=False):
         self.config = config
+        self.nested = nested
         self.ldap_interface = self.create_ldap_interface(ldap_connection)
+        if stats is not None:
+            self.ldap_interface.stats = stats
+        # user names resolved during the synchronization, by user DN
+        self.usernames = {}
+        self.group_name_mapping = self.config.get("groupUIDNameMapping") or {}
 
     def create_ldap_interface(self, connection):
         segment = self.config.get("rfc2307")
@@ -593,26 +1138,19 @@ class OpenshiftLDAPRFC2307(object):
             userQuery=users_query,
             userNameAttributes=segment["userNameAttributes"],
             config=segment,
+            nested=self.nested,
         )
         return OpenshiftLDAPInterface(**params)
 
     def get_username_for_entry(self, entry):
-        username = openshift_ldap_get_attribute_for_entry(
-            entry, self.ldap_interface.userNameAttributes
+        return openshift_ldap_get_username_for_entry(
+            entry, self.ldap_interface.userNameAttributes, self.usernames
         )
-        if not username:
-            return (
-                None,
-                "The user entry (%s) does not map to a OpenShift User name with the given mapping"
-                % entry,
-            )
-        return username, None
 
     def get_group_name_for_uid(self, uid):
         # Get name from User defined mapping
-        groupuid_name_mapping = self.config.get("groupUIDNameMapping")
-        if groupuid_name_mapping and uid in groupuid_name_mapping:
-            return groupuid_name_mapping.get(uid), None
+        if uid in self.group_name_mapping:
+            return self.group_name_mapping[uid], None
         elif self.ldap_interface.groupNameAttributes:
             group, err = self.ldap_interface.get_group_entry(uid)
             if err:
@@ -646,27 +1184,53 @@ class OpenshiftLDAPRFC2307(object):
             return True, None
         return False, None
 
+    def prefetch_groups(self, uids):
+        return self.ldap_interface.prefetch_groups(uids)
+
     def list_groups(self):
         return self.ldap_interface.list_groups()
 
     def extract_members(self, uid):
         return self.ldap_interface.extract_members(uid)
 
+    def load_cache(self, cache, mode="timestamp"):
+        return self.ldap_interface.load_cache(cache, mode)
+
+    def changed_groups(self):
+        return self.ldap_interface.changed_groups()
+
 
 class OpenshiftLDAP_ADInterface(object):
-    def __init__(self, connection, user_query, group_member_attr, user_name_attr):
+    def __init__(
+        self, connection, user_query, group_member_attr, user_name_attr, nested=False
+    ):
         self.connection = connection
         self.userQuery = user_query
-        self.groupMembershipAttributes = group_member_attr
         self.userNameAttributes = user_name_attr
 
-        self.required_user_attributes = self.userNameAttributes or []
+        # the memberships are read from the attributes, the members of a group are searched
+        # using the filter attributes which hold the in chain matching rule for nested groups
+        self.groupMembershipAttributes = []
+        self.membershipFilterAttributes = []
+        for attr in group_member_attr:
+            name, filter_attr = openshift_ldap_membership_attribute(attr, nested)
+            self.groupMembershipAttributes.append(name)
+            self.membershipFilterAttributes.append(filter_attr)
+        self.in_chain = (
+            self.groupMembershipAttributes != self.membershipFilterAttributes
+        )
+
+        self.required_user_attributes = list(self.userNameAttributes or [])
         for attr in self.groupMembershipAttributes:
             if attr not in self.required_user_attributes:
                 self.required_user_attributes.append(attr)
 
         self.cache = {}
         self.cache_populated = False
+        self.listed_groups = None
+        self.users_cache = None
+        self.cache_mode = None
+        self.stats = OpenshiftStats()
 
     def is_entry_present(self, cache_item, entry):
         for item in cache_item:
@@ -674,50 +1238,299 @@ class OpenshiftLDAP_ADInterface(object):
                 return True
         return False
 
-    def populate_cache(self):
-        if not self.cache_populated:
-            self.cache_populated = True
+    def load_cache(self, cache, mode="timestamp"):
+        """
+        load_cache attaches the user entries persisted by a previous synchronization and applies
+        the changes made on the LDAP server since then.
+        memberOf is a back link maintained by the server, adding a user to a group or removing it
+        does not change the modifyTimestamp of the user entry, the timestamp mode is then ignored
+        and the user entries are searched again on each run.
+        """
+        self.cache_mode = mode
+        if mode == "timestamp":
+            return None
+        self.users_cache = cache.section(
+            self.userQuery.qry, self.required_user_attributes
+        )
+
+        with self.stats.timer("ldap", "delta_refresh"):
+            err = ldap_delta_refresh(
+                self.connection,
+                mode,
+                self.userQuery.qry,
+                openshift_ldap_attrlist(self.required_user_attributes),
+                self.users_cache,
+            )
+        if not err and mode == "dirsync":
+            err = self.refresh_membership(cache)
+        return err
+
+    def refresh_membership(self, cache):
+        """
+        memberOf is a back link attribute which is not tracked by the DirSync control, the membership
+        of the users is read again for the groups whose member attribute has changed.
+        """
+        section = cache.section(dict(filterstr="(objectClass=group)"), ["member"])
+        with self.stats.timer("ldap", "delta_refresh"):
+            groups, err = ldap_dirsync_changed_objects(
+                self.connection, "(objectClass=group)", ["member"], section
+            )
+        if err or not groups or not self.users_cache.incremental:
+            return err
+
+        for group_dn in groups:
+            members = {}
+            for attr in self.groupMembershipAttributes:
+                query_on_attribute = OpenshiftLDAPQueryOnAttribute(
+                    self.userQuery.qry, attr
+                )
+                with self.stats.timer("ldap", "group_members"):
+                    entries, error = query_on_attribute.ldap_search(
+                        self.connection,
+                        group_dn,
+                        self.required_user_attributes,
+                        unique_entry=False,
+                    )
+                if error and "not found" not in error:
+                    return error
+                for entry in entries or []:
+                    members[entry[0]] = entry
+
+            for dn, attributes in self.users_cache.items():
+                if dn in members:
+                    self.users_cache.apply(dn, members[dn][1])
+                    continue
+                # remove the group from the users which are not part of it anymore
+                updated = dict(attributes)
+                for attr in self.groupMembershipAttributes:
+                    attr = attr.lower()
+                    if group_dn in updated.get(attr, []):
+                        updated[attr] = [x for x in updated[attr] if x != group_dn]
+                if updated != attributes:
+                    self.users_cache.apply(dn, updated)
+        return None
+
+    def changed_groups(self):
+        """
+        returns the UIDs of the groups whose members have changed since the previous synchronization,
+        None when the changes are unknown.
+        """
+        section = self.users_cache
+        if section is None or self.cache_mode == "timestamp" or not section.incremental:
+            return None
+        # a change of membership also changes the members of the groups containing the group
+        if self.in_chain:
+            return None
+
+        changed = set()
+        for dn, previous in section.changes.items():
+            for attributes in (previous, section.entries.get(dn)):
+                if attributes is None:
+                    continue
+                for attr in self.groupMembershipAttributes:
+                    uids = openshift_ldap_get_attribute_for_entry(
+                        (dn, attributes), attr
+                    )
+                    if not isinstance(uids, list):
+                        uids = [uids]
+                    changed.update(x for x in uids if x)
+        return changed
+
+    def search_users(self):
+        section = self.users_cache
+        if section is not None and section.complete:
+            # the entries have been refreshed when loading the cache
+            return section.items(), None
+
+        with self.stats.timer("ldap", "user_list"):
             entries, err = self.userQuery.ldap_search(
                 self.connection, self.required_user_attributes
             )
+        if err:
+            return None, err
+        if section is not None:
+            section.reset(entries, timestamp=time.time())
+        return entries, None
+
+    def index_members(self, entries, uids=None):
+        """
+        builds the group -> member entries reverse index from the membership attributes of the user entries.
+        when uids is provided, only those groups are indexed and the second value returned is False if
+        an entry does not reference any of them (the server returned the value in a different form).
+        """
+        index = {}
+        seen = set()
+        complete = True
+        if uids is not None:
+            uids = {uid.lower(): uid for uid in uids}
+        for entry in entries:
+            matched = False
+            for group_attr in self.groupMembershipAttributes:
+                values = openshift_ldap_get_attribute_for_entry(entry, group_attr)
+                if not isinstance(values, list):
+                    values = [values]
+                for uid in values:
+                    # users without membership attribute are not part of any group
+                    if not uid:
+                        continue
+                    if uids is not None:
+                        uid = uids.get(uid.lower())
+                        if uid is None:
+                            continue
+                    matched = True
+                    if (uid, entry[0]) not in seen:
+                        seen.add((uid, entry[0]))
+                        index.setdefault(uid, []).append(entry)
+            complete = complete and matched
+        return index, complete
+
+    def populate_cache(self):
+        if not self.cache_populated:
+            self.cache_populated = True
+            entries, err = self.search_users()
             if err:
                 return err
 
-            for entry in entries:
-                for group_attr in self.groupMembershipAttributes:
-                    uids = openshift_ldap_get_attribute_for_entry(entry, group_attr)
-                    if not isinstance(uids, list):
-                        uids = [uids]
-                    for uid in uids:
-                        if uid not in self.cache:
-                            self.cache[uid] = []
-                        if not self.is_entry_present(self.cache[uid], entry):
-                            self.cache[uid].append(entry)
+            index, complete = self.index_members(entries)
+            if self.in_chain:
+                # the users hold their direct memberships, the members of the nested groups are
+                # searched for each group
+                self.listed_groups = list(index)
+                return None
+            for uid, members in index.items():
+                if uid not in self.cache:
+                    self.cache[uid] = members
+                    continue
+                for entry in members:
+                    if not self.is_entry_present(self.cache[uid], entry):
+                        self.cache[uid].append(entry)
         return None
 
     def list_groups(self):
         err = self.populate_cache()
         if err:
             return None, err
+        if self.listed_groups is not None:
+            return self.listed_groups, None
         result = []
         if self.cache:
             result = self.cache.keys()
         return result, None
 
+    def build_members_query(self, uids):
+        """
+        returns the user search matching the members of any of the groups, for any of the membership attributes.
+        """
+        escape_filter = OpenshiftLDAPQueryOnAttribute.escape_filter
+        attributes = [escape_filter(attr) for attr in self.groupMembershipAttributes]
+        specific_filter = "(|%s)" % "".join(
+            "(%s=%s)" % (attr, escape_filter(uid))
+            for uid in uids
+            for attr in attributes
+        )
+        query = dict(self.userQuery.qry)
+        qry_filter = query.get("filterstr")
+        query["filterstr"] = (
+            "(&%s%s)" % (qry_filter, specific_filter) if qry_filter else specific_filter
+        )
+        query["attrlist"] = openshift_ldap_attrlist(self.required_user_attributes)
+        return query
+
+    def prefetch_groups(self, uids):
+        """
+        retrieves the members of the given groups using a single user search for each chunk of groups,
+        the group -> members reverse index is built from the membership attributes of the users returned
+        and the following calls to extract_members are answered without querying the LDAP server.
+        """
+        if self.in_chain:
+            return self.prefetch_nested_groups(uids)
+        if self.users_cache is not None and self.users_cache.complete:
+            return self.populate_cache()
+
+        uids = [uid for uid in uids if uid and uid not in self.cache]
+        if not uids:
+            return None
+        chunk_size = max(
+            LDAP_SEARCH_CHUNK_SIZE // len(self.groupMembershipAttributes), 1
+        )
+        for i in range(0, len(uids), chunk_size):
+            chunk = uids[i : i + chunk_size]  # noqa: E203
+            query = self.build_members_query(chunk)
+            derefAlias = query.pop("derefAlias", None)
+            if derefAlias:
+                ldap.set_option(ldap.OPT_DEREF, derefAlias)
+            try:
+                with self.stats.timer("ldap", "group_members"):
+                    entries = openshift_ldap_normalize_entries(
+                        self.connection, self.connection.search_ext_s(**query)
+                    )
+            except Exception as err:
+                return "Request %s failed due to: %s" % (query, err)
+
+            index, complete = self.index_members(entries, chunk)
+            # the groups of this chunk are searched one by one by extract_members
+            if not complete:
+                continue
+            for uid in chunk:
+                self.cache[uid] = index.get(uid, [])
+        return None
+
+    def prefetch_nested_groups(self, uids):
+        """
+        the members of nested groups are searched using the in chain matching rule, the entries returned
+        can not be related to a group when several groups are combined in a filter, the searches of a
+        chunk of groups are sent before waiting for their results instead.
+        """
+        uids = [uid for uid in uids if uid and uid not in self.cache]
+        members = {}
+        for attr in self.membershipFilterAttributes:
+            query_on_attribute = OpenshiftLDAPQueryOnAttribute(self.userQuery.qry, attr)
+            with self.stats.timer("ldap", "group_members"):
+                entries, error = query_on_attribute.ldap_search_many(
+                    self.connection, uids, self.required_user_attributes
+                )
+            if error:
+                return error
+            for uid, found in entries.items():
+                if uid not in members:
+                    members[uid] = list(found)
+                    continue
+                for entry in found:
+                    if not self.is_entry_present(members[uid], entry):
+                        members[uid].append(entry)
+        self.cache.update(members)
+        return None
+
     def extract_members(self, uid):
         # ExtractMembers returns the LDAP member entries for a group specified with a ldapGroupUID
         # if we already have it cached, return the cached value
+        self.stats.hit("cached_members", uid in self.cache)
         if uid in self.cache:
             return self.cache[uid], None
 
+        # The user entries persisted by a previous run hold the membership of every group
+        if (
+            self.users_cache is not None
+            and self.users_cache.complete
+            and not self.in_chain
+        ):
+            err = self.populate_cache()
+            if err:
+                return None, err
+            return self.cache.get(uid, []), None
+
         # This happens in cases where we did not list out every group.
         # In that case, we're going to be asked about specific groups.
         users_in_group = []
-        for attr in self.groupMembershipAttributes:
+        for attr in self.membershipFilterAttributes:
             query_on_attribute = OpenshiftLDAPQueryOnAttribute(self.userQuery.qry, attr)
-            entries, error = query_on_attribute.ldap_search(
-                self.connection, uid, self.required_user_attributes, unique_entry=False
-            )
+            with self.stats.timer("ldap", "group_members"):
+                entries, error = query_on_attribute.ldap_search(
+                    self.connection,
+                    uid,
+                    self.required_user_attributes,
+                    unique_entry=False,
+                )
             if error and "not found" not in error:
                 return None, error
             if not entries:
@@ -732,9 +1545,14 @@ class OpenshiftLDAP_ADInterface(object):
 
 
 class OpenshiftLDAPActiveDirectory(object):
-    def __init__(self, config, ldap_connection):
+    def __init__(self, config, ldap_connection, stats=None, nested=False):
         self.config = config
+        self.nested = nested
         self.ldap_interface = self.create_ldap_interface(ldap_connection)
+        if stats is not None:
+            self.ldap_interface.stats = stats
+        # user names resolved during the synchronization, by user DN
+        self.usernames = {}
 
     def create_ldap_interface(self, connection):
         segment = self.config.get("activeDirectory")
@@ -746,19 +1564,13 @@ class OpenshiftLDAPActiveDirectory(object):
             user_query=user_query,
             group_member_attr=segment["groupMembershipAttributes"],
             user_name_attr=segment["userNameAttributes"],
+            nested=self.nested,
         )
 
     def get_username_for_entry(self, entry):
-        username = openshift_ldap_get_attribute_for_entry(
-            entry, self.ldap_interface.userNameAttributes
+        return openshift_ldap_get_username_for_entry(
+            entry, self.ldap_interface.userNameAttributes, self.usernames
         )
-        if not username:
-            return (
-                None,
-                "The user entry (%s) does not map to a OpenShift User name with the given mapping"
-                % entry,
-            )
-        return username, None
 
     def get_group_name_for_uid(self, uid):
         return uid, None
@@ -770,12 +1582,21 @@ class OpenshiftLDAPActiveDirectory(object):
         exists = members and len(members) > 0
         return exists, None
 
+    def prefetch_groups(self, uids):
+        return self.ldap_interface.prefetch_groups(uids)
+
     def list_groups(self):
         return self.ldap_interface.list_groups()
 
     def extract_members(self, uid):
         return self.ldap_interface.extract_members(uid)
 
+    def load_cache(self, cache, mode="timestamp"):
+        return self.ldap_interface.load_cache(cache, mode)
+
+    def changed_groups(self):
+        return self.ldap_interface.changed_groups()
+
 
 class OpenshiftLDAP_AugmentedADInterface(OpenshiftLDAP_ADInterface):
     def __init__(
@@ -786,9 +1607,10 @@ class OpenshiftLDAP_AugmentedADInterface(OpenshiftLDAP_ADInterface):
         user_name_attr,
         group_qry,
         group_name_attr,
+        nested=False,
     ):
         super(OpenshiftLDAP_AugmentedADInterface, self).__init__(
-            connection, user_query, group_member_attr, user_name_attr
+            connection, user_query, group_member_attr, user_name_attr, nested
         )
         self.groupQuery = copy.deepcopy(group_qry)
         self.groupNameAttributes = group_name_attr
@@ -799,18 +1621,43 @@ class OpenshiftLDAP_AugmentedADInterface(OpenshiftLDAP_ADInterface):
                 self.required_group_attributes.append(x)
 
         self.cached_groups = {}
+        self.missing_groups = set()
+
+    def prefetch_groups(self, uids):
+        err = super(OpenshiftLDAP_AugmentedADInterface, self).prefetch_groups(uids)
+        if err:
+            return err
+
+        uids = [uid for uid in uids if uid not in self.cached_groups]
+        with self.stats.timer("ldap", "group_entries"):
+            entries, err = self.groupQuery.ldap_search_many(
+                self.connection, uids, self.required_group_attributes
+            )
+        if err:
+            return err
+        for uid, found in entries.items():
+            if len(found) == 1:
+                self.cached_groups[uid] = found[0]
+            elif not found:
+                self.missing_groups.add(uid)
+        return None
 
     def get_group_entry(self, uid):
         """
         get_group_entry returns an LDAP group entry for the given group UID by searching the internal cache
         of the LDAPInterface first, then sending an LDAP query if the cache did not contain the entry.
         """
+        cached = uid in self.cached_groups or uid in self.missing_groups
+        self.stats.hit("cached_groups", cached)
         if uid in self.cached_groups:
             return self.cached_groups.get(uid), None
+        if uid in self.missing_groups:
+            return None, "Entry not found for group uid '%s'" % uid
 
-        group, err = self.groupQuery.ldap_search(
-            self.connection, uid, self.required_group_attributes
-        )
+        with self.stats.timer("ldap", "group_entry"):
+            group, err = self.groupQuery.ldap_search(
+                self.connection, uid, self.required_group_attributes
+            )
         if err:
             return None, err
         self.cached_groups[uid] = group
@@ -835,9 +1682,15 @@ class OpenshiftLDAP_AugmentedADInterface(OpenshiftLDAP_ADInterface):
 
 
 class OpenshiftLDAPAugmentedActiveDirectory(OpenshiftLDAPRFC2307):
-    def __init__(self, config, ldap_connection):
+    def __init__(self, config, ldap_connection, stats=None, nested=False):
         self.config = config
+        self.nested = nested
         self.ldap_interface = self.create_ldap_interface(ldap_connection)
+        if stats is not None:
+            self.ldap_interface.stats = stats
+        # user names resolved during the synchronization, by user DN
+        self.usernames = {}
+        self.group_name_mapping = self.config.get("groupUIDNameMapping") or {}
 
     def create_ldap_interface(self, connection):
         segment = self.config.get("augmentedActiveDirectory")
@@ -856,6 +1709,7 @@ class OpenshiftLDAPAugmentedActiveDirectory(OpenshiftLDAPRFC2307):
             user_name_attr=segment["userNameAttributes"],
             group_qry=groups_query,
             group_name_attr=segment["groupNameAttributes"],
+            nested=self.nested,
         )
 
     def is_ldapgroup_exists(self, uid):
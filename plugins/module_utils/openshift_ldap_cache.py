@@ -0,0 +1,540 @@
+#!/usr/bin/env python
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import base64
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from ansible.module_utils.common.text.converters import to_text
+
+try:
+    import ldap
+    from ldap.controls import LDAPControl
+    from ldap.syncrepl import SyncreplConsumer
+    from pyasn1.type import namedtype, univ
+    from pyasn1.codec.ber import encoder, decoder
+except ImportError as e:
+    LDAPControl = object
+    SyncreplConsumer = object
+
+
+LDAP_CACHE_VERSION = 2
+
+# LDAP result code returned by the server when a Content Synchronization cookie can not be
+# used anymore and the client needs to retrieve the whole content again (RFC4533 e-syncRefreshRequired).
+LDAP_SYNC_REFRESH_REQUIRED = 4096
+
+# Active Directory DirSync control flags and default size of each response
+LDAP_DIRSYNC_OID = "1.2.840.113556.1.4.841"
+LDAP_DIRSYNC_MAX_BYTES = 1048576
+
+# The LDAP server and the host running the synchronization do not share the same clock,
+# entries modified within this window (in seconds) before the previous run are fetched again.
+LDAP_CACHE_CLOCK_SKEW = 300
+
+
+def ldap_generalized_time(timestamp):
+    """
+    ldap_generalized_time formats an epoch timestamp using the LDAP GeneralizedTime syntax (RFC4517).
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y%m%d%H%M%S.0Z")
+
+
+def ldap_normalize_attributes(attributes):
+    """
+    returns the attributes of an LDAP entry with lower-cased names and the values decoded,
+    binary values are skipped.
+    """
+    result = {}
+    for k, v in attributes.items():
+        if not isinstance(v, list):
+            v = [v]
+        values = []
+        for x in v:
+            if isinstance(x, bytes):
+                try:
+                    x = x.decode("utf-8")
+                except UnicodeDecodeError:
+                    continue
+            values.append(x)
+        result[k.lower()] = values
+    return result
+
+
+def ldap_dn_in_scope(dn, base, scope):
+    """
+    returns True when the entry identified by dn is part of the search defined by base and scope.
+    """
+    dn_obj = [[(a.lower(), v.lower()) for a, v, t in rdn] for rdn in ldap.dn.str2dn(dn)]
+    base_obj = [
+        [(a.lower(), v.lower()) for a, v, t in rdn] for rdn in ldap.dn.str2dn(base)
+    ]
+    depth = len(dn_obj) - len(base_obj)
+    if depth < 0 or dn_obj[depth:] != base_obj:
+        return False
+    if scope == ldap.SCOPE_BASE:
+        return depth == 0
+    if scope == ldap.SCOPE_ONELEVEL:
+        return depth == 1
+    return True
+
+
+class OpenshiftLDAPCacheSection(object):
+    """
+    OpenshiftLDAPCacheSection holds the entries returned by one LDAP query, keyed by DN.
+    complete is set when the entries are the whole result of the query and not only the entries
+    retrieved one by one during the previous runs.
+    ids and cookie are used by the delta modes to identify the entries and the state of the
+    directory at the time of the previous synchronization.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.entries = data.get("entries", {})
+        self.complete = data.get("complete", False)
+        self.created = data.get("created")
+        self.synced_at = data.get("synced_at")
+        self.ids = data.get("ids", {})
+        self.cookie = data.get("cookie")
+        # entries added, modified or deleted during this run, mapped to their previous attributes
+        self.changes = {}
+        self.incremental = False
+
+    def items(self):
+        return [(dn, attrs) for dn, attrs in self.entries.items()]
+
+    def add(self, entry):
+        self.entries[entry[0]] = ldap_normalize_attributes(entry[1])
+
+    def reset(self, entries, timestamp):
+        self.entries = {}
+        for entry in entries:
+            self.add(entry)
+        self.complete = True
+        self.created = timestamp
+
+    def clear(self):
+        self.entries = {}
+        self.ids = {}
+        self.cookie = None
+        self.complete = False
+        self.incremental = False
+
+    def apply(self, dn, attributes, uid=None):
+        """
+        records an entry added or modified on the LDAP server since the previous synchronization.
+        """
+        if uid is not None:
+            previous_dn = self.ids.get(uid)
+            if previous_dn is not None and previous_dn != dn:
+                # the entry has been renamed
+                self.remove(previous_dn)
+            self.ids[uid] = dn
+        attributes = ldap_normalize_attributes(attributes)
+        if self.entries.get(dn) == attributes:
+            return
+        if self.incremental and dn not in self.changes:
+            self.changes[dn] = self.entries.get(dn)
+        self.entries[dn] = attributes
+
+    def remove(self, dn):
+        """
+        records an entry deleted from the LDAP server since the previous synchronization.
+        """
+        if dn in self.entries:
+            previous = self.entries.pop(dn)
+            if self.incremental and dn not in self.changes:
+                self.changes[dn] = previous
+
+    def remove_uid(self, uid):
+        dn = self.ids.pop(uid, None)
+        if dn is not None:
+            self.remove(dn)
+
+    def modified_since(self):
+        """
+        returns the GeneralizedTime from which entries need to be fetched again, None when the section is empty.
+        """
+        if not self.entries or self.synced_at is None:
+            return None
+        return ldap_generalized_time(self.synced_at - LDAP_CACHE_CLOCK_SKEW)
+
+    def to_dict(self):
+        return dict(
+            entries=self.entries,
+            complete=self.complete,
+            created=self.created,
+            synced_at=self.synced_at,
+            ids=self.ids,
+            cookie=self.cookie,
+        )
+
+
+class OpenshiftLDAPSyncreplConsumer(SyncreplConsumer):
+    """
+    OpenshiftLDAPSyncreplConsumer applies the changes streamed by an RFC4533 Content Synchronization
+    operation (refreshOnly mode) to a cache section, entries are identified using their entryUUID.
+    """
+
+    def __init__(self, connection, section):
+        self.connection = connection
+        self.section = section
+        self.present = set()
+
+    def search_ext(self, *args, **kwargs):
+        return self.connection.search_ext(*args, **kwargs)
+
+    def result4(self, *args, **kwargs):
+        return self.connection.result4(*args, **kwargs)
+
+    def syncrepl_get_cookie(self):
+        return self.section.cookie
+
+    def syncrepl_set_cookie(self, cookie):
+        self.section.cookie = cookie
+
+    def syncrepl_entry(self, dn, attributes, uuid):
+        self.section.apply(dn, attributes, uid=uuid)
+
+    def syncrepl_delete(self, uuids):
+        for uuid in uuids:
+            self.section.remove_uid(uuid)
+
+    def syncrepl_present(self, uuids, refreshDeletes=False):
+        if uuids is not None:
+            self.present.update(uuids)
+            return
+        if not refreshDeletes:
+            # the present phase is over, any entry not sent by the server has been deleted
+            for uuid in [x for x in self.section.ids if x not in self.present]:
+                self.section.remove_uid(uuid)
+        self.present = set()
+
+    def syncrepl_refreshdone(self):
+        pass
+
+
+def ldap_syncrepl_refresh(connection, qry, attributes, section):
+    """
+    ldap_syncrepl_refresh updates the section with the changes made on the LDAP server since the
+    stored cookie using the RFC4533 Content Synchronization operation. Without cookie, the whole
+    content matching the query is retrieved.
+    """
+    if section.cookie is None:
+        section.clear()
+    section.incremental = section.cookie is not None
+
+    consumer = OpenshiftLDAPSyncreplConsumer(connection, section)
+    timeout = qry.get("timeout", -1)
+    try:
+        msgid = consumer.syncrepl_search(
+            qry.get("base", ""),
+            qry.get("scope", ldap.SCOPE_SUBTREE),
+            mode="refreshOnly",
+            filterstr=qry.get("filterstr", "(objectClass=*)"),
+            attrlist=attributes,
+            timeout=timeout,
+        )
+        while consumer.syncrepl_poll(
+            msgid=msgid, timeout=None if timeout < 0 else timeout, all=1
+        ):
+            pass
+    except ldap.LDAPError as e:
+        info = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
+        if info.get("result") == LDAP_SYNC_REFRESH_REQUIRED and section.cookie:
+            # the server is not able to compute the changes from our cookie anymore
+            section.clear()
+            return ldap_syncrepl_refresh(connection, qry, attributes, section)
+        return "Content synchronization with base='{0}' failed due to: {1}".format(
+            qry.get("base"), e
+        )
+
+    section.complete = True
+    return None
+
+
+def ldap_dirsync_value():
+    # both the request and the response values are a sequence of 2 integers and a cookie
+    return univ.Sequence(
+        componentType=namedtype.NamedTypes(
+            namedtype.NamedType("flags", univ.Integer()),
+            namedtype.NamedType("maxBytes", univ.Integer()),
+            namedtype.NamedType("cookie", univ.OctetString()),
+        )
+    )
+
+
+class LDAPDirSyncControl(LDAPControl):
+    """
+    Active Directory DirSync control (LDAP_SERVER_DIRSYNC_OID), used to retrieve the objects
+    changed since the state identified by the cookie.
+    """
+
+    controlType = LDAP_DIRSYNC_OID
+
+    def __init__(self, criticality=True, cookie=None):
+        self.criticality = criticality
+        self.cookie = cookie or b""
+        self.more = False
+
+    def encodeControlValue(self):
+        value = ldap_dirsync_value()
+        value.setComponentByName("flags", 0)
+        value.setComponentByName("maxBytes", LDAP_DIRSYNC_MAX_BYTES)
+        value.setComponentByName("cookie", self.cookie)
+        return encoder.encode(value)
+
+    def decodeControlValue(self, encodedControlValue):
+        value, _ = decoder.decode(encodedControlValue, asn1Spec=ldap_dirsync_value())
+        # the first component of the response holds the "more results" flag
+        self.more = bool(int(value.getComponentByPosition(0)))
+        self.cookie = bytes(value.getComponentByPosition(2))
+
+
+def ldap_naming_context(connection):
+    """
+    returns the default naming context of an Active Directory server, DirSync searches must
+    start from the root of a naming context.
+    """
+    result = connection.search_s(
+        "", ldap.SCOPE_BASE, "(objectClass=*)", ["defaultNamingContext"]
+    )
+    for dn, attrs in result:
+        value = attrs.get("defaultNamingContext")
+        if value:
+            return to_text(value[0])
+    return None
+
+
+def ldap_dirsync_changes(connection, filterstr, attributes, cookie, timeout=-1):
+    """
+    returns the objects matching filterstr which have been changed since the state identified by
+    the cookie, as a list of (dn, attributes, guid, deleted), and the cookie of the new state.
+    Without cookie, every object matching filterstr is returned.
+    """
+    base = ldap_naming_context(connection)
+    if not base:
+        return None, None, "unable to determine the default naming context"
+
+    # '1.1' requests no attribute, it can not be combined with the attributes tracking the changes
+    attrlist = [x for x in attributes if x != "1.1"] + ["objectGUID", "isDeleted"]
+    changes = []
+    while True:
+        control = LDAPDirSyncControl(cookie=cookie)
+        msgid = connection.search_ext(
+            base,
+            ldap.SCOPE_SUBTREE,
+            filterstr,
+            attrlist=attrlist,
+            serverctrls=[control],
+            timeout=timeout,
+        )
+        rtype, rdata, rmsgid, ctrls = connection.result3(
+            msgid, resp_ctrl_classes={LDAP_DIRSYNC_OID: LDAPDirSyncControl}
+        )
+        for dn, attrs in rdata:
+            if dn is None:
+                # search continuation reference
+                continue
+            guid = attrs.pop("objectGUID", [b""])[0]
+            deleted = attrs.pop("isDeleted", [b"FALSE"])[0]
+            changes.append(
+                (dn, attrs, bytes(guid).hex(), to_text(deleted).upper() == "TRUE")
+            )
+
+        more = False
+        for ctrl in ctrls:
+            if ctrl.controlType == LDAP_DIRSYNC_OID:
+                cookie, more = ctrl.cookie, ctrl.more
+        if not more:
+            break
+    return changes, cookie, None
+
+
+def ldap_dirsync_changed_objects(connection, filterstr, attributes, section):
+    """
+    returns the DN of the objects changed since the cookie stored into the section,
+    None when there was no cookie to compare with.
+    """
+    cookie = base64.b64decode(section.cookie) if section.cookie else None
+    try:
+        changes, new_cookie, err = ldap_dirsync_changes(
+            connection, filterstr, attributes, cookie
+        )
+    except ldap.LDAPError as e:
+        return None, "DirSync search with filter='{0}' failed due to: {1}".format(
+            filterstr, e
+        )
+    if err:
+        return None, err
+
+    section.cookie = to_text(base64.b64encode(new_cookie))
+    if cookie is None:
+        return None, None
+    return [dn for dn, attrs, guid, deleted in changes if not deleted], None
+
+
+def ldap_dirsync_refresh(connection, qry, attributes, section):
+    """
+    ldap_dirsync_refresh updates the section with the objects changed on an Active Directory server
+    since the stored cookie. DirSync only returns the attributes that have changed and never the
+    back-link attributes (e.g. memberOf), the changed entries are then read again to get their
+    current attributes. Without cookie, the entries are read using a regular search once the
+    cookie of the current state is retrieved.
+    """
+    if section.cookie is None:
+        section.clear()
+    section.incremental = section.cookie is not None
+    cookie = base64.b64decode(section.cookie) if section.cookie else None
+
+    try:
+        filterstr = qry.get("filterstr", "(objectClass=*)")
+        changes, cookie, err = ldap_dirsync_changes(
+            connection,
+            filterstr,
+            attributes,
+            cookie,
+            timeout=qry.get("timeout", -1),
+        )
+        if err:
+            return err
+
+        base, scope = qry.get("base", ""), qry.get("scope", ldap.SCOPE_SUBTREE)
+        if not section.incremental:
+            attrlist = [x for x in attributes if x != "1.1"] + ["objectGUID"]
+            changes = []
+            for dn, attrs in connection.search_ext_s(
+                base,
+                scope,
+                filterstr,
+                attrlist=attrlist,
+                timeout=qry.get("timeout", -1),
+            ):
+                if dn is None:
+                    # search continuation reference
+                    continue
+                guid = attrs.pop("objectGUID", [b""])[0]
+                section.apply(dn, attrs, uid=bytes(guid).hex())
+
+        for dn, attrs, guid, deleted in changes:
+            if deleted or not ldap_dn_in_scope(dn, base, scope):
+                section.remove_uid(guid)
+                continue
+            try:
+                entry = connection.search_s(
+                    dn, ldap.SCOPE_BASE, "(objectClass=*)", attributes
+                )
+            except ldap.NO_SUCH_OBJECT:
+                entry = None
+            if not entry:
+                section.remove_uid(guid)
+                continue
+            section.apply(dn, entry[0][1], uid=guid)
+    except ldap.LDAPError as e:
+        return "DirSync search with base='{0}' failed due to: {1}".format(
+            qry.get("base"), e
+        )
+
+    section.cookie = to_text(base64.b64encode(cookie))
+    section.complete = True
+    return None
+
+
+def ldap_delta_refresh(connection, mode, qry, attributes, section):
+    """
+    ldap_delta_refresh applies to the section the changes made on the LDAP server since the previous
+    synchronization using either the Content Synchronization operation (syncrepl) or the Active Directory
+    DirSync control (dirsync).
+    """
+    if mode == "syncrepl":
+        return ldap_syncrepl_refresh(connection, qry, attributes, section)
+    return ldap_dirsync_refresh(connection, qry, attributes, section)
+
+
+class OpenshiftLDAPCache(object):
+    """
+    OpenshiftLDAPCache persists LDAP entries in a local file so they can be reused by the next synchronization.
+    Entries are stored per LDAP server URL and query (base DN, filter and attributes) and are discarded once
+    older than max_age minutes.
+    """
+
+    def __init__(self, path, url, max_age=None):
+        self.path = path
+        self.url = url
+        self.max_age = max_age
+        self.started = time.time()
+        self.sections = {}
+        self.data = {}
+
+    def load(self):
+        self.data = {}
+        if not os.path.isfile(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            return "Unable to read LDAP cache file '{0}': {1}".format(self.path, e)
+        if not isinstance(data, dict) or data.get("version") != LDAP_CACHE_VERSION:
+            return "Ignoring LDAP cache file '{0}' with unsupported format".format(
+                self.path
+            )
+        self.data = data.get("sections", {})
+        return None
+
+    def key(self, qry, attributes):
+        return "|".join(
+            [
+                self.url,
+                qry.get("base", ""),
+                str(qry.get("scope", "")),
+                qry.get("filterstr", ""),
+                ",".join(sorted(attributes)),
+            ]
+        )
+
+    def section(self, qry, attributes):
+        key = self.key(qry, attributes)
+        if key not in self.sections:
+            data = self.data.get(key)
+            if data and self.max_age:
+                created = data.get("created") or 0
+                if self.started - created > self.max_age * 60:
+                    data = None
+            section = OpenshiftLDAPCacheSection(data)
+            if section.created is None:
+                section.created = self.started
+            self.sections[key] = section
+        return self.sections[key]
+
+    def save(self):
+        sections = dict(self.data)
+        for key, section in self.sections.items():
+            section.synced_at = self.started
+            sections[key] = section.to_dict()
+
+        # write into a temporary file first, a concurrent run must never read a partial cache file
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.path)), prefix=".ldap-cache"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(version=LDAP_CACHE_VERSION, sections=sections), f)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except (IOError, OSError) as e:
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+            return "Unable to write LDAP cache file '{0}': {1}".format(self.path, e)
+        return None
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import heapq
+
+
+def most_recent_per_owner(objects, get_owner, get_bucket, keep):
+    """
+    returns the (namespace, name) of the most recent objects of each owner, keep maps a bucket
+    (e.g. the phase of the objects) to the number of objects kept per owner, the buckets missing
+    from keep are ignored.
+    the objects are grouped by owner in a single pass, a heap of at most keep[bucket] objects
+    holds the most recent objects of each (owner, bucket) instead of sorting every group.
+    """
+    heaps = {}
+    for obj in objects:
+        owner, bucket = get_owner(obj), get_bucket(obj)
+        limit = keep.get(bucket)
+        if owner is None or limit is None:
+            continue
+        heap = heaps.setdefault((owner, bucket), [])
+        metadata = obj["metadata"]
+        item = (metadata["creationTimestamp"], metadata["namespace"], metadata["name"])
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif heap and item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return set((ns, name) for heap in heaps.values() for ts, ns, name in heap)
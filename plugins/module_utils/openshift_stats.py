@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class OpenshiftStats(object):
+    """
+    OpenshiftStats collects the number and the duration of the operations performed by a module
+    (LDAP queries, OpenShift API calls, phases), grouped by category and name.
+    It can be shared between threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+
+    def add(self, category, name, elapsed, count=1):
+        with self.lock:
+            item = self.data.setdefault(category, {}).setdefault(
+                name, dict(count=0, time=0.0)
+            )
+            item["count"] += count
+            item["time"] += elapsed
+
+    def incr(self, category, name, key, count=1):
+        with self.lock:
+            item = self.data.setdefault(category, {}).setdefault(name, {})
+            item[key] = item.get(key, 0) + count
+
+    @contextmanager
+    def timer(self, category, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(category, name, time.monotonic() - start)
+
+    def hit(self, name, hit):
+        self.incr("cache", name, "hits" if hit else "misses")
+
+    def to_dict(self):
+        with self.lock:
+            result = {}
+            for category, items in self.data.items():
+                result[category] = {}
+                for name, item in items.items():
+                    item = dict(item)
+                    if "time" in item:
+                        item["time"] = round(item["time"], 6)
+                    result[category][name] = item
+            return result
@@ -69,6 +69,118 @@ options:
     type: list
     elements: str
     default: []
+  cache_path:
+    description:
+    - Path to a local file used to persist the LDAP user entries between module runs.
+    - When set, the entries persisted by the previous run are reused and only the entries modified since then,
+      according to their C(modifyTimestamp) attribute, are fetched from the LDAP server.
+    - The file is created when it does not exist.
+    type: path
+    version_added: 6.0.0
+  cache_max_age:
+    description:
+    - Maximum age (in minutes) of the entries persisted into I(cache_path).
+    - Once exceeded, the persisted entries are discarded and fetched again from the LDAP server.
+    - Entries deleted from the LDAP server are only noticed once the persisted entries have expired.
+    type: int
+    default: 1440
+    version_added: 6.0.0
+  cache_mode:
+    description:
+    - Determines how the entries persisted into I(cache_path) are refreshed from the LDAP server.
+    - With C(timestamp), the entries whose C(modifyTimestamp) attribute is more recent than the previous run are fetched again.
+    - C(timestamp) is only supported with the C(rfc2307) schema. With the C(activeDirectory) and C(augmentedActiveDirectory)
+      schemas, the group membership is read from the C(memberOf) attribute of the users, which is maintained by the server
+      and does not update their C(modifyTimestamp). The user entries are then not cached, use C(dirsync) instead.
+    - With C(syncrepl), the changes are retrieved using the LDAP Content Synchronization operation (RFC 4533),
+      the LDAP server needs to support it (e.g. OpenLDAP with the C(syncprov) overlay).
+    - With C(dirsync), the changes are retrieved using the Active Directory DirSync control,
+      the bind user needs the I(Replicating Directory Changes) permission.
+    - With C(syncrepl) and C(dirsync), deleted entries are detected and only the groups whose membership
+      changed since the previous run are synchronized. Every group is synchronized once the persisted entries expire.
+    - Ignored when I(cache_path) is not set.
+    type: str
+    default: timestamp
+    choices: [ timestamp, syncrepl, dirsync ]
+    version_added: 6.0.0
+  workers:
+    description:
+    - Maximum number of OpenShift Groups created, updated or deleted concurrently.
+    - The existing Groups are retrieved using a single request and only the Groups whose users or
+      annotations changed are updated.
+    type: int
+    default: 5
+    version_added: 6.0.0
+  sync_time_interval:
+    description:
+    - Minimum interval (in minutes) before the C(openshift.io/ldap.sync-time) annotation of a Group
+      whose users did not change is refreshed.
+    - When not set, the Groups whose users did not change are not updated.
+    type: int
+    version_added: 6.0.0
+  nested_groups:
+    description:
+    - Whether the members of the nested groups are synchronized as members of the groups containing them.
+    - With the C(rfc2307) schema, the membership values which refer to a group are expanded recursively,
+      each group is expanded once per synchronization and membership cycles are detected.
+    - With the C(activeDirectory) and C(augmentedActiveDirectory) schemas, the members are searched using the
+      C(LDAP_MATCHING_RULE_IN_CHAIN) matching rule evaluated by the server. The rule can also be set
+      for a single attribute in C(groupMembershipAttributes), e.g. C(memberOf:1.2.840.113556.1.4.1941:).
+      The groups listed from the users memberships are the groups having direct user members, use I(allow_groups)
+      to synchronize the other groups.
+    type: bool
+    default: false
+    version_added: 6.0.0
+  streaming:
+    description:
+    - Whether each OpenShift Group is created or updated as soon as the members of the LDAP group are resolved,
+      instead of once the members of every LDAP group are known.
+    - At most twice I(workers) Groups are pending at any time.
+    type: bool
+    default: false
+    version_added: 6.0.0
+  return_groups:
+    description:
+    - Whether to return the full definition of the Groups synchronized.
+    - Defaults to C(true) unless I(streaming=true), the names of the Groups created or updated are
+      always returned in C(changed_groups).
+    type: bool
+    version_added: 6.0.0
+  failover_urls:
+    description:
+    - URLs of LDAP servers replicating the server set in the C(url) of I(sync_config).
+    - When the server set in the C(url) of I(sync_config) can not be bound, the servers are tried in order
+      until one of them answers the bind, the servers which could not be bound are reported as warnings.
+    - Only the next server is tried when the connection or the bind fails or exceeds I(connect_timeout) or
+      I(bind_timeout), a single server is bound per synchronization.
+    - The C(openshift.io/ldap.url) annotation and the C(openshift.io/ldap.host) label of the Groups are always
+      set from the C(url) of I(sync_config).
+    type: list
+    elements: str
+    default: []
+    version_added: 6.0.0
+  connect_timeout:
+    description:
+    - Maximum time (in seconds) to wait for the network connection to an LDAP server.
+    - Set to C(0) to wait until the operating system gives up.
+    type: float
+    default: 10
+    version_added: 6.0.0
+  bind_timeout:
+    description:
+    - Maximum time (in seconds) to wait for the response to the bind request of an LDAP server.
+    - The LDAP searches use the C(timeout) of I(sync_config).
+    - Set to C(0) to wait indefinitely.
+    type: float
+    default: 30
+    version_added: 6.0.0
+  stats:
+    description:
+    - Whether to return the number and the duration of the LDAP queries and OpenShift API calls,
+      the cache hits and misses and the duration of each phase of the synchronization.
+    type: bool
+    default: false
+    version_added: 6.0.0
 
 requirements:
   - python >= 3.6
@@ -130,6 +242,20 @@ EXAMPLES = r"""
       - cn=developers,ou=groups,ou=rfc2307,dc=ansible,dc=redhat
       - cn=developers,ou=groups,ou=rfc2307,dc=ansible,dc=redhat
 
+# Sync all groups from an LDAP server, reusing the user entries fetched by the previous run
+- name: Sync all groups from an LDAP server using a local cache
+  openshift_adm_groups_sync:
+    src: "{{ lookup('file', '/path/to/ldap-sync-config.yaml') | from_yaml }}"
+    cache_path: /var/cache/ldap-sync.json
+    cache_max_age: 360
+
+# Sync the groups changed since the previous run using the Active Directory DirSync control
+- name: Sync changed groups from an Active Directory server
+  openshift_adm_groups_sync:
+    src: "{{ lookup('file', '/path/to/ad-sync-config.yaml') | from_yaml }}"
+    cache_path: /var/cache/ad-sync.json
+    cache_mode: dirsync
+
 # Sync all OpenShift Groups that have been synced previously with an LDAP server
 - name: Sync all OpenShift Groups that have been synced previously with an LDAP server
   openshift_adm_groups_sync:
@@ -188,6 +314,63 @@ builds:
       "users": ["jordanbulls@ansible.org"]
     }
   ]
+counts:
+  description:
+  - The number of Groups created, updated, refreshed (only the sync time annotation was updated) and unchanged.
+  returned: when I(state=present)
+  type: dict
+  sample: {
+    "created": 1,
+    "updated": 2,
+    "refreshed": 0,
+    "unchanged": 120
+  }
+  version_added: 6.0.0
+changed_groups:
+  description:
+  - The names of the Groups created or updated.
+  returned: when I(state=present)
+  type: list
+  elements: str
+  sample: ["developers", "admins"]
+  version_added: 6.0.0
+ldap_server:
+  description:
+  - The URL of the LDAP server used and the duration (in seconds) of the bind.
+  returned: when the LDAP server was bound
+  type: dict
+  sample: {
+    "url": "ldap://ldap-2.example.com:389",
+    "bind_time": 0.012
+  }
+  version_added: 6.0.0
+stats:
+  description:
+  - The number and the total duration (in seconds) of the LDAP queries (C(ldap)) and OpenShift API calls (C(openshift))
+    per type, the hits and misses of the LDAP entries cached during the run (C(cache)) and the duration of each phase (C(phases)).
+  returned: when I(stats=true)
+  type: dict
+  sample: {
+    "cache": {
+      "cached_groups": {"hits": 12, "misses": 3},
+      "cached_users": {"hits": 240, "misses": 35}
+    },
+    "ldap": {
+      "bind": {"count": 1, "time": 0.012},
+      "group_list": {"count": 1, "time": 0.045},
+      "user_entry": {"count": 35, "time": 0.392}
+    },
+    "openshift": {
+      "list": {"count": 1, "time": 0.087},
+      "patch": {"count": 2, "time": 0.064}
+    },
+    "phases": {
+      "extract_members": {"count": 1, "time": 0.441},
+      "list_groups": {"count": 1, "time": 0.046},
+      "write_groups": {"count": 1, "time": 0.152}
+    }
+  }
+  version_added: 6.0.0
 """
 # ENDREMOVE (downstream)
 
@@ -207,6 +390,22 @@ def argument_spec():
             sync_config=dict(type="dict", aliases=["config", "src"], required=True),
             deny_groups=dict(type="list", elements="str", default=[]),
             allow_groups=dict(type="list", elements="str", default=[]),
+            cache_path=dict(type="path"),
+            cache_max_age=dict(type="int", default=1440),
+            cache_mode=dict(
+                type="str",
+                choices=["timestamp", "syncrepl", "dirsync"],
+                default="timestamp",
+            ),
+            workers=dict(type="int", default=5),
+            sync_time_interval=dict(type="int"),
+            nested_groups=dict(type="bool", default=False),
+            streaming=dict(type="bool", default=False),
+            return_groups=dict(type="bool"),
+            failover_urls=dict(type="list", elements="str", default=[]),
+            connect_timeout=dict(type="float", default=10),
+            bind_timeout=dict(type="float", default=30),
+            stats=dict(type="bool", default=False),
         )
     )
     return args
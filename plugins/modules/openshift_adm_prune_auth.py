@@ -31,13 +31,13 @@ options:
   resource:
     description:
     - The specified resource to remove.
+    - One of I(resource) or I(targets) is required.
     choices:
     - roles
     - clusterroles
     - users
     - groups
     type: str
-    required: true
   name:
     description:
     - Use to specify an object name to remove.
@@ -55,6 +55,61 @@ options:
     - Mutually exclusive with option I(name).
     type: list
     elements: str
+  targets:
+    description:
+    - The resources to remove, pruned in a single run.
+    - The bindings, Security Context Constraints, Groups and OAuthClientAuthorizations are listed once
+      and each of them is deleted or updated once, whatever the number of targets it references.
+    - When set, C(cluster_role_binding), C(role_binding), C(security_context_constraints), C(group) and
+      C(authorization) hold the objects deleted or updated.
+    - Mutually exclusive with options I(resource), I(name), I(namespace) and I(label_selectors).
+    type: list
+    elements: dict
+    version_added: 6.0.0
+    suboptions:
+      resource:
+        description:
+        - The specified resource to remove.
+        choices:
+        - roles
+        - clusterroles
+        - users
+        - groups
+        type: str
+        required: true
+      name:
+        description:
+        - Use to specify an object name to remove.
+        - Mutually exclusive with option I(label_selectors).
+        type: str
+      namespace:
+        description:
+        - Use to specify an object namespace.
+        - Only used when I(resource) is set to C(roles).
+        type: str
+      label_selectors:
+        description:
+        - Selector (label query) to filter on.
+        - Mutually exclusive with option I(name).
+        type: list
+        elements: str
+  workers:
+    description:
+    - Maximum number of bindings, Security Context Constraints and Groups updated, and of OAuthClientAuthorizations
+      deleted, concurrently when I(resource=users), I(resource=groups) or I(targets) is set.
+    - The OAuthClientAuthorizations of up to 20 users are listed using a C(userName) field selector per user,
+      otherwise they are listed page by page.
+    - The objects are updated using JSON patches which only modify their subjects, an object modified
+      concurrently is read and patched again.
+    type: int
+    default: 5
+    version_added: 6.0.0
+  stats:
+    description:
+    - Whether to return the number and the duration of the OpenShift API calls per kind of object.
+    type: bool
+    default: false
+    version_added: 6.0.0
 
 requirements:
   - python >= 3.6
@@ -73,6 +128,15 @@ EXAMPLES = r"""
     namespace: testing
     label_selectors:
       - phase=production
+
+- name: Prune users and groups offboarded at once
+  openshift_adm_prune_auth:
+    targets:
+      - resource: users
+        label_selectors:
+          - offboarding=true
+      - resource: groups
+        name: contractors
 """
 
 
@@ -84,19 +148,34 @@ cluster_role_binding:
 role_binding:
   type: list
   description: list of role binding deleted.
-  returned: I(resource=users) or I(resource=groups) or I(resource=clusterroles)
+  returned: I(resource=users) or I(resource=groups) or I(resource=clusterroles) or I(targets) is set
 security_context_constraints:
   type: list
   description: list of Security Context Constraints deleted.
-  returned: I(resource=users) or I(resource=groups)
+  returned: I(resource=users) or I(resource=groups) or I(targets) is set
 authorization:
   type: list
   description: list of OAuthClientAuthorization deleted.
-  returned: I(resource=users)
+  returned: I(resource=users) or I(targets) is set
 group:
   type: list
   description: list of Security Context Constraints deleted.
-  returned: I(resource=users)
+  returned: I(resource=users) or I(targets) is set
+stats:
+  description:
+  - The number and the total duration (in seconds) of the OpenShift API calls per kind of object and per verb.
+  returned: when I(stats=true)
+  type: dict
+  sample: {
+    "RoleBinding": {
+      "list": {"count": 1, "time": 0.231},
+      "patch": {"count": 120, "time": 4.02}
+    },
+    "SecurityContextConstraints": {
+      "list": {"count": 1, "time": 0.015}
+    }
+  }
+  version_added: 6.0.0
 """
 # ENDREMOVE (downstream)
 
@@ -113,12 +192,28 @@ def argument_spec():
         dict(
             resource=dict(
                 type="str",
-                required=True,
                 choices=["roles", "clusterroles", "users", "groups"],
             ),
             namespace=dict(type="str"),
             name=dict(type="str"),
             label_selectors=dict(type="list", elements="str"),
+            targets=dict(
+                type="list",
+                elements="dict",
+                options=dict(
+                    resource=dict(
+                        type="str",
+                        required=True,
+                        choices=["roles", "clusterroles", "users", "groups"],
+                    ),
+                    namespace=dict(type="str"),
+                    name=dict(type="str"),
+                    label_selectors=dict(type="list", elements="str"),
+                ),
+                mutually_exclusive=[("name", "label_selectors")],
+            ),
+            workers=dict(type="int", default=5),
+            stats=dict(type="bool", default=False),
         )
     )
     return args
@@ -131,7 +226,14 @@ def main():
 
     module = OpenShiftAdmPruneAuth(
         argument_spec=argument_spec(),
-        mutually_exclusive=[("name", "label_selectors")],
+        mutually_exclusive=[
+            ("name", "label_selectors"),
+            ("resource", "targets"),
+            ("targets", "name"),
+            ("targets", "namespace"),
+            ("targets", "label_selectors"),
+        ],
+        required_one_of=[("resource", "targets")],
         supports_check_mode=True,
     )
     module.run_module()
@@ -42,6 +42,41 @@ options:
       complete, failed, error, or cancelled.
     type: bool
     default: false
+  keep_complete:
+    description:
+    - The number of the most recent complete builds kept per BuildConfig.
+    - Only the builds candidate for pruning are counted, the builds younger than I(keep_younger_than)
+      and, with I(orphans=true), the builds whose BuildConfig exists are kept anyway.
+    - All the complete builds candidate for pruning are pruned when not specified.
+    type: int
+    version_added: 6.0.0
+  keep_failed:
+    description:
+    - The number of the most recent failed, errored or cancelled builds kept per BuildConfig.
+    - Only the builds candidate for pruning are counted, as for I(keep_complete).
+    - All the failed, errored and cancelled builds candidate for pruning are pruned when not specified.
+    type: int
+    version_added: 6.0.0
+  workers:
+    description:
+    - The number of builds deleted concurrently.
+    type: int
+    default: 5
+    version_added: 6.0.0
+  qps:
+    description:
+    - The maximum number of DELETE requests sent per second to the OpenShift API.
+    - The requests are not rate limited when set to C(0).
+    type: float
+    default: 50
+    version_added: 6.0.0
+  burst:
+    description:
+    - The maximum number of DELETE requests sent at once above I(qps), when no request was sent
+      for a while.
+    type: int
+    default: 100
+    version_added: 6.0.0
 
 requirements:
   - python >= 3.6
@@ -60,6 +95,13 @@ EXAMPLES = r"""
   community.okd.openshift_adm_prune_builds:
     keep_younger_than: 120
 
+# Run deleting builds, keep the 5 most recent complete builds
+# and the most recent failed build of each BuildConfig
+- name: Run delete builds, keep the most recent builds per BuildConfig
+  community.okd.openshift_adm_prune_builds:
+    keep_complete: 5
+    keep_failed: 1
+
 # Run deleting builds from specific namespace
 - name: Run delete builds from namespace
   community.okd.openshift_adm_prune_builds:
@@ -70,6 +112,7 @@ RETURN = r"""
 builds:
   description:
   - The builds that were deleted
+  - The builds deleted before a listing or deletion failure are returned as well.
   returned: success
   type: complex
   contains:
@@ -93,6 +136,23 @@ builds:
       description: Current status details for the object.
       returned: success
       type: dict
+summary:
+  description:
+  - The number of builds deleted and failed to be deleted, in total and per namespace.
+  - The duration (in seconds) and the throughput (in objects per second) of the deletions.
+  returned: when not in check mode
+  type: dict
+  sample: {
+    "deleted": 120,
+    "failed": 1,
+    "namespaces": {
+      "testing": {"deleted": 100, "failed": 1},
+      "staging": {"deleted": 20, "failed": 0}
+    },
+    "throughput": 48.2,
+    "time": 2.49
+  }
+  version_added: 6.0.0
 """
 # ENDREMOVE (downstream)
 
@@ -110,6 +170,11 @@ def argument_spec():
             namespace=dict(type="str"),
             keep_younger_than=dict(type="int"),
             orphans=dict(type="bool", default=False),
+            keep_complete=dict(type="int"),
+            keep_failed=dict(type="int"),
+            workers=dict(type="int", default=5),
+            qps=dict(type="float", default=50),
+            burst=dict(type="int", default=100),
         )
     )
     return args
@@ -42,6 +42,49 @@ options:
       the status is complete or failed, and the replica size is C(0).
     type: bool
     default: false
+  keep_complete:
+    description:
+    - The number of the most recent complete deployments kept per DeploymentConfig.
+    - Only the deployments candidate for pruning are counted, the active deployments (with replicas),
+      the deployments younger than I(keep_younger_than) and, with I(orphans=true), the deployments
+      whose DeploymentConfig exists are kept anyway.
+    - All the complete deployments candidate for pruning are pruned when not specified.
+    type: int
+    version_added: 6.0.0
+  keep_failed:
+    description:
+    - The number of the most recent failed deployments kept per DeploymentConfig.
+    - Only the deployments candidate for pruning are counted, as for I(keep_complete).
+    - All the failed deployments candidate for pruning are pruned when not specified.
+    type: int
+    version_added: 6.0.0
+  workers:
+    description:
+    - The number of replication controllers deleted concurrently.
+    type: int
+    default: 5
+    version_added: 6.0.0
+  qps:
+    description:
+    - The maximum number of DELETE requests sent per second to the OpenShift API.
+    - The requests are not rate limited when set to C(0).
+    type: float
+    default: 50
+    version_added: 6.0.0
+  burst:
+    description:
+    - The maximum number of DELETE requests sent at once above I(qps), when no request was sent
+      for a while.
+    type: int
+    default: 100
+    version_added: 6.0.0
+  stats:
+    description:
+    - Whether to return the number and the duration of the OpenShift API calls per kind of object,
+      and the number of DeploymentConfigs listed to detect the orphan deployments.
+    type: bool
+    default: false
+    version_added: 6.0.0
 
 requirements:
   - python >= 3.6
@@ -57,6 +100,11 @@ EXAMPLES = r"""
   community.okd.openshift_adm_prune_deployments:
     orphans: true
     keep_younger_than: 120
+
+- name: Prune deployments, keep the 5 most recent complete and the most recent failed per DeploymentConfig
+  community.okd.openshift_adm_prune_deployments:
+    keep_complete: 5
+    keep_failed: 1
 """
 
 
@@ -65,6 +113,43 @@ replication_controllers:
   type: list
   description: list of replication controllers candidate for pruning.
   returned: always
+stats:
+  description:
+  - The number and the total duration (in seconds) of the OpenShift API calls per kind of object and per verb.
+  - The number of DeploymentConfigs listed (C(entries)), and the number of replication controllers whose
+    DeploymentConfig exists (C(hits)) or not (C(misses)), under C(index).
+  returned: when I(stats=true)
+  type: dict
+  sample: {
+    "DeploymentConfig": {
+      "list": {"count": 1, "time": 0.184}
+    },
+    "ReplicationController": {
+      "delete": {"count": 12, "time": 0.621},
+      "list": {"count": 1, "time": 0.352}
+    },
+    "index": {
+      "DeploymentConfig": {"entries": 240, "hits": 1200, "misses": 12}
+    }
+  }
+  version_added: 6.0.0
+summary:
+  description:
+  - The number of replication controllers deleted and failed to be deleted, in total and per namespace.
+  - The duration (in seconds) and the throughput (in objects per second) of the deletions.
+  returned: when not in check mode
+  type: dict
+  sample: {
+    "deleted": 120,
+    "failed": 1,
+    "namespaces": {
+      "testing": {"deleted": 100, "failed": 1},
+      "staging": {"deleted": 20, "failed": 0}
+    },
+    "throughput": 48.2,
+    "time": 2.49
+  }
+  version_added: 6.0.0
 """
 # ENDREMOVE (downstream)
 
@@ -89,6 +174,12 @@ def argument_spec():
                 type="int",
             ),
             orphans=dict(type="bool", default=False),
+            keep_complete=dict(type="int"),
+            keep_failed=dict(type="int"),
+            workers=dict(type="int", default=5),
+            qps=dict(type="float", default=50),
+            burst=dict(type="int", default=100),
+            stats=dict(type="bool", default=False),
         )
     )
     return args
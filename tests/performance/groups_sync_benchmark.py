@@ -0,0 +1,192 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of openshift_adm_groups_sync against generated LDAP directories.
+
+The LDAP server and the OpenShift cluster are replaced by in-memory fakes (see ldap_directory.py and
+the FakeCluster of the unit tests), for each schema the benchmark measures the number of LDAP
+requests and OpenShift API calls, the wall time and the peak memory of an initial synchronization,
+of a synchronization without changes and of a prune after some LDAP groups were deleted.
+
+Usage (python-ldap, pytest, the kubernetes.core and community.okd collections need to be importable):
+    python tests/performance/groups_sync_benchmark.py [--users 10000] [--groups 1000] [--latency 1]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections import Counter
+from unittest import mock
+
+from ldap_directory import FakeLDAPDirectory
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_groups import (
+    OpenshiftGroupsSync,
+)
+from ansible_collections.community.okd.plugins.modules.openshift_adm_groups_sync import (
+    argument_spec,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils import (
+    openshift_fakes as fakes,
+)
+
+
+SCHEMAS = ["rfc2307", "activeDirectory", "augmentedActiveDirectory"]
+
+
+def run_module(directory, cluster, params, args):
+    connection = directory.connect(latency=args.latency / 1000.0)
+    params = dict(params, workers=args.workers)
+    with mock.patch("ldap.initialize", return_value=connection):
+        result = fakes.run_module(
+            OpenshiftGroupsSync, argument_spec(), cluster, **params
+        )
+    return connection.counts, result
+
+
+def run_scenario(schema, args, trace_memory=False):
+    directory = FakeLDAPDirectory()
+    config, group_dns = directory.generate(
+        schema,
+        args.users,
+        args.groups,
+        args.members,
+        seed=args.seed,
+        nested=args.nested,
+    )
+    cluster = fakes.FakeCluster({"Group": []})
+    cluster.latency = args.api_latency / 1000.0
+    params = dict(sync_config=config, stats=True, nested_groups=args.nested)
+    if args.allow_groups:
+        params["allow_groups"] = group_dns[: args.allow_groups]
+
+    def _prune():
+        # the groups deleted from the LDAP server are removed from the cluster
+        for dn in group_dns[:: max(int(1 / args.prune_ratio), 1)]:
+            directory.delete(dn)
+            directory.remove_value("memberOf", dn)
+        # allow_groups holds the names of the OpenShift groups to prune
+        return dict(params, state="absent", allow_groups=[])
+
+    steps = [
+        ("sync (initial)", lambda: params),
+        ("sync (unchanged)", lambda: params),
+        ("prune", _prune),
+    ]
+    results = []
+    for name, get_params in steps:
+        step_params = get_params()
+        cluster.calls = []
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        ldap_counts, result = run_module(directory, cluster, step_params, args)
+        elapsed = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append(
+            dict(
+                schema=schema,
+                step=name,
+                time=elapsed,
+                peak_memory=peak,
+                ldap=dict(ldap_counts),
+                openshift=dict(Counter(verb for verb, kind, x in cluster.calls)),
+                stats=result.get("stats"),
+            )
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schema", action="append", choices=SCHEMAS)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--members", type=int, default=50, help="members per group")
+    parser.add_argument(
+        "--allow-groups",
+        type=int,
+        default=0,
+        help="synchronize only the first N groups using allow_groups",
+    )
+    parser.add_argument(
+        "--prune-ratio",
+        type=float,
+        default=0.1,
+        help="ratio of the LDAP groups deleted before the prune",
+    )
+    parser.add_argument(
+        "--nested",
+        action="store_true",
+        help="nest the groups and synchronize them using nested_groups",
+    )
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="latency of each LDAP request (ms)"
+    )
+    parser.add_argument(
+        "--api-latency",
+        type=float,
+        default=0.0,
+        help="latency of each OpenShift API call (ms)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="do not run the scenarios a second time to measure the peak memory",
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for schema in args.schema or SCHEMAS:
+        measured = run_scenario(schema, args)
+        if not args.no_memory:
+            # tracemalloc slows down the allocations, the wall time is measured separately
+            for item, traced in zip(measured, run_scenario(schema, args, True)):
+                item["peak_memory"] = traced["peak_memory"]
+        results.extend(measured)
+
+    print(
+        "%-26s %-18s %9s %9s %9s %9s %10s"
+        % (
+            "schema",
+            "step",
+            "time (s)",
+            "searches",
+            "entries",
+            "api calls",
+            "peak (KiB)",
+        )
+    )
+    for item in results:
+        peak = item["peak_memory"]
+        print(
+            "%-26s %-18s %9.3f %9d %9d %9d %10s"
+            % (
+                item["schema"],
+                item["step"],
+                item["time"],
+                item["ldap"].get("search", 0),
+                item["ldap"].get("entries", 0),
+                sum(item["openshift"].values()),
+                "-" if peak is None else "%d" % (peak // 1024),
+            )
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
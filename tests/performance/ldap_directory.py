@@ -0,0 +1,495 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Deterministic in-memory stand-in for a python-ldap connection, used by the benchmarks.
+
+FakeLDAPDirectory holds the entries and generates directories of a given size for each schema,
+FakeLDAPConnection implements the part of the python-ldap connection API used by the collection
+(search_ext_s, search_ext/result3 with the simple paged results control), counts the requests and
+can add a latency to each of them.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import random
+import re
+import threading
+import time
+
+import ldap
+from ldap.controls import SimplePagedResultsControl
+
+
+LDAP_ROOT = "dc=ansible,dc=com"
+MODIFY_TIMESTAMP = "20240101000000Z"
+FILTER_ITEM = re.compile(r"^([^=<>~:]+)(:[^=]*)?(>=|<=|~=|=)(.*)$", re.DOTALL)
+FILTER_ESCAPE = re.compile(rb"\\([0-9a-fA-F]{2})")
+LDAP_MATCHING_RULE_IN_CHAIN = "1.2.840.113556.1.4.1941"
+
+
+def unescape_filter_value(value):
+    return FILTER_ESCAPE.sub(
+        lambda m: bytes([int(m.group(1), 16)]), value.encode("utf-8")
+    ).decode("utf-8")
+
+
+def parse_filter(filterstr):
+    """
+    parses a RFC4515 filter string into a tree of (operator, operands) tuples.
+    """
+
+    def _parse(pos):
+        if filterstr[pos] != "(":
+            raise ldap.FILTER_ERROR({"desc": "Bad search filter: %s" % filterstr})
+        pos += 1
+        operator = filterstr[pos]
+        if operator in "&|":
+            pos += 1
+            operands = []
+            while filterstr[pos] == "(":
+                operand, pos = _parse(pos)
+                operands.append(operand)
+            return (operator, operands), pos + 1
+        if operator == "!":
+            operand, pos = _parse(pos + 1)
+            return ("!", operand), pos + 1
+        # the closing parenthesis of a value is escaped
+        end = filterstr.index(")", pos)
+        match = FILTER_ITEM.match(filterstr[pos:end])
+        if not match:
+            raise ldap.FILTER_ERROR({"desc": "Bad search filter: %s" % filterstr})
+        attribute, rule, operator, value = match.groups()
+        if rule and LDAP_MATCHING_RULE_IN_CHAIN in rule:
+            return (
+                "in_chain",
+                attribute.lower(),
+                unescape_filter_value(value).lower(),
+            ), end + 1
+        if operator == "=" and value == "*":
+            return ("present", attribute.lower()), end + 1
+        if operator == "=" and "*" in value:
+            pattern = ".*".join(
+                re.escape(unescape_filter_value(x)) for x in value.split("*")
+            )
+            return (
+                "substring",
+                attribute.lower(),
+                re.compile(pattern, re.I | re.DOTALL),
+            ), end + 1
+        return (
+            operator,
+            attribute.lower(),
+            unescape_filter_value(value).lower(),
+        ), end + 1
+
+    try:
+        tree, pos = _parse(0)
+    except (IndexError, ValueError):
+        raise ldap.FILTER_ERROR({"desc": "Bad search filter: %s" % filterstr})
+    return tree
+
+
+class FakeLDAPDirectory(object):
+    """
+    entries are stored by lowercase DN as (dn, {attribute: [bytes]}) tuples, the equality filters
+    are answered using an index of the values so that the cost of a search does not depend on the size
+    of the directory, as with a real server.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.filters = {}
+        self.index = {}
+        # the lowercase values of each entry, by lowercase DN and attribute name
+        self.values = {}
+
+    def add(self, dn, **attributes):
+        values = {}
+        for key, value in attributes.items():
+            if not isinstance(value, list):
+                value = [value]
+            values[key] = [x.encode("utf-8") for x in value]
+        values.setdefault("modifyTimestamp", [MODIFY_TIMESTAMP.encode()])
+        self.delete(dn)
+        self.entries[dn.lower()] = (dn, values)
+        self.values[dn.lower()] = {}
+        for key, value in self.index_keys(values):
+            self.index.setdefault((key, value), set()).add(dn.lower())
+            self.values[dn.lower()].setdefault(key, set()).add(value)
+
+    def delete(self, dn):
+        entry = self.entries.pop(dn.lower(), None)
+        self.values.pop(dn.lower(), None)
+        if entry:
+            for key in self.index_keys(entry[1]):
+                self.index[key].discard(dn.lower())
+
+    def remove_value(self, attribute, value):
+        """
+        removes the value of the attribute from every entry, e.g. the DN of a deleted group.
+        """
+        for key in list(self.index.get((attribute.lower(), value.lower()), [])):
+            dn, attributes = self.entries[key]
+            updated = {}
+            for name, values in attributes.items():
+                if name.lower() == attribute.lower():
+                    values = [
+                        x for x in values if x.decode("utf-8").lower() != value.lower()
+                    ]
+                updated[name] = [x.decode("utf-8") for x in values]
+            self.add(dn, **updated)
+
+    @staticmethod
+    def index_keys(attributes):
+        for key, values in attributes.items():
+            for value in values:
+                yield key.lower(), value.decode("utf-8").lower()
+
+    def candidates(self, tree):
+        """
+        returns the DNs of the entries which may match the filter, None when every entry needs to be checked.
+        """
+        operator = tree[0]
+        if operator == "=":
+            return self.index.get((tree[1], tree[2]), set())
+        if operator == "in_chain":
+            # the entries whose attribute refers to the target, then to these entries, etc.
+            result = set()
+            pending = [tree[2]]
+            while pending:
+                for key in self.index.get((tree[1], pending.pop()), ()):
+                    if key not in result:
+                        result.add(key)
+                        pending.append(key)
+            return result
+        if operator == "&":
+            result = None
+            for operand in tree[1]:
+                found = self.candidates(operand)
+                if found is not None:
+                    result = found if result is None else result & found
+            return result
+        if operator == "|":
+            result = set()
+            for operand in tree[1]:
+                found = self.candidates(operand)
+                if found is None:
+                    return None
+                result |= found
+            return result
+        return None
+
+    def connect(self, latency=0.0):
+        return FakeLDAPConnection(self, latency)
+
+    def parse(self, filterstr):
+        tree = self.filters.get(filterstr)
+        if tree is None:
+            tree = self.filters[filterstr] = parse_filter(filterstr)
+        return tree
+
+    def match(self, tree, values):
+        operator = tree[0]
+        if operator == "&":
+            return all(self.match(x, values) for x in tree[1])
+        if operator == "|":
+            return any(self.match(x, values) for x in tree[1])
+        if operator == "!":
+            return not self.match(tree[1], values)
+        if operator == "present":
+            return tree[1] == "objectclass" or tree[1] in values
+        values = values.get(tree[1], ())
+        if operator == "in_chain":
+            return self.in_chain(values, tree[1], tree[2])
+        if operator == "substring":
+            return any(tree[2].match(x) for x in values)
+        if operator == ">=":
+            return any(x >= tree[2] for x in values)
+        if operator == "<=":
+            return any(x <= tree[2] for x in values)
+        return tree[2] in values
+
+    def in_chain(self, parents, attribute, target):
+        """
+        returns True when target is one of the parents or one of their ancestors following attribute.
+        """
+        seen = set()
+        pending = list(parents)
+        while pending:
+            dn = pending.pop()
+            if dn == target:
+                return True
+            if dn not in seen:
+                seen.add(dn)
+                pending.extend(self.values.get(dn, {}).get(attribute, ()))
+        return False
+
+    def in_scope(self, dn, base, scope):
+        dn, base = dn.lower(), base.lower()
+        if scope == ldap.SCOPE_BASE:
+            return dn == base
+        if not base:
+            return True
+        if not dn.endswith("," + base):
+            return dn == base and scope == ldap.SCOPE_SUBTREE
+        if scope == ldap.SCOPE_ONELEVEL:
+            return "," not in dn[: -len(base) - 1].replace("\\,", "")
+        return True
+
+    def search(self, base, scope, filterstr, attrlist):
+        if base and base.lower() not in self.entries:
+            raise ldap.NO_SUCH_OBJECT({"desc": "No such object", "matched": LDAP_ROOT})
+        tree = self.parse(filterstr or "(objectClass=*)")
+        requested = None
+        if attrlist and "*" not in attrlist:
+            requested = set(x.lower() for x in attrlist)
+        if scope == ldap.SCOPE_BASE:
+            candidates = [self.entries[base.lower()]]
+        else:
+            keys = self.candidates(tree)
+            if keys is None:
+                candidates = self.entries.values()
+            else:
+                candidates = [self.entries[x] for x in sorted(keys)]
+        result = []
+        for dn, attributes in candidates:
+            if not self.in_scope(dn, base, scope) or not self.match(
+                tree, self.values[dn.lower()]
+            ):
+                continue
+            if requested is not None:
+                attributes = {
+                    k: v for k, v in attributes.items() if k.lower() in requested
+                }
+            result.append((dn, dict(attributes)))
+        return result
+
+    def add_containers(self, *dns):
+        for dn in (LDAP_ROOT,) + dns:
+            rdn = dn.split(",", 1)[0]
+            key, value = rdn.split("=", 1)
+            self.add(
+                dn,
+                objectClass="organizationalUnit" if key == "ou" else "domain",
+                **{key: value}
+            )
+
+    def generate(self, schema, users, groups, members, seed=0, nested=False):
+        """
+        fills the directory with users and groups whose members are chosen randomly, with nested
+        groups the groups form a binary tree (group N is a member of group (N - 1) / 2).
+        returns the sync config and the DNs of the groups.
+        """
+        rng = random.Random(seed)
+        user_dns = []
+        group_dns = []
+        membership = {}
+        if schema == "rfc2307":
+            users_base = "ou=people,ou=rfc2307,%s" % LDAP_ROOT
+            groups_base = "ou=groups,ou=rfc2307,%s" % LDAP_ROOT
+            self.add_containers("ou=rfc2307,%s" % LDAP_ROOT, users_base, groups_base)
+        elif schema == "activeDirectory":
+            users_base = "ou=engineers,ou=activeD,%s" % LDAP_ROOT
+            groups_base = "ou=groups,ou=activeD,%s" % LDAP_ROOT
+            self.add_containers("ou=activeD,%s" % LDAP_ROOT, users_base, groups_base)
+        else:
+            users_base = "ou=employee,ou=augmentedAD,%s" % LDAP_ROOT
+            groups_base = "ou=category,ou=augmentedAD,%s" % LDAP_ROOT
+            self.add_containers(
+                "ou=augmentedAD,%s" % LDAP_ROOT, users_base, groups_base
+            )
+
+        for i in range(users):
+            user_dns.append("cn=user%06d,%s" % (i, users_base))
+        for i in range(groups):
+            dn = "cn=group%06d,%s" % (i, groups_base)
+            group_dns.append(dn)
+            membership[dn] = rng.sample(user_dns, min(members, len(user_dns)))
+
+        member_of = {}
+        for dn, group_members in membership.items():
+            for user_dn in group_members:
+                member_of.setdefault(user_dn, []).append(dn)
+        for dn in user_dns:
+            name = dn.split(",", 1)[0][3:]
+            attributes = dict(
+                objectClass="inetOrgPerson",
+                cn=name,
+                sn=name,
+                mail="%s@ansible.com" % name,
+            )
+            if schema != "rfc2307" and dn in member_of:
+                attributes["memberOf"] = member_of[dn]
+            self.add(dn, **attributes)
+        parents = {}
+        children = {}
+        if nested:
+            for i, dn in enumerate(group_dns[1:], 1):
+                parents[dn] = group_dns[(i - 1) // 2]
+                children.setdefault(parents[dn], []).append(dn)
+        for dn, group_members in membership.items():
+            attributes = dict(objectClass="groupOfNames", cn=dn.split(",", 1)[0][3:])
+            if schema == "rfc2307":
+                attributes["member"] = group_members + children.get(dn, [])
+            else:
+                attributes["member"] = group_members
+                if dn in parents:
+                    attributes["memberOf"] = parents[dn]
+            if schema != "activeDirectory" or nested:
+                self.add(dn, **attributes)
+
+        users_query = dict(
+            baseDN=users_base,
+            scope="sub",
+            derefAliases="never",
+            filter="(objectclass=inetOrgPerson)",
+        )
+        groups_query = dict(
+            baseDN=groups_base,
+            scope="sub",
+            derefAliases="never",
+            filter="(objectclass=groupOfNames)",
+        )
+        if schema == "rfc2307":
+            definition = dict(
+                groupsQuery=groups_query,
+                groupUIDAttribute="dn",
+                groupNameAttributes=["cn"],
+                groupMembershipAttributes=["member"],
+                usersQuery=users_query,
+                userUIDAttribute="dn",
+                userNameAttributes=["mail"],
+            )
+        elif schema == "activeDirectory":
+            definition = dict(
+                usersQuery=users_query,
+                userNameAttributes=["mail"],
+                groupMembershipAttributes=["memberOf"],
+            )
+        else:
+            definition = dict(
+                groupsQuery=groups_query,
+                groupUIDAttribute="dn",
+                groupNameAttributes=["cn"],
+                usersQuery=users_query,
+                userNameAttributes=["mail"],
+                groupMembershipAttributes=["memberOf"],
+            )
+        config = {
+            "kind": "LDAPSyncConfig",
+            "apiVersion": "v1",
+            "url": "ldap://ldap.benchmark:389",
+            "insecure": True,
+            schema: definition,
+        }
+        return config, group_dns
+
+
+class FakeLDAPConnection(object):
+    def __init__(self, directory, latency=0.0):
+        self.directory = directory
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.counts = dict(bind=0, search=0, entries=0)
+        self.pending = {}
+        self.msgid = 0
+        self.options = {}
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def get_option(self, option):
+        return self.options.get(option)
+
+    def simple_bind_s(self, who=None, cred=None, serverctrls=None, clientctrls=None):
+        self.count("bind")
+        time.sleep(self.latency)
+
+    def simple_bind(self, who=None, cred=None, serverctrls=None, clientctrls=None):
+        self.count("bind")
+        with self.lock:
+            self.msgid += 1
+            msgid = self.msgid
+        self.pending[msgid] = (time.monotonic() + self.latency, [], None)
+        return msgid
+
+    def unbind_s(self):
+        pass
+
+    def search(self, base, scope, filterstr, attrlist, sizelimit=0):
+        self.count("search")
+        result = self.directory.search(base, scope, filterstr, attrlist)
+        if sizelimit and len(result) > sizelimit:
+            raise ldap.SIZELIMIT_EXCEEDED({"desc": "Size limit exceeded"})
+        return result
+
+    def search_ext_s(
+        self,
+        base,
+        scope,
+        filterstr="(objectClass=*)",
+        attrlist=None,
+        attrsonly=0,
+        serverctrls=None,
+        clientctrls=None,
+        timeout=-1,
+        sizelimit=0,
+    ):
+        time.sleep(self.latency)
+        result = self.search(base, scope, filterstr, attrlist, sizelimit)
+        self.count("entries", len(result))
+        return result
+
+    def search_ext(
+        self,
+        base,
+        scope,
+        filterstr="(objectClass=*)",
+        attrlist=None,
+        attrsonly=0,
+        serverctrls=None,
+        clientctrls=None,
+        timeout=-1,
+        sizelimit=0,
+    ):
+        # the requests sent before waiting for their results are answered concurrently
+        with self.lock:
+            self.msgid += 1
+            msgid = self.msgid
+        page = None
+        for control in serverctrls or []:
+            if control.controlType == SimplePagedResultsControl.controlType:
+                page = control
+        try:
+            result = self.search(base, scope, filterstr, attrlist, sizelimit)
+        except ldap.LDAPError as exc:
+            result = exc
+        self.pending[msgid] = (time.monotonic() + self.latency, result, page)
+        return msgid
+
+    def result3(self, msgid=ldap.RES_ANY, all=1, timeout=None):
+        deadline, result, page = self.pending.pop(msgid)
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        serverctrls = []
+        if page is not None and page.size:
+            offset = int(page.cookie or b"0")
+            cookie = b""
+            if offset + page.size < len(result):
+                cookie = str(offset + page.size).encode()
+            result = result[offset : offset + page.size]  # noqa: E203
+            serverctrls.append(
+                SimplePagedResultsControl(True, size=page.size, cookie=cookie)
+            )
+        self.count("entries", len(result))
+        return ldap.RES_SEARCH_RESULT, result, msgid, serverctrls
@@ -0,0 +1,75 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Micro-benchmark of the LDAP search requests built for each group member.
+
+Usage (python-ldap and the collection need to be importable):
+    python tests/performance/ldap_query_benchmark.py [--count 100000]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import argparse
+import time
+
+import ldap
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap import (
+    OpenshiftLDAPQueryOnAttribute,
+)
+
+
+def measure(label, count, func, values):
+    start = time.perf_counter()
+    for i in range(count):
+        func(values[i % len(values)])
+    elapsed = time.perf_counter() - start
+    print(
+        "%-32s %8d lookups %8.3f s %8.2f us/lookup"
+        % (label, count, elapsed, elapsed * 1e6 / count)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    attributes = ["dn", "uid", "mail"]
+    uids = ["user%05d" % i for i in range(1000)]
+    dns = ["uid=%s,ou=people,ou=users,dc=ansible,dc=com" % uid for uid in uids]
+    qry = dict(
+        base="ou=users,dc=ansible,dc=com",
+        scope=ldap.SCOPE_SUBTREE,
+        filterstr="(objectClass=inetOrgPerson)",
+        derefAlias=ldap.DEREF_NEVER,
+    )
+
+    by_attribute = OpenshiftLDAPQueryOnAttribute(qry, "uid")
+    by_dn = OpenshiftLDAPQueryOnAttribute(qry, "dn")
+
+    measure(
+        "escape_filter",
+        args.count,
+        OpenshiftLDAPQueryOnAttribute.escape_filter,
+        ["john (admin)*", "équipe"] + uids,
+    )
+    measure(
+        "build_request (attribute)",
+        args.count,
+        lambda uid: by_attribute.build_request(uid, attributes),
+        uids,
+    )
+    measure(
+        "build_request (dn)",
+        args.count,
+        lambda dn: by_dn.build_request(dn, attributes),
+        dns,
+    )
+
+
+if __name__ == "__main__":
+    main()
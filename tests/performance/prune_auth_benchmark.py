@@ -0,0 +1,168 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of openshift_adm_prune_auth removing users from generated bindings.
+
+The OpenShift cluster is replaced by an in-memory fake holding the users, the RoleBindings,
+ClusterRoleBindings, Security Context Constraints and Groups (see the FakeCluster of the unit
+tests), the users labelled for offboarding are pruned in a single run.
+
+Usage (the kubernetes.core and community.okd collections and pytest need to be importable):
+    python tests/performance/prune_auth_benchmark.py [--users 10000] [--bindings 20000]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import argparse
+import json
+import random
+import time
+from collections import Counter
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_adm_prune_auth import (
+    OpenShiftAdmPruneAuth,
+)
+from ansible_collections.community.okd.plugins.modules.openshift_adm_prune_auth import (
+    argument_spec,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils.openshift_fakes import (
+    FakeCluster,
+    make_object,
+    run_module,
+)
+
+
+OFFBOARDING_LABEL = "benchmark/offboarding=true"
+
+
+def generate(args):
+    """
+    returns the objects of a cluster with args.users users, args.bindings RoleBindings having
+    args.subjects subjects each, and a tenth of ClusterRoleBindings, Groups and SCCs.
+    """
+    rnd = random.Random(args.seed)
+    users = ["user-%d" % i for i in range(args.users)]
+    offboarded = set(rnd.sample(users, int(args.users * args.prune_ratio)))
+    objects = {
+        "User": [],
+        "RoleBinding": [],
+        "ClusterRoleBinding": [],
+        "Group": [],
+        "SecurityContextConstraints": [],
+        "OAuthClientAuthorization": [],
+    }
+    for name in users:
+        labels = {}
+        if name in offboarded:
+            key, value = OFFBOARDING_LABEL.split("=")
+            labels[key] = value
+        user = make_object("User", name)
+        user["metadata"]["labels"] = labels
+        objects["User"].append(user)
+
+    def _subjects():
+        return [dict(kind="User", name=x) for x in rnd.sample(users, args.subjects)]
+
+    for i in range(args.bindings):
+        namespace = "ns-%d" % (i % 100)
+        objects["RoleBinding"].append(
+            make_object("RoleBinding", "rb-%d" % i, namespace, subjects=_subjects())
+        )
+    for i in range(args.bindings // 10):
+        objects["ClusterRoleBinding"].append(
+            make_object("ClusterRoleBinding", "crb-%d" % i, subjects=_subjects())
+        )
+    for i in range(max(args.users // 10, 1)):
+        objects["Group"].append(
+            make_object(
+                "Group", "group-%d" % i, users=rnd.sample(users, args.subjects * 10)
+            )
+        )
+    for i in range(args.users):
+        objects["OAuthClientAuthorization"].append(
+            make_object("OAuthClientAuthorization", "auth-%d" % i, userName=users[i])
+        )
+    for i in range(10):
+        objects["SecurityContextConstraints"].append(
+            make_object(
+                "SecurityContextConstraints",
+                "scc-%d" % i,
+                users=rnd.sample(users, min(args.users, 1000)),
+            )
+        )
+    return objects
+
+
+def run_scenario(args):
+    cluster = FakeCluster(generate(args))
+    start = time.perf_counter()
+    result = run_module(
+        OpenShiftAdmPruneAuth,
+        argument_spec(),
+        cluster,
+        check_mode=args.check_mode,
+        resource="users",
+        label_selectors=[OFFBOARDING_LABEL],
+        workers=args.workers,
+        stats=True,
+    )
+    elapsed = time.perf_counter() - start
+    return dict(
+        time=elapsed,
+        role_bindings=len(result["role_binding"]),
+        cluster_role_bindings=len(result["cluster_role_binding"]),
+        groups=len(result["group"]),
+        sccs=len(result["security_context_constraints"]),
+        authorizations=len(result["authorization"]),
+        api=dict(Counter("%s %s" % (verb, kind) for verb, kind, x in cluster.calls)),
+        stats=result.get("stats"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--bindings", type=int, default=20000)
+    parser.add_argument("--subjects", type=int, default=10, help="subjects per binding")
+    parser.add_argument(
+        "--prune-ratio",
+        type=float,
+        default=1.0,
+        help="ratio of the users pruned",
+    )
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument(
+        "--check-mode",
+        action="store_true",
+        help="compute the updates without patching the objects",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    result = run_scenario(args)
+
+    print(
+        "%9s %9s %9s %9s %9s %9s" % ("time (s)", "rb", "crb", "groups", "sccs", "oauth")
+    )
+    print(
+        "%9.3f %9d %9d %9d %9d %9d"
+        % (
+            result["time"],
+            result["role_bindings"],
+            result["cluster_role_bindings"],
+            result["groups"],
+            result["sccs"],
+            result["authorizations"],
+        )
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
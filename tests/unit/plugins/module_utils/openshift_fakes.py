@@ -0,0 +1,308 @@
+"""
+In-memory OpenShift cluster and Ansible module used to run the modules based on
+AnsibleOpenshiftModule without an API server.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import copy
+import json
+import threading
+import time
+from unittest import mock
+
+import pytest
+from kubernetes.client.rest import ApiException
+from kubernetes.dynamic.exceptions import (
+    ConflictError,
+    DynamicApiError,
+    NotFoundError,
+    api_exception,
+)
+
+from ansible_collections.community.okd.plugins.module_utils import openshift_common
+
+
+class ModuleExit(Exception):
+    def __init__(self, result, failed=False):
+        super(ModuleExit, self).__init__(result.get("msg"))
+        self.result = result
+        self.failed = failed
+
+
+class FakeModule(object):
+    check_mode = False
+
+    def __init__(self, params, argument_spec=None, check_mode=False, **kwargs):
+        self.params = {k: v.get("default") for k, v in argument_spec.items()}
+        self.params.update(params)
+        self.check_mode = check_mode
+
+    def warn(self, msg):
+        pass
+
+    def exit_json(self, **kwargs):
+        raise ModuleExit(kwargs)
+
+    def fail_json(self, **kwargs):
+        raise ModuleExit(kwargs, failed=True)
+
+
+class Result(object):
+    def __init__(self, definition):
+        self.definition = definition
+
+    def to_dict(self):
+        return copy.deepcopy(self.definition)
+
+
+def object_key(obj):
+    return (obj["metadata"].get("namespace") or "", obj["metadata"]["name"])
+
+
+class FakeResource(object):
+    def __init__(self, cluster, kind):
+        self.cluster = cluster
+        self.kind = kind
+
+    def objects(self, namespace=None):
+        with self.cluster.lock:
+            return [
+                x
+                for x in self.cluster.objects.get(self.kind, [])
+                if namespace is None or x["metadata"].get("namespace") == namespace
+            ]
+
+    def find(self, name, namespace=None):
+        objects, index = self.cluster.lookup(self.kind)
+        position = index.get((namespace or "", name))
+        if position is not None:
+            return objects[position]
+        if namespace is None:
+            for obj in self.objects():
+                if obj["metadata"]["name"] == name:
+                    return obj
+
+    def get(
+        self,
+        name=None,
+        namespace=None,
+        label_selector=None,
+        field_selector=None,
+        limit=None,
+        _continue=None,
+    ):
+        if name:
+            self.cluster.record(("get", self.kind, name))
+            return Result(self.find(name, namespace))
+        self.cluster.record(("list", self.kind, field_selector or namespace))
+        items = self.objects(namespace)
+        if label_selector:
+            # only the existence of the label is supported
+            items = [
+                x for x in items if label_selector in x["metadata"].get("labels", {})
+            ]
+        if field_selector:
+            key, value = field_selector.split("=", 1)
+            items = [x for x in items if x.get(key) == value]
+        metadata = {}
+        if limit:
+            # like the API server, the next page starts after the last object returned
+            # so that the objects deleted meanwhile do not shift the pages
+            items = sorted(items, key=object_key)
+            if _continue and self.cluster.list_errors:
+                self.fail_list(self.cluster.list_errors.pop(0), _continue)
+            if _continue:
+                last = tuple(_continue.split("/", 1))
+                items = [x for x in items if object_key(x) > last]
+            if len(items) > limit:
+                items = items[:limit]
+                metadata["continue"] = "/".join(object_key(items[-1]))
+        return Result({"metadata": metadata, "items": items})
+
+    def fail_list(self, status, _continue):
+        exc = ApiException(status=status, reason="Failure")
+        exc.body = json.dumps({"kind": "Status", "code": status, "metadata": {}})
+        if status == 410 and self.cluster.resume_expired:
+            # the status of an expired listing holds a token to resume it
+            exc.body = json.dumps(
+                {"kind": "Status", "code": status, "metadata": {"continue": _continue}}
+            )
+        raise api_exception(exc)
+
+    def create(self, body, namespace=None):
+        name = body["metadata"]["name"]
+        self.cluster.record(("create", self.kind, name))
+        if self.find(name, namespace or body["metadata"].get("namespace")):
+            raise ConflictError(ApiException(status=409, reason="AlreadyExists"))
+        obj = copy.deepcopy(body)
+        obj["metadata"]["resourceVersion"] = "1"
+        with self.cluster.lock:
+            objects, index = self.cluster.lookup(self.kind)
+            objects.append(obj)
+            index[object_key(obj)] = len(objects) - 1
+        return Result(obj)
+
+    def patch(self, body, name=None, namespace=None, content_type=None):
+        if content_type is None:
+            # the definition of the object is merged into the existing one
+            return self.replace(body, namespace)
+        assert content_type == "application/json-patch+json"
+        self.cluster.record(("patch", self.kind, name))
+        obj = self.find(name, namespace)
+        for op in body:
+            if op["path"] == "/metadata/resourceVersion":
+                if op["value"] != obj["metadata"]["resourceVersion"]:
+                    raise ConflictError(ApiException(status=409, reason="Conflict"))
+        for op in body:
+            if op["path"] != "/metadata/resourceVersion":
+                obj[op["path"][1:]] = copy.deepcopy(op["value"])
+        obj["metadata"]["resourceVersion"] = str(
+            int(obj["metadata"]["resourceVersion"]) + 1
+        )
+        return Result(obj)
+
+    def replace(self, body, namespace=None):
+        name = body["metadata"]["name"]
+        self.cluster.record(("patch", self.kind, name))
+        obj = self.find(name, namespace or body["metadata"].get("namespace"))
+        if obj is None:
+            raise NotFoundError(ApiException(status=404, reason="Not Found"))
+        version = int(obj["metadata"].get("resourceVersion") or 0)
+        obj.clear()
+        obj.update(copy.deepcopy(body))
+        obj["metadata"]["resourceVersion"] = str(version + 1)
+        return Result(obj)
+
+    def delete(self, name, namespace=None, body=None):
+        self.cluster.record(("delete", self.kind, name))
+        if (namespace, name) in self.cluster.failures:
+            raise DynamicApiError(ApiException(status=500, reason="Internal Error"))
+        return self.cluster.remove(self.kind, (namespace or "", name))
+
+    def apply(self, definition, namespace=None):
+        self.cluster.record(("apply", self.kind, definition["metadata"]["name"]))
+        return Result(definition)
+
+
+class FakeCluster(object):
+    """
+    FakeCluster holds the objects per kind, it serves as the API client and as the K8sService
+    of the module. The requests are recorded into calls as (verb, kind, detail) tuples.
+    The objects are indexed by (namespace, name) so that the benchmarks can use large clusters,
+    the order of the objects of a kind is not kept when some of them are deleted.
+    """
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.indexes = {}
+        self.calls = []
+        # the time (in seconds) each request takes
+        self.latency = 0.0
+        self.lock = threading.RLock()
+        # the (namespace, name) of the objects whose deletion fails
+        self.failures = set()
+        # the status of the errors returned instead of the next pages of a listing
+        self.list_errors = []
+        # whether the 410 Gone errors of list_errors hold a continue token
+        self.resume_expired = False
+        self.client = self
+
+    def record(self, call):
+        self.calls.append(call)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def lookup(self, kind):
+        """
+        returns the objects of kind and the position of each of them by (namespace, name).
+        """
+        with self.lock:
+            objects = self.objects.setdefault(kind, [])
+            index = self.indexes.get(kind)
+            if index is None or len(index) != len(objects):
+                # the objects were added or removed by the test
+                index = {object_key(x): i for i, x in enumerate(objects)}
+                self.indexes[kind] = index
+            return objects, index
+
+    def remove(self, kind, key):
+        # the objects are deleted from several threads
+        with self.lock:
+            objects, index = self.lookup(kind)
+            position = index.pop(key, None)
+            if position is None:
+                return None
+            obj, last = objects[position], objects.pop()
+            if position < len(objects):
+                objects[position] = last
+                index[object_key(last)] = position
+            return Result(obj)
+
+    def find_resource(self, kind, api_version, fail=False):
+        return FakeResource(self, kind)
+
+    def find(self, kind, api_version, name=None, namespace=None, **kwargs):
+        if name:
+            self.record(("get", kind, name))
+        else:
+            self.record(("list", kind, namespace))
+        resources = FakeResource(self, kind).objects(namespace)
+        if name:
+            resources = [x for x in resources if x["metadata"]["name"] == name]
+        for selector in kwargs.get("label_selectors") or []:
+            key, value = selector.split("=", 1)
+            resources = [
+                x
+                for x in resources
+                if x["metadata"].get("labels", {}).get(key) == value
+            ]
+        return {"api_found": True, "resources": copy.deepcopy(resources)}
+
+    def request(self, method, path, body=None, content_type=None):
+        self.record(("request", method, path))
+        return Result(body)
+
+
+def make_module(module_class, argument_spec, cluster, check_mode=False, **params):
+    """
+    returns an instance of the module using the cluster as API client and K8sService.
+    """
+    with mock.patch.object(
+        openshift_common, "get_api_client", return_value=cluster
+    ), mock.patch.object(openshift_common, "K8sService", return_value=cluster):
+        return module_class(
+            argument_spec=argument_spec,
+            supports_check_mode=True,
+            module_class=lambda **kwargs: FakeModule(
+                params, check_mode=check_mode, **kwargs
+            ),
+            check_k8s=False,
+            check_pyyaml=False,
+        )
+
+
+def run_module(
+    module_class, argument_spec, cluster, failed=False, check_mode=False, **params
+):
+    """
+    runs the module against the cluster and returns the result, the module is expected
+    to fail when failed is True.
+    """
+    module = make_module(
+        module_class, argument_spec, cluster, check_mode=check_mode, **params
+    )
+    with pytest.raises(ModuleExit) as exc:
+        module.execute_module()
+    assert exc.value.failed == failed, exc.value.result
+    return exc.value.result
+
+
+def make_object(kind, name, namespace=None, **kwargs):
+    metadata = dict(name=name, resourceVersion="1")
+    if namespace:
+        metadata["namespace"] = namespace
+    return dict(kind=kind, metadata=metadata, **kwargs)
@@ -0,0 +1,245 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap_cache import (
+    OpenshiftLDAPCache,
+    OpenshiftLDAPCacheSection,
+    LDAPDirSyncControl,
+    OpenshiftLDAPSyncreplConsumer,
+    ldap_dirsync_refresh,
+    ldap_generalized_time,
+)
+import pytest
+
+
+def test_generalized_time():
+    assert ldap_generalized_time(0) == "19700101000000.0Z"
+    assert ldap_generalized_time(1639743628) == "20211217122028.0Z"
+
+
+def test_cache_roundtrip(tmp_path):
+    path = str(tmp_path / "cache.json")
+    qry = dict(base="ou=users,dc=ansible,dc=com", filterstr="(objectClass=person)")
+    attributes = ["mail", "dn"]
+
+    cache = OpenshiftLDAPCache(path, url="ldap://localhost:1390", max_age=60)
+    assert cache.load() is None
+    section = cache.section(qry, attributes)
+    assert section.modified_since() is None
+    section.add(("cn=john,ou=users,dc=ansible,dc=com", {"mail": [b"john@ansible.com"]}))
+    assert cache.save() is None
+
+    cache = OpenshiftLDAPCache(path, url="ldap://localhost:1390", max_age=60)
+    assert cache.load() is None
+    section = cache.section(qry, attributes)
+    assert section.items() == [
+        ("cn=john,ou=users,dc=ansible,dc=com", {"mail": ["john@ansible.com"]})
+    ]
+    assert section.modified_since() is not None
+
+    # entries are stored per server and query
+    other = OpenshiftLDAPCache(path, url="ldap://otherhost:1390", max_age=60)
+    other.load()
+    assert other.section(qry, attributes).items() == []
+
+
+def test_cache_expired(tmp_path):
+    path = str(tmp_path / "cache.json")
+    qry = dict(base="ou=users,dc=ansible,dc=com")
+
+    cache = OpenshiftLDAPCache(path, url="ldap://localhost:1390", max_age=60)
+    cache.section(qry, ["mail"]).add(("cn=john,ou=users,dc=ansible,dc=com", {}))
+    cache.started -= 3601
+    cache.sections[cache.key(qry, ["mail"])].created = cache.started
+    assert cache.save() is None
+
+    cache = OpenshiftLDAPCache(path, url="ldap://localhost:1390", max_age=60)
+    cache.load()
+    assert cache.section(qry, ["mail"]).items() == []
+
+
+def test_cache_invalid_file(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("not a json document")
+
+    cache = OpenshiftLDAPCache(str(path), url="ldap://localhost:1390")
+    assert cache.load().startswith("Unable to read LDAP cache file")
+    assert cache.section(dict(base="dc=ansible,dc=com"), ["mail"]).items() == []
+
+
+def test_section_changes():
+    section = OpenshiftLDAPCacheSection(
+        dict(
+            entries={
+                "cn=john,ou=users,dc=ansible,dc=com": {"mail": ["john@ansible.com"]},
+                "cn=jane,ou=users,dc=ansible,dc=com": {"mail": ["jane@ansible.com"]},
+            },
+            ids={
+                "1": "cn=john,ou=users,dc=ansible,dc=com",
+                "2": "cn=jane,ou=users,dc=ansible,dc=com",
+            },
+            cookie="rid=000,csn=1",
+        )
+    )
+    section.incremental = True
+
+    # unchanged entries are not recorded
+    section.apply(
+        "cn=john,ou=users,dc=ansible,dc=com", {"mail": [b"john@ansible.com"]}, uid="1"
+    )
+    assert section.changes == {}
+
+    # renamed entry
+    section.apply(
+        "cn=janet,ou=users,dc=ansible,dc=com", {"mail": [b"jane@ansible.com"]}, uid="2"
+    )
+    assert section.changes == {
+        "cn=jane,ou=users,dc=ansible,dc=com": {"mail": ["jane@ansible.com"]},
+        "cn=janet,ou=users,dc=ansible,dc=com": None,
+    }
+    assert sorted(section.entries) == [
+        "cn=janet,ou=users,dc=ansible,dc=com",
+        "cn=john,ou=users,dc=ansible,dc=com",
+    ]
+
+
+def test_syncrepl_present_phase():
+    section = OpenshiftLDAPCacheSection(
+        dict(
+            entries={
+                "cn=john,ou=users,dc=ansible,dc=com": {"mail": ["john@ansible.com"]},
+                "cn=jane,ou=users,dc=ansible,dc=com": {"mail": ["jane@ansible.com"]},
+            },
+            ids={
+                "1": "cn=john,ou=users,dc=ansible,dc=com",
+                "2": "cn=jane,ou=users,dc=ansible,dc=com",
+            },
+            cookie="rid=000,csn=1",
+        )
+    )
+    section.incremental = True
+    consumer = OpenshiftLDAPSyncreplConsumer(connection=None, section=section)
+
+    consumer.syncrepl_entry(
+        "cn=mathew,ou=users,dc=ansible,dc=com", {"mail": [b"mathew@ansible.com"]}, "3"
+    )
+    consumer.syncrepl_present(["1", "3"])
+    consumer.syncrepl_present(None, refreshDeletes=False)
+    consumer.syncrepl_set_cookie("rid=000,csn=2")
+
+    assert sorted(section.entries) == [
+        "cn=john,ou=users,dc=ansible,dc=com",
+        "cn=mathew,ou=users,dc=ansible,dc=com",
+    ]
+    assert sorted(section.changes) == [
+        "cn=jane,ou=users,dc=ansible,dc=com",
+        "cn=mathew,ou=users,dc=ansible,dc=com",
+    ]
+    assert section.cookie == "rid=000,csn=2"
+
+    # delete phase
+    consumer.syncrepl_delete(["3"])
+    consumer.syncrepl_present(None, refreshDeletes=True)
+    assert list(section.entries) == ["cn=john,ou=users,dc=ansible,dc=com"]
+
+
+class FakeDirSyncConnection(object):
+    """
+    Active Directory server answering the DirSync searches like a real one: the back-link
+    attributes (memberOf) are never returned, only the entries changed since the cookie are.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.state = 1
+        self.changed = {}
+        self.searches = []
+
+    def change(self, dn, **attrs):
+        self.state += 1
+        self.entries[dn].update(attrs)
+        self.changed[dn] = self.state
+
+    def search_s(self, base, scope, filterstr, attrlist=None):
+        self.searches.append(("base", base))
+        if base == "":
+            return [("", {"defaultNamingContext": [b"dc=ansible,dc=com"]})]
+        return [(base, self.attributes(base, attrlist))]
+
+    def search_ext_s(self, base, scope, filterstr, attrlist=None, timeout=-1):
+        self.searches.append(("search", base))
+        return [(dn, self.attributes(dn, attrlist)) for dn in sorted(self.entries)]
+
+    def search_ext(self, base, scope, filterstr, attrlist=None, serverctrls=None, **kw):
+        self.searches.append(("dirsync", base))
+        since = int(serverctrls[0].cookie or 0)
+        self.rdata = [
+            (dn, self.attributes(dn, [x for x in attrlist if x != "memberOf"]))
+            for dn in sorted(self.entries)
+            if self.changed.get(dn, 1) > since
+        ]
+        return 1
+
+    def result3(self, msgid, resp_ctrl_classes=None):
+        ctrl = LDAPDirSyncControl(cookie=str(self.state).encode())
+        return 101, self.rdata, msgid, [ctrl]
+
+    def attributes(self, dn, attrlist):
+        return {k: list(v) for k, v in self.entries[dn].items() if k in attrlist}
+
+
+def test_dirsync_refresh_back_links():
+    ldap = pytest.importorskip("ldap")
+    users = "ou=users,dc=ansible,dc=com"
+    connection = FakeDirSyncConnection(
+        {
+            "cn=%s,%s"
+            % (name, users): {
+                "objectGUID": [guid],
+                "mail": [b"%s@ansible.com" % name.encode()],
+                "memberOf": [b"cn=admins,ou=groups,dc=ansible,dc=com"],
+            }
+            for name, guid in (("john", b"\x01"), ("jane", b"\x02"))
+        }
+    )
+    qry = dict(base=users, scope=ldap.SCOPE_SUBTREE, filterstr="(objectClass=user)")
+    attributes = ["mail", "memberOf"]
+    section = OpenshiftLDAPCacheSection()
+
+    # without cookie, the entries are read using a regular search
+    assert ldap_dirsync_refresh(connection, qry, attributes, section) is None
+    assert section.complete
+    assert section.items() == [
+        (
+            "cn=jane,%s" % users,
+            {
+                "mail": ["jane@ansible.com"],
+                "memberof": ["cn=admins,ou=groups,dc=ansible,dc=com"],
+            },
+        ),
+        (
+            "cn=john,%s" % users,
+            {
+                "mail": ["john@ansible.com"],
+                "memberof": ["cn=admins,ou=groups,dc=ansible,dc=com"],
+            },
+        ),
+    ]
+    assert [x[0] for x in connection.searches] == ["base", "dirsync", "search"]
+
+    # the changed entries are read again
+    connection.change("cn=john,%s" % users, mail=[b"john@redhat.com"])
+    connection.searches = []
+    assert ldap_dirsync_refresh(connection, qry, attributes, section) is None
+    assert section.entries["cn=john,%s" % users] == {
+        "mail": ["john@redhat.com"],
+        "memberof": ["cn=admins,ou=groups,dc=ansible,dc=com"],
+    }
+    assert list(section.changes) == ["cn=john,%s" % users]
+    assert connection.searches == [
+        ("base", ""),
+        ("dirsync", "dc=ansible,dc=com"),
+        ("base", "cn=john,%s" % users),
+    ]
@@ -6,6 +6,8 @@ __metaclass__ = type
 from ansible_collections.community.okd.plugins.module_utils.openshift_ldap import (
     openshift_equal_dn,
     openshift_ancestorof_dn,
+    openshift_ldap_dn_in_base,
+    openshift_ldap_dn_tuple,
 )
 import pytest
 
@@ -46,3 +48,21 @@ def test_ancestor_of_dn():
     assert not openshift_ancestorof_dn(
         "ou=users,dc=ansible,dc=com", "cn=mathew,ou=users,dc=ansible,dc=org"
     )
+
+
+def test_dn_in_base():
+    base = openshift_ldap_dn_tuple("ou=users,dc=ansible,dc=com")
+    assert openshift_ldap_dn_in_base(base, base)
+    assert openshift_ldap_dn_in_base(
+        openshift_ldap_dn_tuple("cn=john,ou=users,dc=ansible,dc=com"), base
+    )
+    assert not openshift_ldap_dn_in_base(
+        openshift_ldap_dn_tuple("cn=john,ou=admins,dc=ansible,dc=com"), base
+    )
+    assert not openshift_ldap_dn_in_base(
+        openshift_ldap_dn_tuple("dc=ansible,dc=com"), base
+    )
+    # the parsed DNs are memoized
+    assert openshift_ldap_dn_tuple(
+        "cn=john,ou=users,dc=ansible,dc=com"
+    ) is openshift_ldap_dn_tuple("cn=john,ou=users,dc=ansible,dc=com")
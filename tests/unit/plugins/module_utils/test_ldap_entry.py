@@ -0,0 +1,479 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import re
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap import (
+    OpenshiftLDAP_ADInterface,
+    OpenshiftLDAPInterface,
+    OpenshiftLDAPQuery,
+    OpenshiftLDAPQueryOnAttribute,
+    openshift_ldap_attrlist,
+    openshift_ldap_get_attribute_for_entry,
+    openshift_ldap_get_username_for_entry,
+    openshift_ldap_membership_attribute,
+    openshift_ldap_normalize_entries,
+)
+import pytest
+
+try:
+    import ldap  # pylint: disable=unused-import
+except ImportError:
+    pytestmark = pytest.mark.skip("This test requires the python-ldap library")
+
+
+class RangedConnection(object):
+    def __init__(self, members, page_size):
+        self.members = members
+        self.page_size = page_size
+        self.requests = []
+
+    def search_ext_s(self, base, scope, filterstr, attrlist):
+        self.requests.append(attrlist)
+        name, start = attrlist[0].split(";range=")
+        start = int(start.split("-")[0])
+        end = start + self.page_size - 1
+        if end >= len(self.members) - 1:
+            key = "%s;range=%d-*" % (name, start)
+        else:
+            key = "%s;range=%d-%d" % (name, start, end)
+        return [(base, {key: self.members[start : end + 1]})]  # noqa: E203
+
+
+def test_normalize_entries():
+    connection = RangedConnection(members=[], page_size=2)
+    entries = [
+        (
+            "cn=admins,ou=groups,dc=ansible,dc=com",
+            {"CN": b"admins", "objectGUID": [b"\xff\xfe\x00"], "Mail": [b"a", "b"]},
+        ),
+        (None, ["ldap://otherhost/dc=ansible,dc=com"]),
+    ]
+    result = openshift_ldap_normalize_entries(connection, entries)
+    assert result == [
+        (
+            "cn=admins,ou=groups,dc=ansible,dc=com",
+            {"cn": ["admins"], "objectguid": [], "mail": ["a", "b"]},
+        )
+    ]
+    assert openshift_ldap_get_attribute_for_entry(result[0], ["displayName", "cn"]) == [
+        "admins"
+    ]
+    assert openshift_ldap_get_attribute_for_entry(result[0], "DN") == result[0][0]
+    assert openshift_ldap_get_attribute_for_entry(result[0], "uid") == ""
+    assert connection.requests == []
+
+
+def test_normalize_ranged_member():
+    members = [("cn=user%d,ou=users,dc=ansible,dc=com" % i).encode() for i in range(7)]
+    connection = RangedConnection(members=members, page_size=3)
+    entries = [
+        (
+            "cn=admins,ou=groups,dc=ansible,dc=com",
+            {"member;range=0-2": members[:3], "cn": [b"admins"]},
+        )
+    ]
+    result = openshift_ldap_normalize_entries(connection, entries)
+    assert result[0][1]["member"] == [x.decode() for x in members]
+    assert "member;range=0-2" not in result[0][1]
+    assert connection.requests == [["member;range=3-*"], ["member;range=6-*"]]
+
+
+def test_attrlist():
+    assert openshift_ldap_attrlist(["dn", "cn", "member"]) == ["cn", "member"]
+    assert openshift_ldap_attrlist(["DN"]) == ["1.1"]
+
+
+class DirectoryConnection(object):
+    def __init__(self, entries):
+        self.entries = entries
+        self.searches = []
+        self.pending = {}
+
+    def search_ext_s(self, base, scope, filterstr, attrlist, **kwargs):
+        self.searches.append(filterstr)
+        return [
+            (dn, attrs)
+            for dn, attrs in self.entries.items()
+            if any("(cn=%s)" % v.decode().lower() in filterstr for v in attrs["cn"])
+        ]
+
+    def search_ext(self, base, scope, filterstr, attrlist):
+        self.searches.append(base)
+        msgid = len(self.searches)
+        self.pending[msgid] = base
+        return msgid
+
+    def result3(self, msgid):
+        base = self.pending.pop(msgid)
+        if base not in self.entries:
+            raise ldap.NO_SUCH_OBJECT({"desc": "No such object"})
+        return ldap.RES_SEARCH_RESULT, [(base, self.entries[base])], msgid, []
+
+
+def test_search_many_filter():
+    connection = DirectoryConnection(
+        {
+            "cn=admins,ou=groups,dc=ansible,dc=com": {"cn": [b"Admins"]},
+            "cn=developers,ou=groups,dc=ansible,dc=com": {"cn": [b"developers"]},
+        }
+    )
+    qry = dict(
+        base="ou=groups,dc=ansible,dc=com",
+        scope=ldap.SCOPE_SUBTREE,
+        filterstr="(objectClass=group)",
+    )
+    query = OpenshiftLDAPQueryOnAttribute(qry, "cn")
+    result, err = query.ldap_search_many(
+        connection, ["admins", "developers", "testers"], ["cn"], chunk_size=2
+    )
+    assert err is None
+    # one search per chunk of uids
+    assert connection.searches == [
+        "(&(objectClass=group)(|(cn=admins)(cn=developers)))",
+        "(&(objectClass=group)(|(cn=testers)))",
+    ]
+    assert sorted(result) == ["admins", "developers", "testers"]
+    assert result["testers"] == []
+    assert result["developers"][0][0] == "cn=developers,ou=groups,dc=ansible,dc=com"
+
+
+def test_search_many_dn():
+    connection = DirectoryConnection(
+        {"cn=admins,ou=groups,dc=ansible,dc=com": {"cn": [b"admins"]}}
+    )
+    query = OpenshiftLDAPQueryOnAttribute(
+        dict(base="ou=groups,dc=ansible,dc=com"), "dn"
+    )
+    result, err = query.ldap_search_many(
+        connection,
+        [
+            "cn=admins,ou=groups,dc=ansible,dc=com",
+            "cn=testers,ou=groups,dc=ansible,dc=com",
+            "cn=admins,ou=users,dc=ansible,dc=com",
+        ],
+        ["dn", "cn"],
+    )
+    assert err is None
+    assert result == {
+        "cn=admins,ou=groups,dc=ansible,dc=com": [
+            ("cn=admins,ou=groups,dc=ansible,dc=com", {"cn": ["admins"]})
+        ],
+        "cn=testers,ou=groups,dc=ansible,dc=com": [],
+        "cn=admins,ou=users,dc=ansible,dc=com": [],
+    }
+    # out of scope entries are not searched
+    assert len(connection.searches) == 2
+
+
+class MembersConnection(object):
+    def __init__(self, entries):
+        self.entries = entries
+        self.searches = []
+
+    def search_ext_s(self, base, scope, filterstr, attrlist, **kwargs):
+        self.searches.append(filterstr)
+        return [
+            (dn, attrs)
+            for dn, attrs in self.entries.items()
+            if any(
+                "(memberof=%s)" % v.decode().lower() in filterstr.lower()
+                for v in attrs.get("memberOf", [])
+            )
+        ]
+
+
+def test_ad_prefetch_groups():
+    admins = "cn=admins,ou=groups,dc=ansible,dc=com"
+    developers = "cn=developers,ou=groups,dc=ansible,dc=com"
+    testers = "cn=testers,ou=groups,dc=ansible,dc=com"
+    connection = MembersConnection(
+        {
+            "cn=jane,ou=users,dc=ansible,dc=com": {
+                "mail": [b"jane@ansible.com"],
+                "memberOf": [admins.encode(), developers.upper().encode()],
+            },
+            "cn=john,ou=users,dc=ansible,dc=com": {
+                "mail": [b"john@ansible.com"],
+                "memberOf": [developers.encode()],
+            },
+        }
+    )
+    user_query = OpenshiftLDAPQuery(
+        dict(
+            base="ou=users,dc=ansible,dc=com",
+            scope=ldap.SCOPE_SUBTREE,
+            filterstr="(objectClass=person)",
+        )
+    )
+    interface = OpenshiftLDAP_ADInterface(
+        connection, user_query, ["memberOf"], ["mail"]
+    )
+    assert interface.prefetch_groups([admins, developers, testers]) is None
+    # a single user search for every group
+    assert connection.searches == [
+        "(&(objectClass=person)(|(memberOf=%s)(memberOf=%s)(memberOf=%s)))"
+        % (admins, developers, testers)
+    ]
+    members, err = interface.extract_members(developers)
+    assert err is None
+    assert sorted(dn for dn, attrs in members) == [
+        "cn=jane,ou=users,dc=ansible,dc=com",
+        "cn=john,ou=users,dc=ansible,dc=com",
+    ]
+    assert interface.extract_members(testers) == ([], None)
+    assert [dn for dn, attrs in interface.extract_members(admins)[0]] == [
+        "cn=jane,ou=users,dc=ansible,dc=com"
+    ]
+    assert len(connection.searches) == 1
+
+
+def test_ad_list_groups_skips_users_without_membership():
+    class UsersConnection(object):
+        def search_ext_s(self, **kwargs):
+            return [
+                ("cn=jane,ou=users,dc=ansible,dc=com", {"memberOf": [b"cn=admins"]}),
+                ("cn=john,ou=users,dc=ansible,dc=com", {"mail": [b"john@ansible.com"]}),
+            ]
+
+    user_query = OpenshiftLDAPQuery(
+        dict(base="ou=users,dc=ansible,dc=com", scope=ldap.SCOPE_SUBTREE)
+    )
+    interface = OpenshiftLDAP_ADInterface(
+        UsersConnection(), user_query, ["memberOf"], ["mail"]
+    )
+    groups, err = interface.list_groups()
+    assert err is None
+    assert list(groups) == ["cn=admins"]
+
+
+def test_get_username_for_entry():
+    usernames = {}
+    entry = ("cn=jane,ou=users,dc=ansible,dc=com", {"mail": ["jane@ansible.com"]})
+    assert openshift_ldap_get_username_for_entry(entry, ["uid", "mail"], usernames) == (
+        ["jane@ansible.com"],
+        None,
+    )
+    assert usernames == {"cn=jane,ou=users,dc=ansible,dc=com": ["jane@ansible.com"]}
+    # the name is resolved once per DN
+    assert openshift_ldap_get_username_for_entry(
+        (entry[0], {}), ["uid", "mail"], usernames
+    ) == (["jane@ansible.com"], None)
+
+    username, err = openshift_ldap_get_username_for_entry(
+        ("cn=john,ou=users,dc=ansible,dc=com", {}), ["mail"], usernames
+    )
+    assert username is None
+    assert "cn=john,ou=users,dc=ansible,dc=com" in err
+
+
+def test_membership_attribute():
+    assert openshift_ldap_membership_attribute("memberOf") == ("memberOf", "memberOf")
+    assert openshift_ldap_membership_attribute("memberOf", nested=True) == (
+        "memberOf",
+        "memberOf:1.2.840.113556.1.4.1941:",
+    )
+    assert openshift_ldap_membership_attribute("memberOf:1.2.840.113556.1.4.1941:") == (
+        "memberOf",
+        "memberOf:1.2.840.113556.1.4.1941:",
+    )
+
+
+def test_rfc2307_nested_members():
+    def _group(name, members):
+        dn = "cn=%s,ou=groups,dc=ansible,dc=com" % name
+        return dn, (dn, {"cn": [name], "member": members})
+
+    def _user(name):
+        dn = "cn=%s,ou=users,dc=ansible,dc=com" % name
+        return dn, (dn, {"mail": ["%s@ansible.com" % name]})
+
+    users = dict(_user(name) for name in ("jane", "john", "mathew"))
+    jane, john, mathew = sorted(users)
+    admins, _ = _group("admins", [])
+    developers, _ = _group("developers", [])
+    testers, _ = _group("testers", [])
+    # developers and testers are members of each other
+    groups = dict(
+        [
+            _group("admins", [jane, developers]),
+            _group("developers", [john, testers]),
+            _group("testers", [mathew, developers]),
+        ]
+    )
+
+    interface = OpenshiftLDAPInterface(
+        connection=None,
+        groupQuery=OpenshiftLDAPQueryOnAttribute(
+            dict(base="ou=groups,dc=ansible,dc=com", scope=ldap.SCOPE_SUBTREE), "dn"
+        ),
+        groupNameAttributes=["cn"],
+        groupMembershipAttributes=["member"],
+        userQuery=OpenshiftLDAPQueryOnAttribute(
+            dict(base="ou=users,dc=ansible,dc=com", scope=ldap.SCOPE_SUBTREE), "dn"
+        ),
+        userNameAttributes=["mail"],
+        config={},
+        nested=True,
+    )
+    interface.cached_groups.update(groups)
+    interface.cached_users.update(users)
+
+    def _members(uid):
+        members, err = interface.extract_members(uid)
+        assert err is None
+        return sorted(dn for dn, attrs in members)
+
+    assert _members(admins) == [jane, john, mathew]
+    assert _members(developers) == [john, mathew]
+    assert _members(testers) == [john, mathew]
+    # each group is expanded once
+    assert sorted(interface.direct_members) == sorted(groups)
+
+
+class AttributeConnection(object):
+    """
+    answers the searches of the entries matching (<attribute>=<value>) filters, the filters of several
+    values are combined using '|', a filter without value returns every entry of the base.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.searches = []
+
+    def search_ext_s(self, base, scope, filterstr, attrlist=None, **kwargs):
+        self.searches.append((base, filterstr))
+        # the objectClass of the entries is not checked
+        values = [
+            (k, v)
+            for k, v in re.findall(r"\((\w+)=([^()]*)\)", filterstr)
+            if k != "objectClass"
+        ]
+        return [
+            (dn, attrs)
+            for dn, attrs in self.entries
+            if dn.endswith(base)
+            and (not values or any(v.encode() in attrs.get(k, []) for k, v in values))
+        ]
+
+
+def test_rfc2307_nested_members_queries():
+    def _entry(name, ou, **attrs):
+        return ("cn=%s,ou=%s,dc=ansible,dc=com" % (name, ou), attrs)
+
+    users = ["user%d" % i for i in range(10)]
+    connection = AttributeConnection(
+        [
+            _entry("admins", "groups", cn=[b"admins"], memberUid=[b"developers"]),
+            _entry(
+                "developers",
+                "groups",
+                cn=[b"developers"],
+                memberUid=[x.encode() for x in users],
+            ),
+        ]
+        + [_entry(x, "users", uid=[x.encode()], mail=[x.encode()]) for x in users]
+    )
+    interface = OpenshiftLDAPInterface(
+        connection=connection,
+        groupQuery=OpenshiftLDAPQueryOnAttribute(
+            dict(
+                base="ou=groups,dc=ansible,dc=com",
+                scope=ldap.SCOPE_SUBTREE,
+                filterstr="(objectClass=posixGroup)",
+            ),
+            "cn",
+        ),
+        groupNameAttributes=["cn"],
+        groupMembershipAttributes=["memberUid"],
+        userQuery=OpenshiftLDAPQueryOnAttribute(
+            dict(
+                base="ou=users,dc=ansible,dc=com",
+                scope=ldap.SCOPE_SUBTREE,
+                filterstr="(objectClass=posixAccount)",
+            ),
+            "uid",
+        ),
+        userNameAttributes=["mail"],
+        config={},
+        nested=True,
+    )
+
+    members, err = interface.extract_members("admins")
+    assert err is None
+    assert len(members) == 10
+    group_searches = [x for x in connection.searches if "ou=groups" in x[0]]
+    user_searches = [x for x in connection.searches if "ou=users" in x[0]]
+    # admins, then one batched search to classify the members of each group
+    assert len(group_searches) == 3
+    assert "(|(cn=user0)(cn=user1)" in group_searches[2][1]
+    assert len(user_searches) == 10
+
+    # once the groups are listed, the members are classified without searching
+    connection.searches = []
+    interface = OpenshiftLDAPInterface(
+        connection=connection,
+        groupQuery=interface.groupQuery,
+        groupNameAttributes=["cn"],
+        groupMembershipAttributes=["memberUid"],
+        userQuery=interface.userQuery,
+        userNameAttributes=["mail"],
+        config={},
+        nested=True,
+    )
+    groups, err = interface.list_groups()
+    assert err is None
+    members, err = interface.extract_members("admins")
+    assert err is None
+    assert len(members) == 10
+    assert len(connection.searches) == 1 + 10
+
+
+class InChainConnection(object):
+    def __init__(self, members):
+        self.members = members
+        self.filters = []
+        self.pending = {}
+
+    def search_ext(self, base, scope, filterstr, attrlist, **kwargs):
+        self.filters.append(filterstr)
+        self.pending[len(self.filters)] = filterstr
+        return len(self.filters)
+
+    def result3(self, msgid):
+        filterstr = self.pending.pop(msgid)
+        group = filterstr.split(":1.2.840.113556.1.4.1941:=", 1)[1][:-2]
+        return ldap.RES_SEARCH_RESULT, self.members.get(group, []), msgid, []
+
+
+def test_ad_nested_members():
+    admins = "cn=admins,ou=groups,dc=ansible,dc=com"
+    jane = ("cn=jane,ou=users,dc=ansible,dc=com", {"mail": [b"jane@ansible.com"]})
+    connection = InChainConnection({admins: [jane]})
+    user_query = OpenshiftLDAPQuery(
+        dict(
+            base="ou=users,dc=ansible,dc=com",
+            scope=ldap.SCOPE_SUBTREE,
+            filterstr="(objectClass=person)",
+        )
+    )
+    user_name_attributes = ["mail"]
+    interface = OpenshiftLDAP_ADInterface(
+        connection, user_query, ["memberOf"], user_name_attributes, nested=True
+    )
+    assert interface.required_user_attributes == ["mail", "memberOf"]
+    assert user_name_attributes == ["mail"]
+
+    developers = "cn=developers,ou=groups,dc=ansible,dc=com"
+    assert interface.prefetch_groups([admins, developers]) is None
+    # a search per group using the in chain matching rule
+    assert connection.filters == [
+        "(&(objectClass=person)(memberOf:1.2.840.113556.1.4.1941:=%s))" % admins,
+        "(&(objectClass=person)(memberOf:1.2.840.113556.1.4.1941:=%s))" % developers,
+    ]
+    members, err = interface.extract_members(admins)
+    assert err is None
+    assert [dn for dn, attrs in members] == [jane[0]]
+    assert interface.extract_members(developers) == ([], None)
+    assert interface.changed_groups() is None
@@ -0,0 +1,98 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+from ansible_collections.community.okd.plugins.module_utils import openshift_ldap
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap import (
+    LDAP_SEARCH_OUT_OF_SCOPE_ERROR,
+    OpenshiftLDAPQueryOnAttribute,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_ldap_cache import (
+    OpenshiftLDAPCache,
+)
+import pytest
+
+try:
+    import ldap
+except ImportError:
+    pytestmark = pytest.mark.skip("This test requires the python-ldap library")
+
+
+def test_escape_filter():
+    escape = OpenshiftLDAPQueryOnAttribute.escape_filter
+    assert escape("developers") == "developers"
+    assert escape("dev(*)\\ops\x00") == "dev\\28\\2a\\29\\5cops\\00"
+    # non ASCII characters are escaped using their UTF-8 encoding
+    assert escape("équipe") == "\\c3\\a9quipe"
+    assert escape("組") == "\\e7\\b5\\84"
+
+
+def test_build_request_attribute():
+    qry = dict(
+        base="ou=groups,dc=ansible,dc=com",
+        scope=ldap.SCOPE_SUBTREE,
+        filterstr="(objectClass=groupOfNames)",
+    )
+    query = OpenshiftLDAPQueryOnAttribute(qry, "cn")
+    request, err = query.build_request("admins(1)", ["cn", "member"])
+    assert err is None
+    assert request == dict(
+        base="ou=groups,dc=ansible,dc=com",
+        scope=ldap.SCOPE_SUBTREE,
+        filterstr="(&(objectClass=groupOfNames)(cn=admins\\281\\29))",
+        attrlist=["cn", "member"],
+    )
+    # the base query is not altered
+    assert qry["filterstr"] == "(objectClass=groupOfNames)"
+
+    query = OpenshiftLDAPQueryOnAttribute(dict(base="dc=ansible,dc=com"), "uid")
+    request, err = query.build_request("john", ["dn"])
+    assert request["filterstr"] == "(uid=john)"
+    assert request["attrlist"] == ["1.1"]
+
+
+def test_build_request_dn():
+    qry = dict(base="ou=users,dc=ansible,dc=com", scope=ldap.SCOPE_SUBTREE)
+    query = OpenshiftLDAPQueryOnAttribute(qry, "dn")
+
+    request, err = query.build_request("cn=john,ou=users,dc=ansible,dc=com", ["mail"])
+    assert err is None
+    assert request == dict(
+        base="cn=john,ou=users,dc=ansible,dc=com",
+        scope=ldap.SCOPE_BASE,
+        filterstr="(objectClass=*)",
+        attrlist=["mail"],
+    )
+
+    request, err = query.build_request("ou=users,dc=ansible,dc=com", ["mail"])
+    assert err is None
+
+    request, err = query.build_request("cn=john,ou=admins,dc=ansible,dc=com", ["mail"])
+    assert err == LDAP_SEARCH_OUT_OF_SCOPE_ERROR
+
+
+def test_delta_refresh_attributes(tmp_path, monkeypatch):
+    requested = []
+
+    def _refresh(connection, mode, qry, attributes, section):
+        requested.append(attributes)
+
+    monkeypatch.setattr(openshift_ldap, "ldap_delta_refresh", _refresh)
+    interface = openshift_ldap.OpenshiftLDAPInterface(
+        connection=None,
+        groupQuery=OpenshiftLDAPQueryOnAttribute(
+            dict(base="ou=groups,dc=ansible,dc=com"), "dn"
+        ),
+        groupNameAttributes=["cn"],
+        groupMembershipAttributes=["member"],
+        userQuery=OpenshiftLDAPQueryOnAttribute(
+            dict(base="ou=users,dc=ansible,dc=com"), "dn"
+        ),
+        userNameAttributes=["dn"],
+        config={},
+    )
+    cache = OpenshiftLDAPCache(str(tmp_path / "cache.json"), url="ldap://localhost")
+    assert interface.load_cache(cache, mode="syncrepl") is None
+    # the DN is part of every entry, it is not requested as an attribute
+    assert requested == [["cn", "member"], ["1.1"]]
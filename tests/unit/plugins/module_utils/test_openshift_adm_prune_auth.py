@@ -0,0 +1,240 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import pytest
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_adm_prune_auth import (
+    OpenShiftAdmPruneAuth,
+)
+from ansible_collections.community.okd.plugins.modules.openshift_adm_prune_auth import (
+    argument_spec,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils import (
+    openshift_fakes,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils.openshift_fakes import (
+    FakeCluster,
+    FakeResource,
+    make_object,
+)
+
+
+def run_module(cluster, **params):
+    return openshift_fakes.run_module(
+        OpenShiftAdmPruneAuth, argument_spec(), cluster, **params
+    )
+
+
+def make_binding(kind, name, role_kind, role_name, namespace=None):
+    return make_object(
+        kind,
+        name,
+        namespace=namespace,
+        roleRef=dict(kind=role_kind, name=role_name),
+    )
+
+
+def test_prune_clusterroles_single_list_per_binding_kind():
+    clusterroles = [make_object("ClusterRole", "role-%d" % i) for i in range(50)]
+    cluster = FakeCluster(
+        {
+            "ClusterRole": clusterroles,
+            "ClusterRoleBinding": [
+                make_binding("ClusterRoleBinding", "crb-1", "ClusterRole", "role-1"),
+                make_binding("ClusterRoleBinding", "crb-2", "ClusterRole", "other"),
+            ],
+            "RoleBinding": [
+                make_binding("RoleBinding", "rb-1", "ClusterRole", "role-2", "ns1"),
+                make_binding("RoleBinding", "rb-2", "Role", "role-2", "ns1"),
+                make_binding("RoleBinding", "rb-3", "ClusterRole", "role-3", "ns2"),
+            ],
+        }
+    )
+
+    result = run_module(cluster, resource="clusterroles")
+    assert result["cluster_role_binding"] == ["crb-1"]
+    assert result["role_binding"] == ["ns1/rb-1", "ns2/rb-3"]
+    lists = [x for x in cluster.calls if x[0] == "list"]
+    assert lists == [
+        ("list", "ClusterRole", None),
+        ("list", "ClusterRoleBinding", None),
+        ("list", "RoleBinding", None),
+    ]
+
+
+def test_prune_roles_lists_bindings_from_namespace():
+    cluster = FakeCluster(
+        {
+            "Role": [
+                make_object("Role", "admin", "ns1"),
+                make_object("Role", "view", "ns1"),
+            ],
+            "RoleBinding": [
+                make_binding("RoleBinding", "rb-1", "Role", "admin", "ns1"),
+                make_binding("RoleBinding", "rb-2", "ClusterRole", "admin", "ns1"),
+                make_binding("RoleBinding", "rb-3", "Role", "view", "ns1"),
+            ],
+        }
+    )
+
+    result = run_module(cluster, resource="roles", namespace="ns1")
+    assert result["role_binding"] == ["ns1/rb-1", "ns1/rb-3"]
+    assert ("list", "RoleBinding", "ns1") in cluster.calls
+    assert [x[2] for x in cluster.calls if x[0] == "delete"] == ["rb-1", "rb-3"]
+
+
+def test_prune_users_patches_subjects():
+    subjects = [
+        dict(kind="User", name="alice"),
+        dict(kind="User", name="bob"),
+        dict(kind="Group", name="alice"),
+    ]
+    cluster = FakeCluster(
+        {
+            "User": [make_object("User", "alice")],
+            "RoleBinding": [
+                make_object("RoleBinding", "rb-%d" % i, "ns1", subjects=subjects)
+                for i in range(10)
+            ],
+            "ClusterRoleBinding": [
+                make_object("ClusterRoleBinding", "crb-1", subjects=subjects[1:]),
+            ],
+            "SecurityContextConstraints": [
+                make_object("SecurityContextConstraints", "restricted", users=[]),
+                make_object(
+                    "SecurityContextConstraints", "anyuid", users=["alice", "bob"]
+                ),
+            ],
+            "Group": [make_object("Group", "devs", users=["bob", "alice"])],
+        }
+    )
+
+    # rb-3 is modified after being listed, it is patched again once read
+    resource = FakeResource(cluster, "RoleBinding")
+    original_patch = resource.patch
+
+    def _patch(body, name, namespace=None, content_type=None):
+        if name == "rb-3" and ("get", "RoleBinding", "rb-3") not in cluster.calls:
+            resource.find(name, namespace)["metadata"]["resourceVersion"] = "2"
+        return original_patch(body, name, namespace, content_type)
+
+    resource.patch = _patch
+    cluster.find_resource = lambda kind, api_version, fail=False: (
+        resource if kind == "RoleBinding" else FakeResource(cluster, kind)
+    )
+
+    result = run_module(cluster, resource="users", name="alice", stats=True)
+    assert result["changed"]
+    assert result["role_binding"] == ["ns1/rb-%d" % i for i in range(10)]
+    assert result["cluster_role_binding"] == []
+    assert result["security_context_constraints"] == ["anyuid"]
+    assert result["group"] == ["devs"]
+    for binding in cluster.objects["RoleBinding"]:
+        assert binding["subjects"] == subjects[1:]
+    assert cluster.objects["SecurityContextConstraints"][1]["users"] == ["bob"]
+    assert cluster.objects["Group"][0]["users"] == ["bob"]
+    assert result["stats"]["RoleBinding"]["patch"]["count"] == 11
+    assert result["stats"]["RoleBinding"]["get"]["count"] == 1
+
+
+def test_prune_targets_updates_each_object_once():
+    subjects = [
+        dict(kind="User", name="alice"),
+        dict(kind="Group", name="devs"),
+        dict(kind="User", name="bob"),
+    ]
+    cluster = FakeCluster(
+        {
+            "User": [make_object("User", "alice"), make_object("User", "bob")],
+            "Group": [
+                make_object("Group", "devs", users=["alice"]),
+                make_object("Group", "ops", users=["alice", "bob"]),
+            ],
+            "ClusterRole": [make_object("ClusterRole", "legacy")],
+            "ClusterRoleBinding": [
+                make_binding("ClusterRoleBinding", "crb-1", "ClusterRole", "legacy"),
+                dict(
+                    make_binding("ClusterRoleBinding", "crb-2", "ClusterRole", "view"),
+                    subjects=subjects,
+                ),
+            ],
+            "RoleBinding": [
+                dict(
+                    make_binding("RoleBinding", "rb-1", "Role", "admin", "ns1"),
+                    subjects=subjects,
+                ),
+                dict(
+                    make_binding("RoleBinding", "rb-2", "ClusterRole", "legacy", "ns1"),
+                    subjects=subjects,
+                ),
+            ],
+            "SecurityContextConstraints": [
+                make_object(
+                    "SecurityContextConstraints",
+                    "anyuid",
+                    users=["alice", "bob"],
+                    groups=["devs"],
+                ),
+            ],
+        }
+    )
+
+    result = run_module(
+        cluster,
+        targets=[
+            dict(resource="users", name="alice"),
+            dict(resource="groups", name="devs"),
+            dict(resource="clusterroles", name="legacy"),
+        ],
+    )
+    assert result["changed"]
+    assert result["cluster_role_binding"] == ["crb-1", "crb-2"]
+    assert result["role_binding"] == ["ns1/rb-2", "ns1/rb-1"]
+    assert result["security_context_constraints"] == ["anyuid"]
+    assert result["group"] == ["devs", "ops"]
+
+    for kind in ("ClusterRoleBinding", "RoleBinding", "SecurityContextConstraints"):
+        assert cluster.calls.count(("list", kind, None)) == 1
+    patches = [x[2] for x in cluster.calls if x[0] == "patch"]
+    assert patches == ["crb-2", "rb-1", "anyuid", "devs", "ops"]
+    assert cluster.objects["ClusterRoleBinding"][0]["subjects"] == subjects[2:]
+    assert cluster.objects["RoleBinding"][0]["subjects"] == subjects[2:]
+    scc = cluster.objects["SecurityContextConstraints"][0]
+    assert (scc["users"], scc["groups"]) == (["bob"], [])
+
+
+@pytest.mark.parametrize("users", [1, 30])
+def test_prune_users_authorizations(users):
+    cluster = FakeCluster(
+        {
+            "User": [make_object("User", "user-%d" % i) for i in range(users)],
+            "OAuthClientAuthorization": [
+                make_object("OAuthClientAuthorization", "auth-%d" % i, userName=name)
+                for i, name in enumerate(
+                    ["user-%d" % i for i in range(users)] + ["other"] * 1200
+                )
+            ],
+        }
+    )
+
+    result = run_module(cluster, resource="users", stats=True)
+    assert sorted(result["authorization"]) == sorted(
+        "auth-%d" % i for i in range(users)
+    )
+    assert [x["userName"] for x in cluster.objects["OAuthClientAuthorization"]] == [
+        "other"
+    ] * 1200
+    lists = [
+        x[2] for x in cluster.calls if x[:2] == ("list", "OAuthClientAuthorization")
+    ]
+    if users == 1:
+        # a field selector is used for a few users
+        assert lists == ["userName=user-0"]
+    else:
+        # otherwise the authorizations are listed page by page
+        assert len(lists) == 3
+    # each request is timed
+    stats = result["stats"]["OAuthClientAuthorization"]["list"]
+    assert stats["count"] == len(lists)
@@ -0,0 +1,167 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_adm_prune_deployments import (
+    OpenShiftAdmPruneDeployment,
+)
+from ansible_collections.community.okd.plugins.modules.openshift_adm_prune_deployments import (
+    argument_spec,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils import (
+    openshift_fakes,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils.openshift_fakes import (
+    FakeCluster,
+)
+
+
+def run_module(cluster, **params):
+    return openshift_fakes.run_module(
+        OpenShiftAdmPruneDeployment, argument_spec(), cluster, **params
+    )
+
+
+def make_replication_controller(
+    name,
+    namespace,
+    deploymentconfig,
+    phase="Complete",
+    timestamp="2021-12-17T12:20:28Z",
+):
+    return {
+        "kind": "ReplicationController",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "creationTimestamp": timestamp,
+            "labels": {"openshift.io/deployment-config.name": deploymentconfig},
+            "annotations": {
+                "openshift.io/deployment-config.name": deploymentconfig,
+                "openshift.io/deployment.phase": phase,
+            },
+        },
+        "spec": {"replicas": 0},
+        "status": {"replicas": 0},
+    }
+
+
+def test_prune_orphan_deployments():
+    cluster = FakeCluster(
+        {
+            "DeploymentConfig": [
+                {"kind": "DeploymentConfig", "metadata": dict(name=name, namespace=ns)}
+                for ns, name in [("ns1", "frontend"), ("ns2", "backend")]
+            ],
+            "ReplicationController": [
+                make_replication_controller("frontend-%d" % i, "ns1", "frontend")
+                for i in range(600)
+            ]
+            + [
+                make_replication_controller("backend-1", "ns1", "backend"),
+                make_replication_controller("backend-1", "ns2", "backend"),
+                make_replication_controller("legacy-1", "ns2", "legacy", "Failed"),
+                make_replication_controller("legacy-2", "ns2", "legacy", "Running"),
+            ],
+        }
+    )
+
+    result = run_module(cluster, orphans=True, stats=True)
+    deleted = [
+        (x["metadata"]["namespace"], x["metadata"]["name"])
+        for x in result["replication_controllers"]
+    ]
+    assert deleted == [("ns1", "backend-1"), ("ns2", "legacy-1")]
+    # the DeploymentConfigs are listed once, the replication controllers page by page
+    assert cluster.calls.count(("list", "DeploymentConfig", None)) == 1
+    assert cluster.calls.count(("list", "ReplicationController", None)) == 2
+    assert len([x for x in cluster.calls if x[0] == "list"]) == 3
+    assert result["stats"]["index"]["DeploymentConfig"] == {
+        "entries": 2,
+        "hits": 601,
+        "misses": 2,
+    }
+
+
+def make_deployments():
+    replication_controllers = []
+    for dc in ("frontend", "backend"):
+        for i in range(20):
+            phase = "Failed" if i % 4 == 0 else "Complete"
+            replication_controllers.append(
+                make_replication_controller(
+                    "%s-%d" % (dc, i),
+                    "ns1",
+                    dc,
+                    phase,
+                    "2021-12-17T%02d:20:28Z" % i,
+                )
+            )
+    # the active deployment is not a candidate and is not counted in keep_complete
+    active = replication_controllers[19]
+    active["spec"]["replicas"] = active["status"]["replicas"] = 1
+    return replication_controllers
+
+
+def test_prune_deployments_keep_most_recent():
+    cluster = FakeCluster({"ReplicationController": make_deployments()})
+
+    result = run_module(cluster, keep_complete=2, keep_failed=1)
+    deleted = [x["metadata"]["name"] for x in result["replication_controllers"]]
+    kept = [x["metadata"]["name"] for x in cluster.objects["ReplicationController"]]
+    assert len(deleted) == 33
+    assert sorted(kept) == sorted(
+        ["frontend-%d" % i for i in (16, 17, 18, 19)]
+        + ["backend-%d" % i for i in (16, 18, 19)]
+    )
+    # the retained replication controllers are found from the single listing
+    assert cluster.calls.count(("list", "ReplicationController", None)) == 1
+
+
+def test_prune_orphan_deployments_keep_most_recent():
+    cluster = FakeCluster(
+        {
+            "DeploymentConfig": [
+                {
+                    "kind": "DeploymentConfig",
+                    "metadata": dict(name="frontend", namespace="ns1"),
+                }
+            ],
+            "ReplicationController": make_deployments(),
+        }
+    )
+
+    result = run_module(
+        cluster, orphans=True, keep_complete=2, keep_failed=1, stats=True
+    )
+    deleted = [x["metadata"]["name"] for x in result["replication_controllers"]]
+    assert sorted(deleted) == sorted(
+        "backend-%d" % i for i in range(20) if i not in (16, 18, 19)
+    )
+    assert cluster.calls.count(("list", "ReplicationController", None)) == 1
+    # each candidate is looked up once in the DeploymentConfig index
+    assert result["stats"]["index"]["DeploymentConfig"] == {
+        "entries": 1,
+        "hits": 19,
+        "misses": 20,
+    }
+
+
+def test_prune_deployments_list_failure():
+    cluster = FakeCluster(
+        {
+            "ReplicationController": [
+                make_replication_controller("frontend-%04d" % i, "ns1", "frontend")
+                for i in range(600)
+            ]
+        }
+    )
+    cluster.list_errors = [500]
+
+    result = run_module(cluster, failed=True, qps=0)
+    assert result["msg"].startswith("Failed to list ReplicationController due to:")
+    # the replication controllers of the first page are deleted and reported
+    assert len(result["replication_controllers"]) == 500
+    assert result["summary"]["namespaces"] == {"ns1": {"deleted": 500, "failed": 0}}
+    assert len(cluster.objects["ReplicationController"]) == 100
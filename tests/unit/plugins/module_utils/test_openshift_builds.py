@@ -0,0 +1,299 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+from kubernetes.dynamic.exceptions import GoneError
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_common import (
+    AnsibleOpenshiftModule,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_builds import (
+    OpenShiftBuilds,
+    OpenShiftPruneBuilds,
+)
+from ansible_collections.community.okd.plugins.modules import (
+    openshift_adm_prune_builds,
+    openshift_build,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils import (
+    openshift_fakes,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils.openshift_fakes import (
+    FakeCluster,
+    FakeResource,
+)
+
+
+def run_module(module_class, module, cluster, **params):
+    return openshift_fakes.run_module(
+        module_class, module.argument_spec(), cluster, **params
+    )
+
+
+def make_build(
+    name, namespace, build_config, phase="Complete", timestamp="2021-12-17T12:20:28Z"
+):
+    build = {
+        "kind": "Build",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "creationTimestamp": timestamp,
+            "labels": {},
+        },
+        "status": {"phase": phase},
+    }
+    if build_config:
+        build["metadata"]["labels"]["openshift.io/build-config.name"] = build_config
+        build["status"]["config"] = dict(name=build_config, namespace=namespace)
+    return build
+
+
+def test_prune_orphan_builds_api_calls():
+    cluster = FakeCluster(
+        {
+            "BuildConfig": [
+                {"kind": "BuildConfig", "metadata": dict(name=name, namespace=ns)}
+                for ns, name in [("ns1", "frontend"), ("ns2", "backend")]
+            ],
+            "Build": [
+                make_build("frontend-%d" % i, "ns1", "frontend") for i in range(200)
+            ]
+            + [make_build("backend-%d" % i, "ns1", "backend") for i in range(100)]
+            + [
+                make_build("backend-1", "ns2", "backend"),
+                make_build("legacy-1", "ns2", None, "Failed"),
+                make_build("legacy-2", "ns2", "legacy", "Running"),
+            ],
+        }
+    )
+
+    result = run_module(
+        OpenShiftPruneBuilds, openshift_adm_prune_builds, cluster, orphans=True
+    )
+    deleted = [
+        (x["metadata"]["namespace"], x["metadata"]["name"]) for x in result["builds"]
+    ]
+    assert sorted(deleted) == sorted(
+        [("ns1", "backend-%d" % i) for i in range(100)] + [("ns2", "legacy-1")]
+    )
+    # the builds and the build configs are listed once, whatever the number of builds
+    assert cluster.calls.count(("list", "Build", None)) == 1
+    assert cluster.calls.count(("list", "BuildConfig", None)) == 1
+    assert len(cluster.calls) == 2 + len(deleted)
+
+
+def test_prune_builds_keep_most_recent():
+    builds = []
+    for ns, config in [("ns1", "frontend"), ("ns2", "frontend"), ("ns2", None)]:
+        for i in range(10):
+            for phase in ("Complete", "Failed", "Cancelled"):
+                name = "%s-%s-%d" % (config, phase.lower(), i)
+                timestamp = "2021-12-17T12:%02d:%02dZ" % (i, len(phase))
+                builds.append(make_build(name, ns, config, phase, timestamp))
+    # the running build is not a candidate and is not counted in keep_failed
+    builds[29]["status"]["phase"] = "Running"
+    cluster = FakeCluster({"Build": builds})
+
+    result = run_module(
+        OpenShiftPruneBuilds,
+        openshift_adm_prune_builds,
+        cluster,
+        keep_complete=3,
+        keep_failed=1,
+    )
+    deleted = set(
+        (x["metadata"]["namespace"], x["metadata"]["name"]) for x in result["builds"]
+    )
+    kept = set(
+        (x["metadata"]["namespace"], x["metadata"]["name"])
+        for x in cluster.objects["Build"]
+    )
+    assert len(deleted) == 90 - len(kept)
+    # the failed and cancelled builds share the same bucket, the builds without
+    # a BuildConfig are not kept
+    assert kept == set(
+        [(ns, "frontend-complete-%d" % i) for ns in ("ns1", "ns2") for i in (7, 8, 9)]
+        + [(ns, "frontend-cancelled-9") for ns in ("ns1", "ns2")]
+        + [("ns1", "frontend-failed-9")]
+    )
+
+
+def test_prune_builds_collect_errors():
+    cluster = FakeCluster(
+        {
+            "Build": [
+                make_build("frontend-%d" % i, ns, "frontend")
+                for ns in ("ns1", "ns2")
+                for i in range(50)
+            ]
+        }
+    )
+    cluster.failures = {("ns1", "frontend-10"), ("ns2", "frontend-20")}
+
+    result = run_module(
+        OpenShiftPruneBuilds,
+        openshift_adm_prune_builds,
+        cluster,
+        failed=True,
+        workers=4,
+        qps=0,
+    )
+    # the other builds are deleted despite the failures
+    assert len([x for x in cluster.calls if x[:2] == ("delete", "Build")]) == 100
+    assert len(result["builds"]) == 98
+    assert len(result["errors"]) == 2
+    assert result["errors"][0].startswith(
+        "Failed to delete Build ns1/frontend-10 due to:"
+    )
+    assert result["summary"]["namespaces"] == {
+        "ns1": {"deleted": 49, "failed": 1},
+        "ns2": {"deleted": 49, "failed": 1},
+    }
+    assert result["summary"]["deleted"] == 98
+    assert result["summary"]["failed"] == 2
+
+
+def test_cancel_build_config_builds_api_calls():
+    cluster = FakeCluster(
+        {
+            "Build": [
+                make_build("frontend-%d" % i, "ns1", "frontend", "Running")
+                for i in range(50)
+            ]
+            + [make_build("frontend-old", "ns1", "frontend")]
+            + [make_build("front-1", "ns1", "front", "Running")],
+        }
+    )
+
+    result = run_module(
+        OpenShiftBuilds,
+        openshift_build,
+        cluster,
+        state="cancelled",
+        namespace="ns1",
+        build_config_name="frontend",
+    )
+    assert result["changed"]
+    assert [x["metadata"]["name"] for x in result["builds"]] == [
+        "frontend-%d" % i for i in range(50)
+    ]
+    # the builds are listed once then cancelled, they are not retrieved one by one
+    assert cluster.calls == [("list", "Build", "ns1")] + [
+        (
+            "request",
+            "PUT",
+            "/apis/build.openshift.io/v1/namespaces/ns1/builds/%s"
+            % x["metadata"]["name"],
+        )
+        for x in result["builds"]
+    ]
+
+
+def test_prune_builds_streams_pages():
+    cluster = FakeCluster(
+        {
+            "Build": [
+                make_build("frontend-%d" % i, "ns1", "frontend", "Failed")
+                for i in range(1200)
+            ]
+        }
+    )
+
+    result = run_module(
+        OpenShiftPruneBuilds, openshift_adm_prune_builds, cluster, qps=0
+    )
+    assert len(result["builds"]) == 1200
+    assert result["summary"]["namespaces"] == {"ns1": {"deleted": 1200, "failed": 0}}
+    # the builds are listed in 3 pages, the candidates of the first pages are deleted
+    # before the last page is listed
+    calls = [x[:2] for x in cluster.calls]
+    lists = [i for i, call in enumerate(calls) if call == ("list", "Build")]
+    assert len(lists) == 3
+    assert calls.index(("delete", "Build")) < lists[1]
+    assert calls[lists[2] - 1] == ("delete", "Build")
+
+
+@pytest.mark.parametrize("resume_expired", [True, False])
+def test_prune_builds_continue_expired(resume_expired):
+    cluster = FakeCluster(
+        {
+            "Build": [
+                make_build("frontend-%04d" % i, "ns1", "frontend", "Failed")
+                for i in range(1200)
+            ]
+        }
+    )
+    cluster.list_errors = [410]
+    cluster.resume_expired = resume_expired
+
+    result = run_module(
+        OpenShiftPruneBuilds, openshift_adm_prune_builds, cluster, qps=0
+    )
+    # the listing is resumed or restarted, each build is deleted once
+    deletes = [x for x in cluster.calls if x[:2] == ("delete", "Build")]
+    assert len(deletes) == len(set(deletes)) == 1200
+    assert len(result["builds"]) == 1200
+    assert cluster.objects["Build"] == []
+
+
+@pytest.mark.parametrize("resume_expired", [True, False])
+def test_list_pages_continue_expired(resume_expired):
+    builds = [make_build("frontend-%04d" % i, "ns1", "frontend") for i in range(1200)]
+    cluster = FakeCluster({"Build": builds})
+    cluster.list_errors = [410]
+    cluster.resume_expired = resume_expired
+
+    names = [
+        x["metadata"]["name"]
+        for x in AnsibleOpenshiftModule.list_pages(FakeResource(cluster, "Build"))
+    ]
+    # the builds already yielded are skipped when the listing is restarted
+    assert names == [x["metadata"]["name"] for x in builds]
+    # the first page, the expired request, then the remaining pages or all of them
+    lists = [x for x in cluster.calls if x[0] == "list"]
+    assert len(lists) == (4 if resume_expired else 5)
+
+
+def test_list_pages_continue_expired_without_progress():
+    cluster = FakeCluster(
+        {
+            "Build": [
+                make_build("frontend-%04d" % i, "ns1", "frontend") for i in range(600)
+            ]
+        }
+    )
+    # the listing is restarted once, then expires again before any new build
+    cluster.list_errors = [410, 410]
+
+    with pytest.raises(GoneError):
+        list(AnsibleOpenshiftModule.list_pages(FakeResource(cluster, "Build")))
+
+
+def test_prune_builds_list_failure():
+    cluster = FakeCluster(
+        {
+            "Build": [
+                make_build("frontend-%04d" % i, "ns1", "frontend", "Failed")
+                for i in range(1200)
+            ]
+        }
+    )
+    cluster.list_errors = [500]
+
+    result = run_module(
+        OpenShiftPruneBuilds,
+        openshift_adm_prune_builds,
+        cluster,
+        failed=True,
+        qps=0,
+    )
+    assert result["msg"].startswith("Failed to list Build due to:")
+    assert result["status"] == 500
+    # the builds of the first page are deleted and reported
+    assert sorted(x["metadata"]["name"] for x in result["builds"]) == [
+        "frontend-%04d" % i for i in range(500)
+    ]
+    assert result["summary"]["deleted"] == 500
+    assert result["errors"] == []
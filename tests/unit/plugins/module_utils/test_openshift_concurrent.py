@@ -0,0 +1,46 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+from ansible_collections.community.okd.plugins.module_utils.openshift_concurrent import (
+    RateLimiter,
+)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+
+def test_rate_limiter_burst_then_qps():
+    clock = FakeClock()
+    limiter = RateLimiter(10, burst=5, clock=clock, sleep=clock.sleep)
+
+    # the bucket is full, the first requests are not delayed
+    assert [limiter.wait() for i in range(5)] == [0.0] * 5
+    assert clock.now == 0.0
+
+    # then the requests are sent at qps
+    for i in range(10):
+        limiter.wait()
+    assert round(clock.now, 6) == 1.0
+
+    # the bucket is refilled while no request is sent, up to burst tokens
+    clock.now += 60
+    assert [limiter.wait() for i in range(5)] == [0.0] * 5
+    assert round(limiter.wait(), 6) == 0.1
+
+
+def test_rate_limiter_disabled():
+    clock = FakeClock()
+    limiter = RateLimiter(0, burst=1, clock=clock, sleep=clock.sleep)
+
+    assert sum(limiter.wait() for i in range(1000)) == 0.0
+    assert clock.now == 0.0
@@ -0,0 +1,338 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import threading
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from ansible_collections.community.okd.plugins.module_utils import openshift_groups
+from ansible_collections.community.okd.plugins.module_utils.openshift_groups import (
+    OpenshiftGroupsSync,
+    OpenshiftLDAPGroups,
+    connect_to_ldap,
+    group_users_hash,
+    is_group_changed,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_concurrent import (
+    iter_concurrently,
+    run_concurrently,
+)
+from ansible_collections.community.okd.plugins.module_utils.openshift_stats import (
+    OpenshiftStats,
+)
+from ansible_collections.community.okd.plugins.modules.openshift_adm_groups_sync import (
+    argument_spec,
+)
+from ansible_collections.community.okd.tests.unit.plugins.module_utils.openshift_fakes import (
+    FakeCluster,
+    make_module,
+)
+
+
+def make_group(name, users, sync_time="2021-12-17T12:20:28.125282"):
+    return {
+        "apiVersion": "user.openshift.io/v1",
+        "kind": "Group",
+        "metadata": {
+            "name": name,
+            "labels": {"openshift.io/ldap.host": "localhost"},
+            "annotations": {
+                "openshift.io/ldap.url": "localhost:1390",
+                "openshift.io/ldap.uid": "cn=%s,ou=groups,dc=ansible,dc=com" % name,
+                "openshift.io/ldap.sync-time": sync_time,
+            },
+        },
+        "users": users,
+    }
+
+
+def make_groups(cluster, check_mode=False, **params):
+    """
+    returns the OpenshiftLDAPGroups of a groups sync module bound to the LDAP host localhost.
+    """
+    params = dict(dict(workers=4), **params)
+    with mock.patch.object(openshift_groups, "HAS_PYTHON_LDAP", True):
+        module = make_module(
+            OpenshiftGroupsSync,
+            argument_spec(),
+            cluster,
+            check_mode=check_mode,
+            **params
+        )
+    module.host, module.netlocation = "localhost", "localhost:1390"
+    return module, OpenshiftLDAPGroups(module)
+
+
+def writes(cluster):
+    return sorted(x for x in cluster.calls if x[0] in ("create", "patch"))
+
+
+def test_run_concurrently():
+    def _square(x):
+        if x == 3:
+            raise ValueError("invalid value")
+        return x * x
+
+    result = run_concurrently(_square, range(6), workers=3)
+    assert [r for r, e in result] == [0, 1, 4, None, 16, 25]
+    assert [str(e) for r, e in result if e] == ["invalid value"]
+
+
+def test_iter_concurrently():
+    lock = threading.Lock()
+    state = dict(pending=0, max_pending=0)
+
+    def _items():
+        for x in range(20):
+            with lock:
+                state["pending"] += 1
+                state["max_pending"] = max(state["max_pending"], state["pending"])
+            yield x
+
+    def _square(x):
+        if x == 3:
+            raise ValueError("invalid value")
+        return x * x
+
+    result = []
+    for item, r, e in iter_concurrently(_square, _items(), workers=2, window=4):
+        with lock:
+            state["pending"] -= 1
+        result.append((item, r, str(e) if e else None))
+    assert [item for item, r, e in result] == list(range(20))
+    assert result[3] == (3, None, "invalid value")
+    assert result[5] == (5, 25, None)
+    # the generator is not consumed ahead of the window
+    assert state["max_pending"] <= 5
+
+
+def test_is_group_changed():
+    group = make_group("admins", ["jane", "john"])
+    assert not is_group_changed(group, make_group("admins", ["jane", "john"], "now"))
+    assert not is_group_changed(group, make_group("admins", ["john", "jane"]))
+    assert is_group_changed(group, make_group("admins", ["jane"]))
+    updated = make_group("admins", ["jane", "john"])
+    updated["metadata"]["annotations"]["openshift.io/ldap.url"] = "otherhost:389"
+    assert is_group_changed(group, updated)
+
+
+def test_create_openshift_groups():
+    cluster = FakeCluster(
+        {
+            "Group": [
+                make_group("admins", ["jane", "john"]),
+                make_group("developers", ["john"]),
+            ]
+        }
+    )
+    module, groups = make_groups(cluster)
+
+    definitions = []
+    for name, users in (
+        ("admins", ["jane", "john"]),
+        ("developers", ["jane", "john"]),
+        ("testers", ["mathew"]),
+    ):
+        uid = "cn=%s,ou=groups,dc=ansible,dc=com" % name
+        definition, err = groups.make_openshift_group(uid, name, users)
+        assert err is None
+        definitions.append(definition)
+
+    # the groups are listed once using the LDAP host label, only the group
+    # missing from the synced groups is retrieved by name
+    assert cluster.calls == [("list", "Group", None), ("get", "Group", "testers")]
+
+    results, diffs, changed = groups.create_openshift_groups(definitions)
+    assert changed
+    assert writes(cluster) == [
+        ("create", "Group", "testers"),
+        ("patch", "Group", "developers"),
+    ]
+    assert groups.counts == dict(created=1, updated=1, refreshed=0, unchanged=1)
+    stats = module.stats.to_dict()["openshift"]
+    assert sorted(stats) == ["create", "get", "list", "patch"]
+    assert stats["list"]["count"] == 1
+    assert stats["get"]["count"] == 1
+    assert sorted(x["metadata"]["name"] for x in results) == [
+        "admins",
+        "developers",
+        "testers",
+    ]
+    assert sorted(
+        (x["metadata"]["name"], x["users"]) for x in cluster.objects["Group"]
+    ) == [
+        ("admins", ["jane", "john"]),
+        ("developers", ["jane", "john"]),
+        ("testers", ["mathew"]),
+    ]
+
+
+def test_create_openshift_groups_streaming():
+    cluster = FakeCluster({"Group": [make_group("admins", ["jane"])]})
+    module, groups = make_groups(cluster)
+
+    def _definitions():
+        for name, users in (("admins", ["jane"]), ("testers", ["mathew"])):
+            uid = "cn=%s,ou=groups,dc=ansible,dc=com" % name
+            yield groups.make_openshift_group(uid, name, users)[0]
+
+    results, diffs, changed = groups.create_openshift_groups(
+        _definitions(), keep_results=False
+    )
+    assert changed
+    assert results == []
+    assert writes(cluster) == [("create", "Group", "testers")]
+    assert groups.changed_names == ["testers"]
+    assert groups.counts == dict(created=1, updated=0, refreshed=0, unchanged=1)
+
+
+def test_make_openshift_group_invalid_uid():
+    cluster = FakeCluster({"Group": [make_group("admins", ["jane"])]})
+    module, groups = make_groups(cluster)
+    group, err = groups.make_openshift_group(
+        "cn=other,ou=groups,dc=ansible,dc=com", "admins", ["jane"]
+    )
+    assert group is None
+    assert "annotation did not match LDAP UID" in err
+
+
+@pytest.mark.parametrize("check_mode", [False, True])
+def test_make_openshift_group_not_synced(check_mode):
+    # the group exists but was not synchronized from this LDAP host
+    existing = make_group("admins", ["jane"])
+    existing["metadata"]["labels"] = {}
+    cluster = FakeCluster({"Group": [existing]})
+    module, groups = make_groups(cluster, check_mode=check_mode)
+    group, err = groups.make_openshift_group(
+        "cn=admins,ou=groups,dc=ansible,dc=com", "admins", ["jane"]
+    )
+    assert group is None
+    assert "openshift.io/ldap.host label did not match sync host" in err
+    assert writes(cluster) == []
+
+
+def test_users_hash():
+    assert group_users_hash(["jane", "john"]) == group_users_hash(["john", "jane"])
+    assert group_users_hash([]) == group_users_hash(None)
+    assert group_users_hash(["jane"]) != group_users_hash(["jane", "john"])
+
+
+def test_refresh_sync_time():
+    cluster = FakeCluster(
+        {
+            "Group": [
+                make_group("admins", ["jane"], "2021-12-17T12:20:28.125282"),
+                make_group("developers", ["john"], datetime.now().isoformat()),
+            ]
+        }
+    )
+    module, groups = make_groups(cluster, workers=1, sync_time_interval=60)
+
+    definitions = [
+        groups.make_openshift_group(
+            "cn=%s,ou=groups,dc=ansible,dc=com" % name, name, users
+        )[0]
+        for name, users in (("admins", ["jane"]), ("developers", ["john"]))
+    ]
+    results, diffs, changed = groups.create_openshift_groups(definitions)
+    assert changed
+    assert writes(cluster) == [("patch", "Group", "admins")]
+    assert groups.counts == dict(created=0, updated=0, refreshed=1, unchanged=1)
+
+
+def test_stats():
+    stats = OpenshiftStats()
+    for i in range(3):
+        with stats.timer("ldap", "user_entry"):
+            pass
+    stats.hit("cached_users", True)
+    stats.hit("cached_users", True)
+    stats.hit("cached_users", False)
+    result = stats.to_dict()
+    assert result["ldap"]["user_entry"]["count"] == 3
+    assert result["ldap"]["user_entry"]["time"] >= 0
+    assert result["cache"] == {"cached_users": {"hits": 2, "misses": 1}}
+
+
+def test_connect_to_ldap_failover(monkeypatch):
+    ldap = pytest.importorskip("ldap")
+
+    class FakeConnection(object):
+        def __init__(self, uri):
+            self.uri = uri
+            self.options = {}
+            self.bound = False
+
+        def set_option(self, option, value):
+            self.options[option] = value
+
+        def simple_bind(self, who, cred):
+            return 1
+
+        def result3(self, msgid, all=1, timeout=None):
+            assert timeout == 5
+            if "down" in self.uri:
+                raise ldap.SERVER_DOWN({"desc": "Can't contact LDAP server"})
+            self.bound = True
+
+        def unbind_s(self):
+            self.bound = False
+
+    class Module(object):
+        def __init__(self):
+            self.warnings = []
+
+        def warn(self, msg):
+            self.warnings.append(msg)
+
+        def fail_json(self, **kwargs):
+            raise AssertionError(kwargs["msg"])
+
+    connections = []
+
+    def _initialize(uri):
+        connections.append(FakeConnection(uri))
+        return connections[-1]
+
+    monkeypatch.setattr(ldap, "initialize", _initialize)
+    monkeypatch.setattr(ldap, "set_option", lambda option, value: None)
+
+    # the server of the sync configuration is the only one bound when it is available
+    module = Module()
+    connection, server = connect_to_ldap(
+        module,
+        "ldap://slow:389",
+        connect_timeout=2,
+        bind_timeout=5,
+        failover_uris=["ldap://down:389", "ldap://fast:389"],
+    )
+    assert server["url"] == "ldap://slow:389"
+    assert connection.options[ldap.OPT_NETWORK_TIMEOUT] == 2
+    assert [x.uri for x in connections] == ["ldap://slow:389"]
+    assert module.warnings == []
+
+    # the failover servers are tried in order until one of them is bound
+    connections[:] = []
+    connection, server = connect_to_ldap(
+        module,
+        "ldap://down:389",
+        connect_timeout=2,
+        bind_timeout=5,
+        failover_uris=["ldap://down-2:389", "ldap://fast:389", "ldap://slow:389"],
+    )
+    assert server["url"] == "ldap://fast:389"
+    assert connection.uri == "ldap://fast:389"
+    assert [x.uri for x in connections] == [
+        "ldap://down:389",
+        "ldap://down-2:389",
+        "ldap://fast:389",
+    ]
+    assert [x.uri for x in connections if x.bound] == ["ldap://fast:389"]
+    assert len(module.warnings) == 2 and "ldap://down:389" in module.warnings[0]
+
+    with pytest.raises(AssertionError, match="ldap://down:389"):
+        connect_to_ldap(module, "ldap://down:389", bind_timeout=5)